@@ -0,0 +1,320 @@
+"""
+Offline benchmark for the scraper pipeline
+Serves the recorded pages in fixtures/ from a local HTTP server, runs the real
+LinkedInScraper against them and reports per-profile latency percentiles,
+WebDriver round trips and extraction time per field. Results are saved as JSON
+so two runs can be compared. No network access is needed (ChromeDriver must
+already be cached or set with CHROMEDRIVER_PATH).
+
+Usage:
+    python benchmark.py [--repeats 5] [--mode snapshot|script|live] [--output bench.json]
+    python benchmark.py --extract-only          # offline extractor only, no browser
+    python benchmark.py --compare old.json new.json [--max-regression 10]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+import config
+from extractor import HtmlDocument, extract_fields
+from metrics import percentile
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Path -> fixture file served by the local server
+ROUTES = {
+    "/feed/": "feed.html",
+    "/in/full-profile/": "profile_full.html",
+    "/in/minimal-profile/": "profile_minimal.html",
+    "/in/lazy-profile/": "profile_lazy.html",
+    "/authwall": "authwall.html",
+    "/login": "login.html",
+}
+
+# Profiles that bounce to the authwall / login page like an expired session
+REDIRECTS = {
+    "/in/expired-session/": "/authwall?trk=public_profile&sessionRedirect=1",
+    "/in/signed-out/": "/login?fromSignIn=true",
+}
+
+BENCHMARK_PROFILES = [
+    "/in/full-profile/",
+    "/in/minimal-profile/",
+    "/in/lazy-profile/",
+    "/in/expired-session/",
+    "/in/signed-out/",
+]
+
+# Metrics checked by --compare; higher is worse for all of them
+GATED_METRICS = ["latency.p50", "latency.p95", "round_trips.p50"]
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves fixture pages and login redirects"""
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path in REDIRECTS:
+            self.send_response(302)
+            self.send_header("Location", REDIRECTS[path])
+            self.end_headers()
+            return
+
+        fixture = ROUTES.get(path)
+        if fixture is None:
+            self.send_error(404)
+            return
+
+        with open(os.path.join(FIXTURE_DIR, fixture), "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Local HTTP server for the fixtures, running in a background thread"""
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def summarize(values):
+    """Percentile summary of a list of numbers"""
+    if not values:
+        return {}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def count_round_trips(driver):
+    """Wrap driver.execute so every WebDriver command is counted"""
+    counter = {"count": 0}
+    execute = driver.execute
+
+    def counting_execute(*args, **kwargs):
+        counter["count"] += 1
+        return execute(*args, **kwargs)
+
+    driver.execute = counting_execute
+    return counter
+
+
+def build_report(samples, mode, repeats):
+    """Aggregate raw samples into the JSON report"""
+    field_times = {}
+    for sample in samples:
+        for field, seconds in sample["fields"].items():
+            field_times.setdefault(field, []).append(seconds)
+
+    by_profile = {}
+    for sample in samples:
+        by_profile.setdefault(sample["profile"], []).append(sample)
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "mode": mode,
+            "repeats": repeats,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "latency": summarize([s["latency"] for s in samples]),
+        "round_trips": summarize([s["round_trips"] for s in samples]),
+        "fields": {field: summarize(times) for field, times in field_times.items()},
+        "profiles": {
+            profile: {
+                "outcomes": sorted({s["outcome"] for s in profile_samples}),
+                "latency": summarize([s["latency"] for s in profile_samples]),
+                "round_trips": summarize([s["round_trips"] for s in profile_samples]),
+            }
+            for profile, profile_samples in by_profile.items()
+        },
+        "samples": samples,
+    }
+
+
+def run_browser_benchmark(repeats, mode, headless):
+    """Scrape every fixture profile `repeats` times with the real scraper"""
+    from scraper import LinkedInScraper
+    from selector_stats import SelectorStats
+
+    config.EXTRACTION_MODE = mode
+    config.HEADLESS = headless
+    profile_dir = tempfile.mkdtemp(prefix="benchmark_profile_")
+    samples = []
+
+    with FixtureServer() as server:
+        config.FEED_URL = server.url("/feed/")
+        # Fresh stats: selector order learned by earlier scrapes would make runs incomparable
+        scraper = LinkedInScraper(user_data_dir=profile_dir, selector_stats=SelectorStats(persist=False))
+        try:
+            scraper.setup_driver()
+            round_trips = count_round_trips(scraper.driver)
+            scraper.open_feed()
+
+            for repeat in range(repeats):
+                for path in BENCHMARK_PROFILES:
+                    before = round_trips["count"]
+                    start = time.perf_counter()
+                    profile_data = scraper.extract_profile_data(server.url(path))
+                    latency = time.perf_counter() - start
+
+                    if profile_data:
+                        outcome = "ok"
+                    else:
+                        outcome = scraper.last_error or "empty"
+                    samples.append({
+                        "profile": path,
+                        "repeat": repeat,
+                        "outcome": outcome,
+                        "latency": latency,
+                        "round_trips": round_trips["count"] - before,
+                        "fields": dict(scraper.last_field_timings),
+                    })
+        finally:
+            scraper.close()
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    report = build_report(samples, mode, repeats)
+    report["phases"] = scraper.metrics.to_dict()["phases"]
+    return report
+
+
+def run_extract_benchmark(repeats):
+    """Time the offline extractor on the fixture pages, no browser involved"""
+    samples = []
+    for path, fixture in ROUTES.items():
+        if not path.startswith("/in/"):
+            continue
+        with open(os.path.join(FIXTURE_DIR, fixture), encoding="utf-8") as f:
+            html = f.read()
+
+        for repeat in range(repeats):
+            fields = {}
+            start = time.perf_counter()
+            document = HtmlDocument(html)
+            fields["_parse"] = time.perf_counter() - start
+            extract_fields(document, path, fields)
+            samples.append({
+                "profile": path,
+                "repeat": repeat,
+                "outcome": "ok",
+                "latency": time.perf_counter() - start,
+                "round_trips": 0,
+                "fields": fields,
+            })
+
+    return build_report(samples, "extract-only", repeats)
+
+
+def _metric(report, dotted):
+    value = report
+    for key in dotted.split("."):
+        value = (value or {}).get(key)
+    return value
+
+
+def compare_reports(old, new, max_regression):
+    """Print metric deltas between two reports; return False if a gated metric regressed"""
+    print(f"\n{'metric':<28}{'old':>12}{'new':>12}{'change':>10}")
+    print("-" * 62)
+
+    metrics = list(GATED_METRICS) + ["latency.p99", "round_trips.mean"]
+    metrics += [f"fields.{field}.p50" for field in sorted(new.get("fields", {}))]
+
+    ok = True
+    for metric in metrics:
+        before, after = _metric(old, metric), _metric(new, metric)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if metric in GATED_METRICS and change > max_regression:
+            flag = "  ❌"
+            ok = False
+        print(f"{metric:<28}{before:>12.5g}{after:>12.5g}{change:>9.1f}%{flag}")
+
+    return ok
+
+
+def print_report(report):
+    """Short console summary of a report"""
+    latency = report["latency"]
+    trips = report["round_trips"]
+    print("\n" + "=" * 60)
+    print(f"Benchmark ({report['meta']['mode']}, {latency['count']} profile loads)")
+    print("=" * 60)
+    print(f"Latency   p50 {latency['p50']:.3f}s  p95 {latency['p95']:.3f}s  p99 {latency['p99']:.3f}s")
+    print(f"Round trips p50 {trips['p50']:.0f}  max {trips['max']:.0f}")
+    print("\nExtraction time per field (p50):")
+    for field, stats in report["fields"].items():
+        print(f"  - {field:<12} {stats['p50'] * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--mode", choices=["snapshot", "script", "live"], default=config.EXTRACTION_MODE)
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--extract-only", action="store_true", help="Benchmark the offline extractor only")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="Percent a gated metric may grow before --compare fails")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        sys.exit(0 if compare_reports(old, new, args.max_regression) else 1)
+
+    if args.extract_only:
+        report = run_extract_benchmark(args.repeats)
+    else:
+        report = run_browser_benchmark(args.repeats, args.mode, headless=not args.headed)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"\nResults saved to: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+"""
+Async multi-tab engine
+Drives the scraper's single Chrome process over the DevTools protocol with
+asyncio, keeping several tabs in flight at once instead of starting one
+browser per worker. Tabs are recycled after a number of pages and share the
+run's pacing scheduler. Results go through LinkedInScraper.record_outcome,
+so the job store, writer and metrics see the same profile_data dicts as the
+Selenium engine. The browser itself is not recycled (RECYCLE_* only applies
+to the Selenium engines), since every tab would have to stop for it.
+
+Needs `pip install websockets`.
+"""
+
+import json
+import time
+import asyncio
+import urllib.request
+import config
+from extractor import HtmlDocument, extract_fields
+from structured_data import (
+    embedded_payloads, extract_from_html, is_voyager_response, merge_profiles, missing_fields, structured_profile,
+)
+from page_script import build_profile, script_expression, script_for, selector_orders
+from readiness import (
+    PROFILE_READY_SELECTORS, PROFILE_SECTION_IDS, POLL_FREQUENCY,
+    READY_STATE_SCRIPT, SCROLL_TOWARDS_SCRIPT, PAGE_READY, PAGE_LOGIN, PAGE_THROTTLED, PAGE_NOT_QUIET,
+    PAGE_TIMEOUT, THROTTLED_ERROR, is_login_url, is_loaded, page_state,
+)
+from resource_policy import (
+    RequestBlocker, count_network_event, empty_block_stats, empty_page_stats, format_stats,
+)
+from driver_manager import STEALTH_SCRIPT
+from job_store import AUTHWALL
+from deadline import Deadline
+
+PAGE_HTML_EXPRESSION = "document.documentElement.outerHTML"
+
+
+def browser_websocket_url(driver):
+    """DevTools websocket of the browser a Selenium driver started"""
+    address = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+    if not address:
+        raise Exception("Chrome did not report a DevTools address; the cdp engine needs Chrome")
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=10) as response:
+        return json.load(response)["webSocketDebuggerUrl"]
+
+
+class CdpConnection:
+    """One DevTools websocket to the browser, shared by every tab session"""
+
+    def __init__(self, websocket_url, command_timeout=None):
+        self.websocket_url = websocket_url
+        self.command_timeout = command_timeout or config.CDP_COMMAND_TIMEOUT
+        self.ws = None
+        self._next_id = 0
+        self._pending = {}
+        self._listeners = {}
+        self._reader = None
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.websocket_url, max_size=None)
+        self._reader = asyncio.ensure_future(self._read())
+
+    def on(self, method, callback, session_id=None):
+        """Call callback(params) for every `method` event of a session (None: the browser)"""
+        self._listeners[(method, session_id)] = callback
+
+    def off(self, method, session_id=None):
+        self._listeners.pop((method, session_id), None)
+
+    async def _read(self):
+        """Resolve command futures as responses arrive and pass events to their listener"""
+        try:
+            async for message in self.ws:
+                data = json.loads(message)
+                if "method" in data:
+                    listener = self._listeners.get((data["method"], data.get("sessionId")))
+                    if listener is not None:
+                        listener(data.get("params", {}))
+                    continue
+                future = self._pending.pop(data.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in data:
+                    future.set_exception(Exception(f"DevTools error: {data['error'].get('message')}"))
+                else:
+                    future.set_result(data.get("result", {}))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(Exception("DevTools connection closed"))
+            self._pending.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=None):
+        """Send one command and wait for its result"""
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        await self.ws.send(json.dumps(message))
+        try:
+            return await asyncio.wait_for(future, self.command_timeout if timeout is None else timeout)
+        finally:
+            self._pending.pop(message["id"], None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class Tab:
+    """A browser tab attached over the shared connection"""
+
+    def __init__(self, cdp, target_id, session_id):
+        self.cdp = cdp
+        self.target_id = target_id
+        self.session_id = session_id
+        self.pages = 0
+        self.blocker = None
+        self.stats = None
+        self.voyager_requests = None
+
+    @classmethod
+    async def open(cls, cdp, block_resources=False):
+        """Create a blank tab with the stealth script and resource policy installed"""
+        target = await cdp.send("Target.createTarget", {"url": "about:blank"})
+        attached = await cdp.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        tab = cls(cdp, target["targetId"], attached["sessionId"])
+        await tab.send("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_SCRIPT})
+        if block_resources:
+            tab.blocker = RequestBlocker(cdp, tab.session_id)
+            await tab.blocker.enable()
+        if config.REPORT_RESOURCE_STATS:
+            await tab.count_requests()
+        if config.STRUCTURED_DATA and config.STRUCTURED_DATA_NETWORK:
+            await tab.watch_voyager()
+        return tab
+
+    async def count_requests(self):
+        """Count this tab's requests and loaded bytes from Network events"""
+        self.stats = empty_page_stats()
+        for method in ("Network.requestWillBeSent", "Network.loadingFinished"):
+            self.cdp.on(method, self._network_listener(method), self.session_id)
+        await self.send("Network.enable")
+
+    def _network_listener(self, method):
+        return lambda params: count_network_event(self.stats, method, params)
+
+    async def watch_voyager(self):
+        """Remember the Voyager API responses this tab receives, for voyager_payloads"""
+        self.voyager_requests = []
+        self.cdp.on("Network.responseReceived", self._voyager_listener, self.session_id)
+        await self.send("Network.enable")
+
+    def _voyager_listener(self, params):
+        if is_voyager_response(params.get("response", {})):
+            self.voyager_requests.append(params["requestId"])
+
+    def take_voyager_requests(self):
+        """Voyager request ids received since the last call"""
+        if not self.voyager_requests:
+            return []
+        requests, self.voyager_requests = self.voyager_requests, []
+        return requests
+
+    async def voyager_payloads(self):
+        """Bodies of the Voyager API responses received since the last call"""
+        payloads = []
+        for request_id in self.take_voyager_requests():
+            try:
+                body = await self.send("Network.getResponseBody", {"requestId": request_id})
+                payloads.append(json.loads(body.get("body") or "null"))
+            except Exception:
+                # Bodies of finished requests may already be evicted
+                continue
+        return [payload for payload in payloads if payload]
+
+    def take_stats(self):
+        """Request stats of the page loaded since the last call, None when not counting"""
+        if self.stats is None:
+            return None
+        stats, self.stats = self.stats, empty_page_stats()
+        stats.update(self.blocker.take_stats() if self.blocker else empty_block_stats())
+        return stats
+
+    async def send(self, method, params=None, timeout=None):
+        return await self.cdp.send(method, params, self.session_id, timeout)
+
+    async def evaluate(self, expression):
+        """Value of a JavaScript expression in the page"""
+        result = await self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True})
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise Exception(f"Script error: {details.get('exception', {}).get('description') or details.get('text')}")
+        return result.get("result", {}).get("value")
+
+    async def run_script(self, script, *args):
+        """Run an execute_script-style body (with arguments[] and return)"""
+        return await self.evaluate(script_expression(script, *args))
+
+    async def navigate(self, url, timeout=None):
+        result = await self.send("Page.navigate", {"url": url}, timeout)
+        if result.get("errorText"):
+            raise Exception(f"Navigation failed: {result['errorText']}")
+        self.pages += 1
+
+    async def wait_for_page(self, selectors, timeout, settle_time=None):
+        """Async twin of readiness.wait_for_page"""
+        if settle_time is None:
+            settle_time = config.DOM_SETTLE_TIME
+        deadline = time.monotonic() + timeout
+        loaded = False
+        while time.monotonic() < deadline:
+            try:
+                state = await self.run_script(READY_STATE_SCRIPT, list(selectors))
+            except Exception:
+                state = None
+            if state:
+                loaded = is_loaded(state)
+                result = page_state(state, settle_time)
+                if result:
+                    return result
+            await asyncio.sleep(POLL_FREQUENCY)
+        return PAGE_NOT_QUIET if loaded else PAGE_TIMEOUT
+
+    async def wait_until_ready(self, selectors, timeout, settle_time=None):
+        """Async twin of readiness.wait_until_ready"""
+        return await self.wait_for_page(selectors, timeout, settle_time) == PAGE_READY
+
+    async def scroll_to_sections(self, section_ids=None, step_timeout=None, max_steps=15, deadline=None):
+        """Async twin of readiness.scroll_to_sections"""
+        if section_ids is None:
+            section_ids = PROFILE_SECTION_IDS
+        if step_timeout is None:
+            step_timeout = config.SCROLL_PAUSE_TIME
+
+        found = []
+        steps = 0
+        for section_id in section_ids:
+            while steps < max_steps:
+                if deadline is not None and not deadline.allows("scroll"):
+                    return found
+                steps += 1
+                status = await self.run_script(SCROLL_TOWARDS_SCRIPT, section_id)
+                await self.wait_until_ready([], step_timeout if deadline is None else deadline.cap(step_timeout))
+                if status == "found":
+                    found.append(section_id)
+                    break
+                if status == "bottom":
+                    break
+        return found
+
+    async def close(self):
+        if self.blocker is not None:
+            self.blocker.close()
+        if self.stats is not None:
+            self.cdp.off("Network.requestWillBeSent", self.session_id)
+            self.cdp.off("Network.loadingFinished", self.session_id)
+        if self.voyager_requests is not None:
+            self.cdp.off("Network.responseReceived", self.session_id)
+        try:
+            await self.cdp.send("Target.closeTarget", {"targetId": self.target_id})
+        except Exception:
+            pass
+
+
+class CdpEngine:
+    """Scrape URLs in several tabs of one browser, at most `concurrency` at a time"""
+
+    def __init__(self, scraper, concurrency=None, tab_wait_time=None, recycle_after=None):
+        self.scraper = scraper
+        self.concurrency = concurrency or config.CDP_CONCURRENCY
+        self.tab_wait_time = config.CDP_TAB_WAIT_TIME if tab_wait_time is None else tab_wait_time
+        self.recycle_after = recycle_after or config.CDP_RECYCLE_TABS_AFTER
+        self.block_resources = config.BLOCK_RESOURCES
+        self._urls = iter(())
+        self._urls_lock = None
+        self.completed = 0
+
+    def run(self, urls):
+        """Scrape every URL from an iterable; blocks until all are done"""
+        self._urls = iter(urls)
+        asyncio.run(self._run())
+
+    async def _run(self):
+        self._urls_lock = asyncio.Lock()
+        cdp = CdpConnection(browser_websocket_url(self.scraper.driver))
+        await cdp.connect()
+        print(f"\n Scraping with {self.concurrency} tabs in one browser")
+        try:
+            results = await asyncio.gather(
+                *(self._tab_worker(cdp, index) for index in range(self.concurrency)),
+                return_exceptions=True,
+            )
+        finally:
+            await cdp.close()
+
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            print(f"   ❌ {len(failed)} tab(s) stopped early: {failed[0]}")
+
+    async def _tab_worker(self, cdp, index):
+        """Pull URLs until the queue is empty, recycling the tab as it goes"""
+        # Stagger the first navigations so tabs don't hit LinkedIn at once
+        await asyncio.sleep(index * self.tab_wait_time / self.concurrency)
+        tab = None
+        try:
+            while True:
+                url = await self._next_url()
+                if url is None or (self.scraper.pacer and self.scraper.pacer.stopped):
+                    break
+                start = time.perf_counter()
+                self.scraper.job_store.mark_started(url)
+                profile_data, error, from_cache = self._from_cache(url)
+                state, partial = None, False
+
+                if profile_data is None:
+                    if tab is None or tab.pages >= self.recycle_after:
+                        if tab is not None:
+                            await tab.close()
+                        tab = await Tab.open(cdp, self.block_resources)
+                    print(f"\n[tab {index + 1}] {url}")
+                    profile_data, error, state, partial = await self._scrape(tab, url)
+
+                self.scraper.record_outcome(
+                    url, profile_data, time.perf_counter() - start, error, from_cache, state, partial
+                )
+                self.completed += 1
+                if not from_cache:
+                    with self.scraper.metrics.phase("pacing"):
+                        await asyncio.sleep(self._pace_delay())
+        finally:
+            if tab is not None:
+                await tab.close()
+
+    async def _next_url(self):
+        """
+        Next URL, or None when there are no more. Pulled in a worker thread:
+        the source may block (a shared queue waiting on other hosts' leases),
+        and the other tabs must keep running meanwhile.
+        """
+        async with self._urls_lock:
+            return await asyncio.to_thread(next, self._urls, None)
+
+    def _pace_delay(self):
+        """Seconds this tab waits before its next page load"""
+        if self.scraper.pacer:
+            # Shared token bucket: all tabs together stay within its rate
+            return self.scraper.pacer.reserve()
+        return self.tab_wait_time
+
+    def _from_cache(self, url):
+        """(profile_data, error, from_cache) for a fresh snapshot, else (None, None, False)"""
+        scraper = self.scraper
+        if not scraper.cache_allowed(url):
+            return None, None, False
+        with scraper.metrics.phase("cache_lookup"):
+            html = scraper.snapshot_cache.get(url)
+        if not html:
+            return None, None, False
+        with scraper.metrics.phase("extract"):
+            profile_data = extract_from_html(html, url, None, scraper.metrics, scraper.selector_stats)
+        print(f"    From cache: {profile_data['name']}")
+        return profile_data, None, True
+
+    async def _scrape(self, tab, url):
+        """(profile_data, error, page state, partial) for one profile loaded in tab"""
+        scraper = self.scraper
+        metrics = scraper.metrics
+        deadline = Deadline()
+        try:
+            # Don't count the previous page's late requests towards this one
+            tab.take_stats()
+            tab.take_voyager_requests()
+            with metrics.phase("navigate"):
+                await tab.navigate(url, deadline.cap(tab.cdp.command_timeout))
+            with metrics.phase("ready_wait"):
+                state = await tab.wait_for_page(PROFILE_READY_SELECTORS, deadline.cap(config.PAGE_LOAD_TIMEOUT))
+            ready = state == PAGE_READY
+            if state == PAGE_THROTTLED:
+                print(f"    {THROTTLED_ERROR}")
+                return None, THROTTLED_ERROR, state, False
+            if state == PAGE_NOT_QUIET:
+                print("    Profile page loaded, but it was still changing at the timeout")
+            elif state == PAGE_TIMEOUT:
+                print("    Timeout waiting for profile page")
+            if not ready:
+                deadline.allows("ready_wait")
+
+            if state == PAGE_LOGIN or is_login_url(await tab.evaluate("location.href")):
+                print("    Not logged in! Please run setup.py again.")
+                return None, AUTHWALL, state, False
+
+            # Embedded page JSON and captured API responses first
+            html = None
+            structured = None
+            missing = None
+            if config.STRUCTURED_DATA:
+                with metrics.phase("structured"):
+                    html = await tab.evaluate(PAGE_HTML_EXPRESSION)
+                    payloads = embedded_payloads(HtmlDocument(html))
+                    if config.STRUCTURED_DATA_NETWORK:
+                        payloads += await tab.voyager_payloads()
+                    structured = structured_profile(url, payloads, metrics)
+                missing = missing_fields(structured)
+
+            if structured is not None and not missing:
+                profile_data = structured
+                print("    All fields from structured data, skipping scroll")
+            else:
+                # DOM selectors for the fields structured data didn't cover
+                profile_data, html = await self._extract_from_dom(tab, url, deadline, missing)
+                if structured is not None:
+                    profile_data = merge_profiles(structured, profile_data)
+
+            # Half-loaded pages must be fetched again on retry, not served from the cache
+            if scraper.snapshot_cache is not None and ready and not deadline.exceeded:
+                with metrics.phase("cache_store"):
+                    scraper.snapshot_cache.put(url, html or await tab.evaluate(PAGE_HTML_EXPRESSION))
+
+            stats = tab.take_stats()
+            if stats is not None:
+                scraper.resource_totals.add(stats)
+                print(f"    Resources: {format_stats(stats)}")
+
+            if deadline.exceeded:
+                print(f"    Partial: {profile_data['name']} ({deadline.describe()}, will retry)")
+                return profile_data, deadline.describe(), state, True
+            print(f"    Scraped: {profile_data['name']}")
+            return profile_data, None, state, False
+
+        except asyncio.TimeoutError:
+            # A DevTools command (the navigation itself, usually) got no answer in time
+            print("    Timeout waiting for profile page")
+            return None, "Timeout waiting for profile page", PAGE_TIMEOUT, False
+        except Exception as e:
+            # Some exceptions have no message of their own
+            error = str(e) or repr(e)
+            print(f"   ❌ Error scraping profile: {error}")
+            return None, error, None, False
+
+    async def _extract_from_dom(self, tab, url, deadline, fields=None):
+        """
+        Scroll and run the selectors in tab (only for fields, if given).
+        Returns (profile_data, html), html being the page source if it was
+        fetched for extraction.
+        """
+        scraper = self.scraper
+        metrics = scraper.metrics
+        with metrics.phase("scroll"):
+            await tab.scroll_to_sections(deadline=deadline)
+
+        html = None
+        if config.EXTRACTION_MODE == "snapshot":
+            with metrics.phase("page_source"):
+                html = await tab.evaluate(PAGE_HTML_EXPRESSION)
+            with metrics.phase("extract"):
+                profile_data = extract_fields(HtmlDocument(html), url, None, metrics, scraper.selector_stats, fields)
+        else:
+            # "script" and "live" both run the compiled spec in the page
+            with metrics.phase("extract"):
+                results = await tab.run_script(script_for(fields), selector_orders(scraper.selector_stats, fields))
+                profile_data = build_profile(results, url, None, metrics, scraper.selector_stats, fields)
+        return profile_data, html
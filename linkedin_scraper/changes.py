@@ -0,0 +1,108 @@
+"""
+Change detection between runs
+Keeps a content hash of every field of every profile in SQLite, so a
+re-scrape can tell new, changed and unchanged profiles apart. New and
+changed profiles are appended to a change feed (JSONL) listing the fields
+that changed; with OUTPUT_DELTA only those profiles go to the output file.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import config
+from extractor import PROFILE_FIELDS, HISTORY_KEY
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+# Fields compared between runs (url is the key)
+TRACKED_FIELDS = [field for field in PROFILE_FIELDS if field != 'url'] + [HISTORY_KEY]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile_hashes (
+    url TEXT PRIMARY KEY,
+    hashes TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    changed_at REAL NOT NULL,
+    checked_at REAL NOT NULL
+);
+"""
+
+
+def field_hash(value):
+    """Short content hash of one field value"""
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def profile_hashes(profile_data):
+    """Hash of every tracked field of a profile"""
+    return {field: field_hash(profile_data.get(field)) for field in TRACKED_FIELDS}
+
+
+class ChangeTracker:
+    """Per-field hashes of every profile seen, stored between runs (thread-safe)"""
+
+    def __init__(self, path=None, feed_path=None):
+        self.path = path or config.CHANGE_HASHES_DB
+        self.feed_path = config.CHANGE_FEED if feed_path is None else feed_path
+        self.counts = {NEW: 0, CHANGED: 0, UNCHANGED: 0}
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.feed = open(self.feed_path, "a", encoding="utf-8") if self.feed_path else None
+
+    def check(self, profile_data):
+        """
+        Compare a profile with the last stored version and store the new hashes.
+        Returns (NEW | CHANGED | UNCHANGED, list of changed fields).
+        """
+        url = profile_data['url']
+        hashes = profile_hashes(profile_data)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT hashes FROM profile_hashes WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                change, fields = NEW, list(TRACKED_FIELDS)
+            else:
+                previous = json.loads(row[0])
+                fields = [field for field in TRACKED_FIELDS if previous.get(field) != hashes[field]]
+                change = CHANGED if fields else UNCHANGED
+
+            with self.conn:
+                if change == UNCHANGED:
+                    self.conn.execute("UPDATE profile_hashes SET checked_at = ? WHERE url = ?", (now, url))
+                else:
+                    self.conn.execute(
+                        "INSERT INTO profile_hashes (url, hashes, first_seen, changed_at, checked_at) "
+                        "VALUES (?, ?, ?, ?, ?) ON CONFLICT(url) DO UPDATE SET "
+                        "hashes = excluded.hashes, changed_at = excluded.changed_at, checked_at = excluded.checked_at",
+                        (url, json.dumps(hashes), now, now, now),
+                    )
+            self.counts[change] += 1
+            if change != UNCHANGED:
+                self._append_feed(url, change, fields)
+        return change, fields
+
+    def _append_feed(self, url, change, fields):
+        if self.feed is None:
+            return
+        entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "url": url, "change": change, "fields": fields}
+        self.feed.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.feed.flush()
+
+    def summary(self):
+        """One-line summary of this run's changes"""
+        return ", ".join(f"{count} {change}" for change, count in self.counts.items())
+
+    def close(self):
+        with self._lock:
+            if self.feed is not None:
+                self.feed.close()
+                self.feed = None
+            self.conn.close()
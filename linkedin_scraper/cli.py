@@ -0,0 +1,250 @@
+"""
+Command line entry point
+Subcommands load only the modules they need, so offline commands (status,
+export, re-extract) start without importing Selenium or the browser stack.
+
+Settings from config.py can be overridden without editing it, from the
+environment (LINKEDIN_SCRAPER_<SETTING>=value) or with --set SETTING=value;
+--set wins over the environment. Values are Python literals (5, True,
+["a", "b"]) or plain strings.
+
+Usage:
+    python cli.py scrape [FILES...] [--url URL ...] [--workers N] [--engine cdp] [--headless]
+                         [--shard-queue PATH] [--host NAME] [--rescrape]
+    python cli.py reextract [--format jsonl] [--output PATH]
+    python cli.py export [--format jsonl] [--output PATH]
+    python cli.py merge [--shard-queue PATH] [--format jsonl] [--output PATH]
+    python cli.py status
+    python cli.py --set WAIT_TIME=8 --set OUTPUT_FORMAT=jsonl scrape urls.txt
+"""
+
+import os
+import ast
+import sys
+import json
+import time
+import argparse
+import config
+
+ENV_PREFIX = "LINKEDIN_SCRAPER_"
+
+
+def parse_value(text):
+    """A setting value: a Python literal if it parses as one, else the string itself"""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def set_option(name, value):
+    """Override one setting in config"""
+    if not name.isupper() or not hasattr(config, name):
+        raise Exception(f"Unknown setting: {name} (see config.py)")
+    setattr(config, name, value)
+
+
+def apply_overrides(assignments=(), environ=None):
+    """Apply LINKEDIN_SCRAPER_* environment variables, then NAME=value assignments"""
+    environ = os.environ if environ is None else environ
+    for key, text in sorted(environ.items()):
+        if key.startswith(ENV_PREFIX):
+            set_option(key[len(ENV_PREFIX):], parse_value(text))
+
+    for assignment in assignments:
+        name, sep, text = assignment.partition("=")
+        if not sep:
+            raise Exception(f"Expected SETTING=value, got: {assignment}")
+        set_option(name.strip(), parse_value(text.strip()))
+
+
+def scrape_command(args):
+    from scraper import LinkedInScraper
+    from url_source import UrlSource
+
+    if args.workers:
+        config.POOL_WORKERS = args.workers
+    if args.engine:
+        config.ENGINE = args.engine
+    if args.headless:
+        config.HEADLESS = True
+    if args.format:
+        config.OUTPUT_FORMAT = args.format
+    if args.shard_queue:
+        config.SHARD_QUEUE_DB = args.shard_queue
+    if args.host:
+        config.SHARD_HOST = args.host
+    if args.rescrape:
+        config.RESCRAPE = True
+
+    paths = args.files or ([] if args.url else config.INPUT_FILES)
+    urls = args.url or ([] if paths else config.PROFILE_URLS)
+    scraper = LinkedInScraper()
+    try:
+        scraper.scrape_profiles(UrlSource(paths, urls))
+    except KeyboardInterrupt:
+        print("\n\n Scraping interrupted by user")
+        print(" Progress is saved; run the scraper again to resume.")
+    finally:
+        scraper.close()
+
+
+def reextract_command(args):
+    from reextract import reextract
+
+    reextract(args.format, args.output)
+
+
+def export_command(args):
+    from job_store import JobStore
+    from writers import export_records
+
+    if not os.path.exists(config.JOB_STORE_DB):
+        raise Exception(f"Job store not found: {config.JOB_STORE_DB}")
+    store = JobStore()
+    try:
+        writer = export_records(store.results(), args.format, args.output)
+        print(f"\n Exported {writer.records_written} profiles to {os.path.abspath(writer.path)}")
+    finally:
+        store.close()
+
+
+def merge_command(args):
+    from shard_queue import LeaseQueue, merge_shards
+
+    if args.shard_queue:
+        config.SHARD_QUEUE_DB = args.shard_queue
+    if not config.SHARD_QUEUE_DB or not os.path.exists(config.SHARD_QUEUE_DB):
+        raise Exception(f"Shard queue not found: {config.SHARD_QUEUE_DB} (set SHARD_QUEUE_DB or pass --shard-queue)")
+    queue = LeaseQueue()
+    try:
+        print(f"Shared queue: {queue.summary()}")
+        if queue.count_pending():
+            print(" Some URLs are still pending or leased; merging what is finished so far.")
+        writer = merge_shards(queue, args.format, args.output)
+        print(f"\n Merged {writer.records_written} profiles into {os.path.abspath(writer.path)}")
+    finally:
+        queue.close()
+
+
+def status_command(args):
+    import sqlite3
+    import urllib.request
+    from profile_manager import directory_size_mb
+
+    print("\n" + "=" * 60)
+    print("LinkedIn Scraper status")
+    print("=" * 60)
+
+    if os.path.exists(config.JOB_STORE_DB):
+        from job_store import JobStore
+
+        store = JobStore()
+        try:
+            counts = store.counts()
+            pending = store.count_pending()
+        finally:
+            store.close()
+        print(f"Jobs: {sum(counts.values())} ({', '.join(f'{n} {state}' for state, n in sorted(counts.items()))})")
+        print(f"Still to scrape: {pending}")
+    else:
+        print(f"Jobs: no job store yet ({config.JOB_STORE_DB})")
+
+    if os.path.isdir(config.SNAPSHOT_CACHE_DIR):
+        print(f"Snapshot cache: {directory_size_mb(config.SNAPSHOT_CACHE_DIR):.1f} MB in {config.SNAPSHOT_CACHE_DIR}")
+
+    if config.CHANGE_TRACKING and os.path.exists(config.CHANGE_HASHES_DB):
+        conn = sqlite3.connect(config.CHANGE_HASHES_DB)
+        try:
+            tracked = conn.execute("SELECT COUNT(*) FROM profile_hashes").fetchone()[0]
+        finally:
+            conn.close()
+        print(f"Profiles tracked for changes: {tracked}")
+
+    if config.SHARD_QUEUE_DB and os.path.exists(config.SHARD_QUEUE_DB):
+        from shard_queue import LeaseQueue
+
+        queue = LeaseQueue()
+        try:
+            print(f"Shared queue: {queue.summary()}")
+            for host, heartbeat in sorted(queue.hosts().items()):
+                print(f"  - {host}: last heartbeat {time.time() - heartbeat:.0f}s ago")
+        finally:
+            queue.close()
+
+    from writers import output_path
+
+    path = output_path()
+    if os.path.exists(path):
+        print(f"Output: {os.path.abspath(path)} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+
+    try:
+        url = f"http://{config.DAEMON_HOST}:{config.DAEMON_PORT}/status"
+        with urllib.request.urlopen(url, timeout=0.5) as response:
+            daemon = json.load(response)
+        print(
+            f"Daemon: running, {daemon['queue_depth']} queued, {daemon['completed']} done, "
+            f"{daemon['profiles_per_minute']} profiles/min"
+        )
+    except (OSError, ValueError, KeyError):
+        print("Daemon: not running")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="LinkedIn profile scraper")
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="SETTING=VALUE",
+        help="override a config.py setting (repeatable)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scrape = commands.add_parser("scrape", help="scrape profiles (resumes an interrupted run)")
+    scrape.add_argument("files", nargs="*", help="input files (txt/csv/jsonl, optionally .gz; - for stdin)")
+    scrape.add_argument("--url", action="append", default=[], help="profile URL to scrape (repeatable)")
+    scrape.add_argument("--workers", type=int, help="parallel browsers (POOL_WORKERS)")
+    scrape.add_argument("--engine", choices=["selenium", "cdp"], help="ENGINE")
+    scrape.add_argument("--headless", action="store_true", help="run Chrome without a window")
+    scrape.add_argument("--format", choices=["csv", "jsonl", "parquet"], help="OUTPUT_FORMAT")
+    scrape.add_argument("--shard-queue", metavar="PATH", help="shared work queue for multi-host runs (SHARD_QUEUE_DB)")
+    scrape.add_argument("--host", help="this host's name in the shared queue (SHARD_HOST)")
+    scrape.add_argument(
+        "--rescrape", action="store_true",
+        help="start a new run, queueing finished profiles again (RESCRAPE)",
+    )
+    scrape.set_defaults(handler=scrape_command)
+
+    reextract = commands.add_parser(
+        "reextract", aliases=["re-extract"], help="rebuild the output from cached snapshots (no browser)"
+    )
+    reextract.add_argument("--format", choices=["csv", "jsonl", "parquet"])
+    reextract.add_argument("--output", help="output path")
+    reextract.set_defaults(handler=reextract_command)
+
+    export = commands.add_parser("export", help="rewrite the output from the job store in input order")
+    export.add_argument("--format", choices=["csv", "jsonl", "parquet"])
+    export.add_argument("--output", help="output path")
+    export.set_defaults(handler=export_command)
+
+    merge = commands.add_parser("merge", help="merge the per-host output shards of a sharded run")
+    merge.add_argument("--shard-queue", metavar="PATH", help="shared work queue (SHARD_QUEUE_DB)")
+    merge.add_argument("--format", choices=["csv", "jsonl", "parquet"])
+    merge.add_argument("--output", help="output path")
+    merge.set_defaults(handler=merge_command)
+
+    status = commands.add_parser("status", help="show job, cache, shared queue and daemon state")
+    status.set_defaults(handler=status_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        apply_overrides(args.set)
+        args.handler(args)
+    except Exception as e:
+        print(f"\n❌ Error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
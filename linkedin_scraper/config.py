@@ -27,11 +27,127 @@ PROFILE_URLS = [
     # "https://www.linkedin.com/in/brian-chesky/",
 ]
 
+# Input files (used instead of PROFILE_URLS when set; also given as `python scraper.py file...`)
+INPUT_FILES = []  # txt / csv / tsv / jsonl files, optionally .gz; "-" reads stdin
+INPUT_URL_COLUMN = "url"  # CSV column / JSONL key holding the profile URL
+INPUT_STDIN_FORMAT = "txt"  # Format of stdin input
+INPUT_DEDUPE = "disk"  # "disk" (exact, temporary SQLite set), "bloom" (in-memory Bloom filter) or "none"
+INPUT_BLOOM_CAPACITY = 10_000_000  # Expected distinct URLs for the Bloom filter
+INPUT_BLOOM_ERROR_RATE = 0.0001  # Chance a new URL is mistaken for a duplicate
+
 # Browser settings
+FEED_URL = "https://www.linkedin.com/feed/"  # Opened once at startup to warm up the session
 USER_DATA_DIR = "./chrome_profile"
 HEADLESS = False  # Set to True to run browser in background
-WAIT_TIME = 5 
-SCROLL_PAUSE_TIME = 2 
+CHROMEDRIVER_PATH = None  # Set to a chromedriver binary to skip driver resolution entirely
+DRIVER_CACHE_FILE = "./.driver_cache.json"  # Resolved chromedriver per Chrome version/platform
+WAIT_TIME = 5  # Average seconds between profile loads (pacing budget)
+SCROLL_PAUSE_TIME = 2  # Upper bound (seconds) for content to settle after each scroll step
+
+# Resource blocking (the scraper only reads text, so skip everything else)
+BLOCK_RESOURCES = True
+BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "tracking"]  # See resource_policy.RESOURCE_TYPES
+BLOCKED_URL_PATTERNS = []  # Extra URL patterns to block, e.g. "*example.com/ads/*"
+ALLOWED_URL_PATTERNS = []  # URL patterns that must never be blocked
+REPORT_RESOURCE_STATS = True  # Print requests made/blocked and bytes loaded/saved per page
+
+# Page readiness (waits end as soon as the page is ready; these are upper bounds)
+PAGE_LOAD_TIMEOUT = 20  # Seconds for the top card to render on a profile
+FEED_WAIT_TIME = 10  # Seconds for the LinkedIn feed to settle after startup
+DOM_SETTLE_TIME = 0.5  # Seconds without DOM changes before a page counts as ready
+PROFILE_DEADLINE = 45  # Seconds per profile shared by every wait and lookup; when spent the fields found so far are kept and the profile is retried (0 for no limit)
+
+# Extraction settings
+EXTRACTION_MODE = "snapshot"  # "snapshot" parses page_source once offline, "script" runs every field in one in-page call, "live" queries the browser per selector
+STRUCTURED_DATA = True  # Read embedded profile JSON (ld+json, Voyager payloads) first; scroll and run selectors only for fields it lacks
+STRUCTURED_DATA_NETWORK = True  # Also read the Voyager API responses the page fetched (from the DevTools network log)
+
+# Worker pool settings
+POOL_WORKERS = 1  # Number of parallel browsers (each gets its own copy of USER_DATA_DIR)
+POOL_WORKER_WAIT_TIME = 15  # Seconds each worker waits between its own profiles
+
+# Engine
+ENGINE = "selenium"  # "selenium" (one driver per worker) or "cdp" (one browser, several async tabs; needs websockets)
+CDP_CONCURRENCY = 3  # Tabs in flight at once with the cdp engine
+CDP_TAB_WAIT_TIME = 15  # Seconds each tab waits between its profiles
+CDP_RECYCLE_TABS_AFTER = 20  # Close and reopen a tab after this many pages
+CDP_COMMAND_TIMEOUT = 30  # Seconds to wait for a DevTools command
+
+# Daemon (python daemon.py)
+DAEMON_HOST = "127.0.0.1"  # Keep the job API on localhost; it has no authentication
+DAEMON_PORT = 8765
+DAEMON_WORKERS = 1  # Warm browsers kept open (each extra one gets a copy of USER_DATA_DIR)
+DAEMON_MAX_FINISHED_JOBS = 100  # Finished jobs kept in memory for /jobs (results stay in the job store)
+
+# Browser recycling
+RECYCLE_AFTER_PAGES = 200  # Restart the browser after this many page loads (0 = never; not with ENGINE = "cdp")
+RECYCLE_MAX_RSS_MB = 1500  # Restart when Chrome and its renderers use more memory than this (0 = never)
+RECYCLE_CHECK_EVERY = 10  # Pages between memory checks
+DRIVER_HEALTH_TIMEOUT = 10  # Seconds a failed page's driver has to answer before it is restarted
+
+# Pacing (token bucket at the rate implied by WAIT_TIME / POOL_WORKER_WAIT_TIME / CDP_TAB_WAIT_TIME)
+PACING_MAX_RATE_PER_MINUTE = None  # Hard cap on profile loads per minute across all workers
+PACING_BURST = 2  # Loads allowed back to back after an idle period (e.g. a run of cached profiles)
+PACING_BACKOFF_BASE = 30  # Seconds of backoff after the first authwall / timeout / empty page, doubled each time
+PACING_MAX_BACKOFF = 900  # Upper bound for one backoff
+PACING_JITTER = 0.25  # Random extra fraction added to each backoff
+PACING_AUTHWALL_LIMIT = 3  # Authwalls in a row before the session counts as invalid
+PACING_SESSION_PAUSE = 600  # Seconds to pause when the session looks invalid (0 = stop right away)
+PACING_MAX_PAUSES = 1  # Pauses before the run is stopped
+PACING_LOG = "pacing_log.jsonl"  # Pacing decisions (None to disable)
+
+# Job store (progress is saved here so interrupted runs can resume)
+JOB_STORE_DB = "scrape_jobs.db"
+MAX_ATTEMPTS = 3  # Attempts per URL before it is left as failed
+RESCRAPE = False  # True: start a new run, queueing finished profiles again (change tracking hashes are kept)
+
+# Sharded runs across hosts (python cli.py scrape --shard-queue /shared/queue.db, then python cli.py merge)
+SHARD_QUEUE_DB = None  # Work queue on a shared volume; set to split the URLs between hosts that lease batches of them
+SHARD_HOST = None  # Name of this host in the queue and its output shard (default: the hostname)
+SHARD_LEASE_SIZE = 20  # URLs leased per batch
+SHARD_LEASE_SECONDS = 300  # A lease not renewed for this long goes back to the queue (its host is presumed dead)
+SHARD_HEARTBEAT_SECONDS = 60  # How often a host renews its leases
+SHARD_POLL_SECONDS = 30  # How often an idle host checks for leases reclaimed from dead hosts
+SHARD_OUTPUT_DIR = "./shards"  # Per-host output files (on the shared volume), merged by `cli.py merge`
+
+# Snapshot cache (fresh profiles are re-extracted from saved HTML instead of re-scraped)
+SNAPSHOT_CACHE_ENABLED = True
+SNAPSHOT_CACHE_DIR = "./snapshot_cache"
+SNAPSHOT_TTL_HOURS = 24  # Snapshots older than this are fetched again
+SNAPSHOT_CACHE_MAX_MB = 500  # Least recently used snapshots are evicted above this size
+
+# Instrumentation
+METRICS_JSON = "run_report.json"  # Per-phase/field timings and selector hit rates (None to disable)
+METRICS_PROMETHEUS = None  # e.g. "/var/lib/node_exporter/textfile/linkedin_scraper.prom"
+METRICS_EXPORT_EVERY = 25  # Rewrite the reports every N profiles during a run (0 = only at the end)
+
+# Adaptive selector ordering
+SELECTOR_STATS_FILE = "selector_stats.json"  # Selector hit rates learned across runs (None to disable)
+SELECTOR_STATS_DECAY = 0.8  # Weight kept by older runs each time the stats are loaded
+SELECTOR_DEAD_DAYS = 14  # Skip selectors that haven't matched for this many days
+SELECTOR_COLLAPSE_RATIO = 0.5  # Warn when a field is found this much less often than usual
+SELECTOR_COLLAPSE_MIN_SAMPLES = 20  # Profiles needed before judging a field's hit rate
 
 # Output settings
+OUTPUT_FORMAT = "csv"  # "csv", "jsonl" or "parquet" (parquet needs pyarrow)
 OUTPUT_CSV = "linkedin_profiles.csv"
+OUTPUT_JSONL = "linkedin_profiles.jsonl"
+OUTPUT_PARQUET = "linkedin_profiles.parquet"
+OUTPUT_FLUSH = "record"  # Flush after every "record", every "batch", or only on "close"
+OUTPUT_BATCH_SIZE = 500  # Records per flush for "batch" (and per Parquet row group)
+OUTPUT_FSYNC = False  # fsync on every flush so data survives a power loss
+OUTPUT_HISTORY = "table"  # Experience/education history: "table" (<output>_positions file), "nested" (JSONL only) or "none"
+OUTPUT_NORMALIZE = True  # Add typed columns: followers/connections counts and history start/end dates and durations
+
+# Change tracking between runs
+CHANGE_TRACKING = True
+CHANGE_HASHES_DB = "profile_hashes.db"  # Per-field hashes of every profile seen (kept between runs)
+CHANGE_FEED = "change_feed.jsonl"  # New/changed profiles and the fields that changed (None to disable)
+OUTPUT_DELTA = False  # Write only new or changed profiles to the output file
+
+# Profile clones for pool and daemon workers
+PROFILE_GOLDEN_DIR = "./chrome_profile_golden"  # Slimmed copy of USER_DATA_DIR (session files only) that clones are made from
+PROFILE_CLONE_DIR = "./profile_clones"  # Per-worker clones; ones left by crashed runs are removed on the next run
+PROFILE_CLONE_METHOD = "auto"  # "auto" (reflink, hardlinks for immutable files, else copy) or "copy"
+PROFILE_KEEP_EXTRA = []  # Extra paths relative to USER_DATA_DIR to keep in the golden profile, e.g. "Default/Extensions"
+PROFILE_CLONE_MAX_AGE_HOURS = 24  # Where a clone's process can't be checked (Windows without psutil), remove it after this
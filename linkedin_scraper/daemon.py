@@ -0,0 +1,419 @@
+"""
+Long-lived scraper daemon
+Keeps warm, logged-in browsers running and accepts scrape jobs over a local
+HTTP API, so small lookups don't pay for imports, driver startup and the
+feed load every time. Results stream back as they finish and also go to the
+job store, output file and run report like a normal run.
+
+Usage:
+    python daemon.py                          # start the daemon
+    python daemon.py submit URL [URL ...]     # submit a job and stream its results
+
+API (JSON):
+    POST /jobs                {"urls": [...]} -> {"job_id", "queued", "invalid"}
+                              (503 when no worker is running or pacing stopped the run)
+    GET  /jobs                 all jobs with their progress
+    GET  /jobs/<id>            progress and results so far
+    GET  /jobs/<id>/results    one JSON line per profile as it finishes (NDJSON stream)
+    GET  /status               queue depth, workers, throughput
+"""
+
+import sys
+import json
+import time
+import queue
+import threading
+import itertools
+import collections
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import config
+from urls import canonical_profile_url, is_profile_url
+from job_store import JobStore, AUTHWALL, PARTIAL
+from profile_manager import ProfileManager
+from scraper import LinkedInScraper
+
+# Seconds of history used for the throughput figure in /status
+THROUGHPUT_WINDOW = 600
+
+PACER_STOPPED = "scraping was stopped after repeated throttling; restart the daemon"
+
+
+class Job:
+    """A batch of URLs submitted together; collects results as they finish"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, urls):
+        self.id = str(next(self._ids))
+        self.urls = urls
+        self.results = []
+        self.created = time.time()
+        self.finished = None
+        self._changed = threading.Condition()
+
+    def add_result(self, result):
+        with self._changed:
+            self.results.append(result)
+            if len(self.results) == len(self.urls):
+                self.finished = time.time()
+            self._changed.notify_all()
+
+    def wait_for_results(self, seen, timeout=30):
+        """Block until there are more than `seen` results, the job is done, or timeout"""
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.results) > seen or self.done, timeout)
+            return list(self.results[seen:])
+
+    @property
+    def done(self):
+        return len(self.results) >= len(self.urls)
+
+    def summary(self, with_results=False):
+        info = {
+            "job_id": self.id,
+            "status": "done" if self.done else "running",
+            "total": len(self.urls),
+            "finished": len(self.results),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.created)),
+        }
+        if self.finished:
+            info["seconds"] = round(self.finished - self.created, 2)
+        if with_results:
+            info["results"] = list(self.results)
+        return info
+
+
+class ScraperDaemon:
+    """Warm scraper workers fed from an in-memory queue of (job, url)"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or config.DAEMON_WORKERS
+        self.queue = queue.Queue()
+        self.jobs = collections.OrderedDict()
+        self.jobs_lock = threading.Lock()
+        self.worker_state = {}
+        self.completions = collections.deque()
+        self.started = time.time()
+        self.completed = 0
+        self.failed = 0
+        self._startup_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._threads = []
+        self._profile_dirs = []
+        self.profiles = ProfileManager()
+        if self.workers > 1:
+            self.profiles.cleanup_stale_clones()
+
+        self.scraper = LinkedInScraper(job_store=JobStore())
+        self.scraper._owns_job_store = True
+        self.scraper.open_outputs(self.workers)
+
+    def start(self):
+        """Start the worker threads; each warms up its own browser"""
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, args=(index,), name=f"daemon-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, urls):
+        """Queue a job; returns (job, invalid URLs)"""
+        canonical, invalid = [], []
+        for url in urls:
+            url = canonical_profile_url(url)
+            if is_profile_url(url):
+                canonical.append(url)
+            else:
+                invalid.append(url)
+
+        job = Job(canonical)
+        with self.jobs_lock:
+            self.jobs[job.id] = job
+            self._forget_finished_jobs()
+        self.scraper.job_store.add_urls(canonical)
+        for url in canonical:
+            self.queue.put((job, url))
+        return job, invalid
+
+    def unavailable(self):
+        """Why new jobs would never be scraped, or None while workers are taking them"""
+        if self.scraper.pacer and self.scraper.pacer.stopped:
+            return PACER_STOPPED
+        if not any(thread.is_alive() for thread in self._threads):
+            return "no scraper worker is running; see the daemon log"
+        return None
+
+    def _forget_finished_jobs(self):
+        """
+        Keep only the newest DAEMON_MAX_FINISHED_JOBS finished jobs in memory
+        (their profiles stay in the job store and output file). Call with
+        jobs_lock held.
+        """
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - config.DAEMON_MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def get_job(self, job_id):
+        with self.jobs_lock:
+            return self.jobs.get(job_id)
+
+    def _new_worker(self, index):
+        """Worker 0 uses the main profile; others get a clone of it"""
+        if index == 0:
+            return self.scraper
+        profile_dir = self.profiles.clone(f"d{index}")
+        self._profile_dirs.append(profile_dir)
+        return self.scraper.spawn_worker(profile_dir)
+
+    def _worker(self, index):
+        state = self.worker_state.setdefault(index, {"state": "starting", "url": None, "pages": 0})
+        try:
+            scraper = self._new_worker(index)
+            # ChromeDriver install/lookup is not safe to run concurrently; the
+            # scraper holds the lock for supervised restarts too
+            scraper.startup_lock = self._startup_lock
+            scraper.setup_driver()
+            scraper.open_feed()
+        except Exception as e:
+            state.update(state="failed", error=str(e))
+            print(f"\n❌ Daemon worker {index} could not start: {str(e)}")
+            return
+
+        state["state"] = "idle"
+        navigated = False
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            job, url = item
+            if scraper.pacer.stopped:
+                self._fail(job, url, PACER_STOPPED)
+                continue
+
+            if navigated:
+                with scraper.metrics.phase("pacing"):
+                    scraper.pacer.wait()
+            state.update(state="scraping", url=url)
+            print(f"\n[job {job.id}] [w{index}]", end=" ")
+            profile_data = scraper.scrape_one(url)
+            navigated = not scraper.last_from_cache
+            state.update(state="idle", url=None, pages=state["pages"] + 1)
+
+            self._record(profile_data)
+            if profile_data and scraper.last_partial:
+                job.add_result({"url": url, "status": PARTIAL, "error": scraper.last_error, "profile": profile_data})
+            elif profile_data:
+                job.add_result({"url": url, "status": "done", "cached": scraper.last_from_cache, "profile": profile_data})
+            else:
+                status = AUTHWALL if scraper.last_error == AUTHWALL else "failed"
+                job.add_result({"url": url, "status": status, "error": scraper.last_error})
+
+            if scraper.pacer.stopped:
+                # The session is gone: fail what is queued instead of loading more pages
+                self._fail_queued(PACER_STOPPED)
+
+        if scraper is not self.scraper:
+            scraper.close()
+
+    def _fail(self, job, url, error):
+        """Finish a queued URL without scraping it (it stays pending in the job store)"""
+        self._record(None)
+        job.add_result({"url": url, "status": "failed", "error": error})
+
+    def _fail_queued(self, error):
+        """Fail every URL still in the queue, keeping the workers' stop signals"""
+        stop_signals = 0
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stop_signals += 1
+            else:
+                self._fail(*item, error)
+        for _ in range(stop_signals):
+            self.queue.put(None)
+
+    def _record(self, profile_data):
+        now = time.time()
+        with self._stats_lock:
+            if profile_data:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.completions.append(now)
+            while self.completions and self.completions[0] < now - THROUGHPUT_WINDOW:
+                self.completions.popleft()
+
+    def status(self):
+        """Queue depth, worker states and throughput"""
+        with self._stats_lock:
+            window = min(THROUGHPUT_WINDOW, max(time.time() - self.started, 1))
+            per_minute = len(self.completions) * 60 / window
+            completed, failed = self.completed, self.failed
+        with self.jobs_lock:
+            running = sum(1 for job in self.jobs.values() if not job.done)
+        return {
+            "uptime": round(time.time() - self.started, 1),
+            "queue_depth": self.queue.qsize(),
+            "jobs_running": running,
+            "completed": completed,
+            "failed": failed,
+            "profiles_per_minute": round(per_minute, 2),
+            "workers": {str(index): dict(state) for index, state in self.worker_state.items()},
+            "pacing": self.scraper.pacer.summary(),
+        }
+
+    def stop(self):
+        """Stop the workers after their current profile and close everything"""
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=60)
+        self.scraper.print_summary()
+        self.scraper.close()
+        for profile_dir in self._profile_dirs:
+            self.profiles.release(profile_dir)
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """JSON API in front of a ScraperDaemon"""
+
+    daemon = None
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json({"error": "not found"}, 404)
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            urls = payload["urls"]
+            if isinstance(urls, str):
+                urls = [urls]
+            if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+                raise TypeError("urls must be a list of strings")
+        except (ValueError, KeyError, TypeError):
+            self._send_json({"error": 'expected a JSON body like {"urls": [...]}'}, 400)
+            return
+
+        reason = self.daemon.unavailable()
+        if reason:
+            self._send_json({"error": reason}, 503)
+            return
+
+        job, invalid = self.daemon.submit(urls)
+        self._send_json({"job_id": job.id, "queued": len(job.urls), "invalid": invalid}, 202)
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if parts == ["status"]:
+            self._send_json(self.daemon.status())
+        elif parts == ["jobs"]:
+            with self.daemon.jobs_lock:
+                jobs = list(self.daemon.jobs.values())
+            self._send_json([job.summary() for job in jobs])
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.daemon.get_job(parts[1])
+            if job is None:
+                self._send_json({"error": "unknown job"}, 404)
+            elif len(parts) == 3 and parts[2] == "results":
+                self._stream_results(job)
+            elif len(parts) == 2:
+                self._send_json(job.summary(with_results=True))
+            else:
+                self._send_json({"error": "not found"}, 404)
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _stream_results(self, job):
+        """Write each result as one JSON line as soon as it is available"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        seen = 0
+        try:
+            while True:
+                for result in job.wait_for_results(seen):
+                    self.wfile.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+                    seen += 1
+                self.wfile.flush()
+                if job.done and seen >= len(job.results):
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=None, port=None, workers=None):
+    """Run the daemon until interrupted"""
+    host = host or config.DAEMON_HOST
+    port = port or config.DAEMON_PORT
+    daemon = ScraperDaemon(workers)
+    DaemonHandler.daemon = daemon
+    server = ThreadingHTTPServer((host, port), DaemonHandler)
+    server.daemon_threads = True
+
+    print("\n" + "=" * 60)
+    print(f"LinkedIn scraper daemon on http://{host}:{port}")
+    print("=" * 60)
+    daemon.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\n Shutting down daemon...")
+    finally:
+        server.server_close()
+        daemon.stop()
+
+
+def submit(urls, host=None, port=None):
+    """Client: submit URLs to a running daemon and print results as they arrive"""
+    base = f"http://{host or config.DAEMON_HOST}:{port or config.DAEMON_PORT}"
+    request = urllib.request.Request(
+        f"{base}/jobs",
+        data=json.dumps({"urls": urls}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            job = json.load(response)
+    except urllib.error.HTTPError as e:
+        try:
+            error = json.load(e)["error"]
+        except (ValueError, KeyError):
+            error = e.reason
+        print(f"❌ Job rejected ({e.code}): {error}", file=sys.stderr)
+        sys.exit(1)
+    if job["invalid"]:
+        print(f"Skipped (not profile URLs): {', '.join(job['invalid'])}", file=sys.stderr)
+
+    with urllib.request.urlopen(f"{base}/jobs/{job['job_id']}/results") as response:
+        for line in response:
+            print(line.decode("utf-8").rstrip("\n"), flush=True)
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "submit":
+        submit(sys.argv[2:])
+    elif len(sys.argv) == 1:
+        serve()
+    else:
+        print("Usage: python daemon.py  |  python daemon.py submit URL [URL ...]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
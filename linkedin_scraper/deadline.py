@@ -0,0 +1,50 @@
+"""
+Per-profile time budget
+Every wait and lookup for one profile draws down the same budget
+(PROFILE_DEADLINE seconds), so a single slow page can't stall the run. Once
+the budget is spent the remaining waits are skipped and the fields already
+on the page are extracted; the record is kept as partial and retried.
+"""
+
+import time
+import config
+
+
+class Deadline:
+    """Time left for one profile; None seconds means no limit"""
+
+    def __init__(self, seconds=None):
+        self.seconds = config.PROFILE_DEADLINE if seconds is None else seconds
+        self.start = time.monotonic()
+        # First stage that found the budget spent, if any
+        self.exhausted_in = None
+
+    def remaining(self):
+        """Seconds left, or None without a limit"""
+        if not self.seconds:
+            return None
+        return max(0.0, self.seconds - (time.monotonic() - self.start))
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def cap(self, timeout):
+        """timeout limited to the time left"""
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    def allows(self, stage):
+        """Whether there is time left for stage; remembers the first stage that was cut short"""
+        if not self.expired():
+            return True
+        if self.exhausted_in is None:
+            self.exhausted_in = stage
+        return False
+
+    @property
+    def exceeded(self):
+        return self.exhausted_in is not None
+
+    def describe(self):
+        return f"Deadline of {self.seconds}s exceeded during {self.exhausted_in}"
@@ -0,0 +1,243 @@
+"""
+ChromeDriver resolution and startup
+Caches the resolved chromedriver binary per Chrome major version and platform,
+so launches skip webdriver-manager lookups and directory walks entirely while
+the cached binary is still valid. Shared by setup.py and scraper.py.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import platform
+import subprocess
+from contextlib import contextmanager
+import config
+
+DRIVER_BINARY = "chromedriver.exe" if os.name == "nt" else "chromedriver"
+
+# Hides the webdriver flag from the page
+STEALTH_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+# Where Chrome usually lives when it isn't on PATH
+CHROME_CANDIDATES = {
+    "darwin": ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"],
+    "linux": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+    "win32": [
+        os.path.expandvars(r"%ProgramFiles%\Google\Chrome\Application\chrome.exe"),
+        os.path.expandvars(r"%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe"),
+        os.path.expandvars(r"%LocalAppData%\Google\Chrome\Application\chrome.exe"),
+    ],
+}
+
+
+class StartupTimer:
+    """Collects how long each phase of a browser launch took"""
+
+    def __init__(self):
+        self.phases = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def as_dict(self):
+        """Phase durations in seconds, plus the total"""
+        timings = {name: round(seconds, 3) for name, seconds in self.phases}
+        timings['total'] = round(time.perf_counter() - self.started, 3)
+        return timings
+
+    def report(self):
+        """One-line breakdown for the console"""
+        parts = [f"{name} {seconds:.2f}s" for name, seconds in self.phases]
+        parts.append(f"total {time.perf_counter() - self.started:.2f}s")
+        return " | ".join(parts)
+
+
+def platform_key():
+    """Identifier for the OS and CPU architecture"""
+    return f"{sys.platform}-{platform.machine().lower() or 'unknown'}"
+
+
+def _chrome_version_from_registry():
+    """Chrome version recorded by the Windows installer"""
+    try:
+        import winreg
+        key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Google\Chrome\BLBeacon")
+        version, _ = winreg.QueryValueEx(key, "version")
+        return version
+    except Exception:
+        return None
+
+
+def chrome_binary():
+    """Path of the installed Chrome executable, or None"""
+    candidates = CHROME_CANDIDATES.get(sys.platform, CHROME_CANDIDATES["linux"])
+    for candidate in candidates:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    return None
+
+
+def _chrome_version_from_binary(binary):
+    """Chrome version reported by `chrome --version`"""
+    try:
+        output = subprocess.run(
+            [binary, "--version"], capture_output=True, text=True, timeout=5
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.strip() or None
+
+
+def chrome_major_version(cache=None):
+    """
+    Installed Chrome major version as a string, or None if it can't be found.
+    With a cache dict, the version is only re-read when the Chrome binary changes.
+    """
+    binary = chrome_binary()
+    stamp = None
+    if binary and cache is not None:
+        stamp = os.path.getmtime(binary)
+        known = cache.get("chrome") or {}
+        if known.get("binary") == binary and known.get("mtime") == stamp:
+            return known.get("major")
+
+    version = None
+    if sys.platform == "win32":
+        version = _chrome_version_from_registry()
+    if not version and binary:
+        version = _chrome_version_from_binary(binary)
+    match = re.search(r"(\d+)\.\d+", version or "")
+    major = match.group(1) if match else None
+
+    if stamp is not None and major:
+        cache["chrome"] = {"binary": binary, "mtime": stamp, "major": major}
+    return major
+
+
+def _load_cache():
+    try:
+        with open(config.DRIVER_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    tmp_path = config.DRIVER_CACHE_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, config.DRIVER_CACHE_FILE)
+
+
+def _is_valid_binary(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _find_driver_binary(driver_path):
+    """
+    webdriver-manager sometimes returns a file next to the driver rather than
+    the driver itself; look for the real binary in its directory and parent.
+    """
+    if os.path.basename(driver_path) == DRIVER_BINARY:
+        return driver_path
+
+    driver_dir = os.path.dirname(driver_path)
+    for search_dir in (driver_dir, os.path.dirname(driver_dir)):
+        for root, dirs, files in os.walk(search_dir):
+            if DRIVER_BINARY in files:
+                return os.path.join(root, DRIVER_BINARY)
+    return driver_path
+
+
+def _install_driver():
+    """Download (or locate) chromedriver with webdriver-manager"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.os_manager import ChromeType
+
+    try:
+        return _find_driver_binary(ChromeDriverManager().install())
+    except Exception as e:
+        print(f"   Warning: {str(e)}")
+        print("   Trying alternative method...")
+        return _find_driver_binary(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
+
+
+def cache_key(cache=None):
+    """Cache key for the installed Chrome, or None if its version is unknown"""
+    major = chrome_major_version(cache)
+    return f"{major}-{platform_key()}" if major else None
+
+
+def resolve_driver_path(refresh=False):
+    """
+    Path to a chromedriver matching the installed Chrome. Uses the cached
+    binary when it is still valid; otherwise resolves it and updates the cache.
+    Returns (path, from_cache).
+    """
+    if config.CHROMEDRIVER_PATH:
+        return config.CHROMEDRIVER_PATH, True
+
+    cache = _load_cache()
+    known_chrome = dict(cache.get("chrome") or {})
+    key = cache_key(cache)
+    entry = cache.get("drivers", {}).get(key) if key else None
+    if entry and not refresh and _is_valid_binary(entry.get("path")):
+        if cache.get("chrome") != known_chrome:
+            _save_cache(cache)
+        return entry["path"], True
+
+    print("   Installing/updating ChromeDriver...")
+    driver_path = _install_driver()
+    if key and _is_valid_binary(driver_path):
+        cache.setdefault("drivers", {})[key] = {"path": driver_path, "resolved_at": time.time()}
+        _save_cache(cache)
+    return driver_path, False
+
+
+_user_agents = None
+
+
+def random_user_agent():
+    """A random browser user agent; fake_useragent's data is loaded once per process"""
+    global _user_agents
+    if _user_agents is None:
+        from fake_useragent import UserAgent
+        _user_agents = UserAgent()
+    return _user_agents.random
+
+
+def launch_chrome(chrome_options, timer=None):
+    """
+    Start Chrome with a cached chromedriver. If a cached driver no longer
+    works (e.g. Chrome auto-updated), resolve a fresh one and retry once.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    timer = timer or StartupTimer()
+    with timer.phase("driver lookup"):
+        driver_path, from_cache = resolve_driver_path()
+
+    try:
+        with timer.phase("browser launch"):
+            return webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+    except Exception:
+        if not from_cache or config.CHROMEDRIVER_PATH:
+            raise
+        print("   Cached ChromeDriver failed to start, resolving again...")
+
+    with timer.phase("driver refresh"):
+        driver_path, _ = resolve_driver_path(refresh=True)
+    with timer.phase("browser relaunch"):
+        return webdriver.Chrome(service=Service(driver_path), options=chrome_options)
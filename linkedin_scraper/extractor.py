@@ -0,0 +1,405 @@
+"""
+Profile field extraction
+Interprets the declarative field spec (selector fallback lists and section
+lookups) against a parsed page snapshot, or any document object with the
+same lookup methods, and builds the profile dict.
+"""
+
+import sys
+import json
+import time
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+NOT_AVAILABLE = "N/A"
+
+# Columns of a scraped profile, in output order
+PROFILE_FIELDS = [
+    'url',
+    'name',
+    'headline',
+    'location',
+    'about',
+    'followers',
+    'connections',
+    'experience',
+    'education',
+]
+
+# Profiles carry their full experience / education history under this key,
+# one row per list item, written as a child table linked by profile_url
+HISTORY_KEY = 'positions'
+HISTORY_FIELDS = [
+    'profile_url',
+    'section',
+    'position',
+    'title',
+    'organization',
+    'dates',
+    'location',
+]
+
+NAME_SELECTORS = [
+    "h1.text-heading-xlarge",
+    "h1.inline.t-24.v-align-middle.break-words",
+    "h1.top-card-layout__title"
+]
+
+HEADLINE_SELECTORS = [
+    "div.text-body-medium.break-words",
+    "h2.mt1.t-18.t-black.t-normal",
+    "div.top-card-layout__headline"
+]
+
+LOCATION_SELECTORS = [
+    "span.text-body-small.inline.t-black--light.break-words",
+    "span.top-card-layout__location"
+]
+
+ABOUT_SELECTORS = [
+    "div.display-flex.ph5.pv3",
+    "div.pv-shared-text-with-see-more",
+    "div.inline-show-more-text",
+    "section[data-section='summary'] div.pv-shared-text-with-see-more"
+]
+
+CONNECTION_SELECTORS = [
+    "span.t-bold",  # Common selector for connections like "500+"
+    "span.t-black--light span.t-bold",
+    "li.pv-top-card--list-bullet span.t-bold",
+    "span.link-without-visited-state span"
+]
+
+FOLLOWER_SELECTORS = [
+    "span.pvs-entity__caption-wrapper",
+    "span.follower-count",
+    "div.pv-top-card--list-bullet span",
+    "span[aria-label*='follower']"
+]
+
+# Experience / education list items and the parts read from each item
+SECTION_ITEM_SELECTOR = "li.artdeco-list__item"
+ITEM_TITLE_SELECTOR = "div[aria-hidden='true'] span[aria-hidden='true']"
+ITEM_SUBTITLE_SELECTOR = "span.t-14.t-normal span[aria-hidden='true']"
+ITEM_CAPTION_SELECTOR = "span.t-14.t-normal.t-black--light span[aria-hidden='true']"
+
+# Declarative field spec, in extraction order. A field is either a fallback
+# list of selectors ("match": "text" | "block" | "count") or a section
+# anchored at an element id. Section items are read in bulk: each column is
+# the nth match of a selector inside the item, the field value summarizes the
+# first item and every item becomes a history row. extract_fields interprets
+# the spec against a document; page_script.py compiles it into one in-page
+# query.
+FIELD_SPECS = [
+    {'field': 'name', 'match': 'text', 'selectors': NAME_SELECTORS},
+    {'field': 'headline', 'match': 'text', 'selectors': HEADLINE_SELECTORS},
+    {'field': 'location', 'match': 'text', 'selectors': LOCATION_SELECTORS},
+    {'field': 'about', 'match': 'block', 'selectors': ABOUT_SELECTORS},
+    {'field': 'connections', 'match': 'count', 'selectors': CONNECTION_SELECTORS},
+    {'field': 'followers', 'match': 'count', 'selectors': FOLLOWER_SELECTORS, 'keyword': 'follower'},
+    {'field': 'experience', 'match': 'section', 'anchor': 'experience', 'item': SECTION_ITEM_SELECTOR,
+     'columns': [
+         ['title', ITEM_TITLE_SELECTOR, 0],
+         ['organization', ITEM_SUBTITLE_SELECTOR, 0],
+         ['dates', ITEM_CAPTION_SELECTOR, 0],
+         ['location', ITEM_CAPTION_SELECTOR, 1],
+     ],
+     'summary': ['title', 'organization', 'dates']},
+    {'field': 'education', 'match': 'section', 'anchor': 'education', 'item': SECTION_ITEM_SELECTOR,
+     'columns': [
+         ['organization', ITEM_TITLE_SELECTOR, 0],
+         ['title', ITEM_SUBTITLE_SELECTOR, 0],
+         ['dates', ITEM_CAPTION_SELECTOR, 0],
+         ['location', ITEM_CAPTION_SELECTOR, 1],
+     ],
+     'summary': ['organization', 'title', 'dates']},
+]
+
+# Elements that start a new line in rendered text
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table',
+    'tr', 'ul'
+}
+
+# Elements whose content is never rendered as text
+SKIP_TAGS = {'script', 'style', 'template', 'noscript', 'head', 'title'}
+
+HIDDEN_CLASSES = {'visually-hidden', 'hidden'}
+
+
+def normalize_whitespace(text):
+    """Collapse all runs of whitespace into single spaces"""
+    return ' '.join(text.split())
+
+
+def clean_text(text):
+    """Clean and normalize text by removing extra whitespace, newlines, and duplicates"""
+    if not text or text == NOT_AVAILABLE:
+        return NOT_AVAILABLE
+
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+    cleaned_lines = []
+    prev_line = None
+    for line in lines:
+        if line != prev_line:
+            cleaned_lines.append(line)
+            prev_line = line
+
+    text = ' '.join(cleaned_lines)
+    text = ' '.join(text.split())
+
+    return text
+
+
+class HtmlDocument:
+    """Page snapshot parsed once and queried offline with CSS selectors"""
+
+    _compiled = {}
+
+    def __init__(self, html):
+        self.root = lxml.html.fromstring(html or "<html></html>")
+
+    def _selector(self, selector):
+        """Compile a CSS selector once per process"""
+        compiled = self._compiled.get(selector)
+        if compiled is None:
+            compiled = CSSSelector(selector)
+            self._compiled[selector] = compiled
+        return compiled
+
+    def find(self, selector, parent=None):
+        """First element matching selector, or None"""
+        matches = self.find_all(selector, parent)
+        return matches[0] if matches else None
+
+    def find_all(self, selector, parent=None):
+        """All elements matching selector in document order"""
+        scope = self.root if parent is None else parent
+        return self._selector(selector)(scope)
+
+    def find_by_id(self, element_id):
+        """Element with the given id, or None"""
+        matches = self.root.xpath("//*[@id=$element_id]", element_id=element_id)
+        return matches[0] if matches else None
+
+    def parent(self, element):
+        """Parent element, or None at the root"""
+        return element.getparent()
+
+    def text(self, element):
+        """Rendered text of an element, one line per block like WebElement.text"""
+        parts = []
+        _collect_text(element, parts)
+        lines = [normalize_whitespace(line) for line in ''.join(parts).split('\n')]
+        return '\n'.join(line for line in lines if line)
+
+
+def _is_hidden(element):
+    """Whether an element is hidden from rendered text"""
+    if element.get('hidden') is not None:
+        return True
+    classes = set((element.get('class') or '').split())
+    if classes & HIDDEN_CLASSES:
+        return True
+    style = (element.get('style') or '').replace(' ', '').lower()
+    return 'display:none' in style or 'visibility:hidden' in style
+
+
+def _collect_text(element, parts):
+    """Append the rendered text of element (without its tail) to parts"""
+    tag = element.tag if isinstance(element.tag, str) else None
+    if tag is None or tag in SKIP_TAGS or _is_hidden(element):
+        return
+
+    block = tag in BLOCK_TAGS
+    if block:
+        parts.append('\n')
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+    if block:
+        parts.append('\n')
+
+
+def observer(*sinks):
+    """Callback reporting each selector lookup to every sink that is set"""
+    sinks = [sink for sink in sinks if sink is not None]
+    if not sinks:
+        return None
+
+    def observe(field, selector, hit, seconds):
+        for sink in sinks:
+            sink.record_selector(field, selector, hit, seconds)
+    return observe
+
+
+def section_label(spec):
+    """Name a section field's item lookup is recorded under"""
+    return f"#{spec['anchor']} {spec['item']}"
+
+
+def finish_value(spec, raw):
+    """Post-process the raw text found for a field (shared with page_script.py)"""
+    if raw is None:
+        return NOT_AVAILABLE
+    match = spec['match']
+    if match == 'text':
+        return normalize_whitespace(raw)
+    if match == 'section':
+        return _summarize_item(spec, raw[0]) if raw else NOT_AVAILABLE
+    return clean_text(raw)
+
+
+def _summarize_item(spec, item):
+    """Join the summary columns of a section item with ' | '"""
+    parts = [item['columns'].get(column) for column in spec['summary']]
+    if parts[0] is not None:
+        joined = [p for p in parts if p]
+        if joined:
+            return " | ".join(joined)
+
+    # Fallback to full text
+    return clean_text(item['full'])
+
+
+def history_rows(spec, raw, url):
+    """One history row per item of a section (shared with page_script.py)"""
+    rows = []
+    for position, item in enumerate(raw or []):
+        row = {'profile_url': url, 'section': spec['field'], 'position': position}
+        for column, _, _ in spec['columns']:
+            row[column] = clean_text(item['columns'].get(column))
+        if all(row[column] == NOT_AVAILABLE for column, _, _ in spec['columns']):
+            row['title'] = clean_text(item['full'])
+        rows.append(row)
+    return rows
+
+
+def _match_selectors(document, spec, selectors, observe=None):
+    """Raw text of the first selector in the fallback list that matches"""
+    field = spec['field']
+    keyword = spec.get('keyword')
+    for selector in selectors:
+        start = time.perf_counter()
+        raw = None
+        if spec['match'] == 'count':
+            for element in document.find_all(selector):
+                text = document.text(element).strip()
+                if not text or not any(char.isdigit() for char in text):
+                    continue
+                if keyword and keyword not in text.lower():
+                    continue
+                raw = text
+                break
+        else:
+            element = document.find(selector)
+            text = document.text(element).strip() if element is not None else ""
+            raw = text or None
+        if observe:
+            observe(field, selector, raw is not None, time.perf_counter() - start)
+        if raw is not None:
+            return raw
+    return None
+
+
+def _match_section(document, spec, observe=None):
+    """Column texts of every item in a section, or None if it has no items"""
+    start = time.perf_counter()
+    items = []
+    anchor = document.find_by_id(spec['anchor'])
+    container = document.parent(anchor) if anchor is not None else None
+    if container is not None:
+        items = document.find_all(spec['item'], container)
+    if observe:
+        observe(spec['field'], section_label(spec), bool(items), time.perf_counter() - start)
+    if not items:
+        return None
+
+    results = []
+    for item in items:
+        columns = {}
+        matches = {}
+        for column, selector, index in spec['columns']:
+            if selector not in matches:
+                matches[selector] = document.find_all(selector, item)
+            elements = matches[selector]
+            columns[column] = document.text(elements[index]).strip() if index < len(elements) else None
+        results.append({'columns': columns, 'full': document.text(item).strip()})
+    return results
+
+
+def ordered_selectors(spec, selector_stats=None):
+    """A field's fallback list, in learned order when stats are available"""
+    if selector_stats is None:
+        return spec['selectors']
+    return selector_stats.order(spec['field'], spec['selectors'])
+
+
+def record_field(profile_data, field, value, seconds, timings=None, metrics=None, selector_stats=None):
+    """Store a field value and report its timing and outcome"""
+    profile_data[field] = value
+    if timings is not None:
+        timings[field] = seconds
+    if metrics is not None:
+        metrics.record_field(field, seconds)
+    if selector_stats is not None:
+        selector_stats.record_field(field, value != NOT_AVAILABLE)
+
+
+def extract_fields(document, url, timings=None, metrics=None, selector_stats=None, fields=None):
+    """
+    Build the profile dict for url from a document by interpreting
+    FIELD_SPECS, with the section history rows under HISTORY_KEY. If a
+    timings dict is given, it is filled with the seconds spent on each field;
+    a RunMetrics also gets field timings and which selectors matched. With a
+    SelectorStats, each fallback list is tried in its learned order. If
+    fields is given, only those fields are looked up and the rest stay N/A.
+    """
+    profile_data = {field: NOT_AVAILABLE for field in PROFILE_FIELDS}
+    profile_data['url'] = url
+    profile_data[HISTORY_KEY] = []
+    observe = observer(metrics, selector_stats)
+
+    for spec in FIELD_SPECS:
+        if fields is not None and spec['field'] not in fields:
+            continue
+        start = time.perf_counter()
+        if spec['match'] == 'section':
+            raw = _match_section(document, spec, observe)
+            profile_data[HISTORY_KEY].extend(history_rows(spec, raw, url))
+        else:
+            raw = _match_selectors(document, spec, ordered_selectors(spec, selector_stats), observe)
+        value = finish_value(spec, raw)
+        record_field(profile_data, spec['field'], value, time.perf_counter() - start,
+                     timings, metrics, selector_stats)
+
+    return profile_data
+
+
+def extract_profile_from_html(html, url):
+    """Extract profile data from saved page HTML without a browser"""
+    return extract_fields(HtmlDocument(html), url)
+
+
+def main():
+    """Extract a saved profile page: python extractor.py page.html [url]"""
+    if len(sys.argv) < 2:
+        print("Usage: python extractor.py <saved_page.html> [profile_url]")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    url = sys.argv[2] if len(sys.argv) > 2 else path
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+
+    print(json.dumps(extract_profile_from_html(html, url), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
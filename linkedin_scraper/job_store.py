@@ -0,0 +1,206 @@
+"""
+Resumable job store
+Records every URL's state and result in SQLite as soon as it is known, so an
+interrupted run resumes with only the unfinished URLs.
+"""
+
+import json
+import time
+import sqlite3
+import threading
+import config
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+AUTHWALL = "authwall"
+PARTIAL = "partial"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    url TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_position ON jobs(position);
+"""
+
+
+class JobStore:
+    """SQLite-backed state of every URL in a scrape"""
+
+    def __init__(self, path=None):
+        self.path = path or config.JOB_STORE_DB
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def add_urls(self, urls, batch_size=1000):
+        """Queue new URLs in input order; URLs already in the store are kept as they are"""
+        added = 0
+        with self._lock:
+            position = self.conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM jobs").fetchone()[0]
+            batch = []
+            for url in urls:
+                batch.append((url, position))
+                position += 1
+                if len(batch) >= batch_size:
+                    added += self._insert(batch)
+                    batch = []
+            if batch:
+                added += self._insert(batch)
+        return added
+
+    def _insert(self, batch):
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs (url, position, updated_at) VALUES (?, ?, ?)",
+                [(url, position, time.time()) for url, position in batch],
+            )
+        return cursor.rowcount
+
+    def iter_pending(self, max_attempts=None, page_size=500):
+        """
+        Yield unfinished URLs in input order. URLs that fail come round again
+        in further passes until they succeed or reach max_attempts.
+        """
+        if max_attempts is None:
+            max_attempts = config.MAX_ATTEMPTS
+
+        # First pass also picks up URLs left running by an interrupted run
+        state_filter = "state != 'done'"
+        last_position = -1
+        yielded = False
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT url, position FROM jobs WHERE {state_filter} "
+                    "AND attempts < ? AND position > ? ORDER BY position LIMIT ?",
+                    (max_attempts, last_position, page_size),
+                ).fetchall()
+
+            if not rows:
+                if not yielded:
+                    return
+                # Retry pass over URLs that failed or ran out of time. Authwalled
+                # ones wait for the next run: retrying them now only tells the
+                # pacer the session is gone
+                state_filter = "state IN ('failed', 'partial')"
+                last_position = -1
+                yielded = False
+                continue
+
+            for url, position in rows:
+                last_position = position
+                yielded = True
+                yield url
+
+    def count_pending(self, max_attempts=None):
+        """Number of URLs that still need scraping"""
+        if max_attempts is None:
+            max_attempts = config.MAX_ATTEMPTS
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state != ? AND attempts < ?",
+                (DONE, max_attempts),
+            ).fetchone()[0]
+
+    def counts(self):
+        """Number of URLs in each state"""
+        with self._lock:
+            rows = self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+    def reset(self):
+        """
+        Start a new run over the same URLs: every job goes back to pending
+        with no attempts and no stored result. Returns the number reset.
+        """
+        with self._lock, self.conn:
+            return self.conn.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, result = NULL, error = NULL, updated_at = ?",
+                (PENDING, time.time()),
+            ).rowcount
+
+    def mark_started(self, url):
+        """Count an attempt before scraping, so a URL that kills the browser can't loop forever"""
+        self._update(url, "state = ?, attempts = attempts + 1", (RUNNING,))
+
+    def mark_done(self, url, profile_data):
+        """Store the extracted profile"""
+        self._update(url, "state = ?, result = ?, error = NULL", (DONE, json.dumps(profile_data, ensure_ascii=False)))
+
+    def mark_failed(self, url, error):
+        """
+        Record a failed attempt. A partial result from an earlier attempt is
+        kept and the URL stays partial; returns that profile, or None.
+        """
+        self._update(
+            url, "state = CASE WHEN result IS NULL THEN ? ELSE ? END, error = ?", (FAILED, PARTIAL, str(error))
+        )
+        with self._lock:
+            row = self.conn.execute("SELECT result FROM jobs WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def mark_partial(self, url, profile_data, error):
+        """Store the fields found before the deadline; the URL stays up for retry"""
+        self._update(
+            url, "state = ?, result = ?, error = ?",
+            (PARTIAL, json.dumps(profile_data, ensure_ascii=False), str(error)),
+        )
+
+    def was_partial(self, url):
+        """
+        Whether the stored result is left from an attempt that ran out of
+        time (it came with an error instead of being marked done)
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT result IS NOT NULL AND error IS NOT NULL FROM jobs WHERE url = ?", (url,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def attempts(self, url):
+        """Attempts made so far for a URL"""
+        with self._lock:
+            row = self.conn.execute("SELECT attempts FROM jobs WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else 0
+
+    def mark_authwall(self, url):
+        """Record that LinkedIn showed the authwall/login page"""
+        self._update(url, "state = ?, error = ?", (AUTHWALL, "Redirected to login"))
+
+    def _update(self, url, assignments, params):
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE url = ?",
+                params + (time.time(), url),
+            )
+
+    def results(self, page_size=500):
+        """Yield stored profiles in input order, partial ones included"""
+        last_position = -1
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT position, result FROM jobs WHERE state IN (?, ?) AND position > ? "
+                    "ORDER BY position LIMIT ?",
+                    (DONE, PARTIAL, last_position, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for position, result in rows:
+                last_position = position
+                yield json.loads(result)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self.conn.close()
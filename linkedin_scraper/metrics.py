@@ -0,0 +1,211 @@
+"""
+Run instrumentation
+Records per-phase and per-field timings, which selector in each fallback list
+matched, selector misses and NoSuchElementException counts, and exports them
+as a JSON run report and a Prometheus textfile.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = "linkedin_scraper"
+
+# Per-profile latency percentiles in the run report
+PERCENTILES = (50, 95, 99)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class _Timing:
+    """Count / sum / max of a series of durations"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+        }
+
+
+class RunMetrics:
+    """Thread-safe metrics for one scraper run (shared by pool workers)"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.phases = {}
+        self.fields = {}
+        self.selector_hits = {}
+        self.selector_misses = {}
+        self.no_such_element = 0
+        self.outcomes = {}
+        self.profile_times = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one occurrence of a phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(name, time.perf_counter() - start)
+
+    def record_phase(self, name, seconds):
+        with self._lock:
+            self.phases.setdefault(name, _Timing()).add(seconds)
+
+    def record_field(self, field, seconds):
+        with self._lock:
+            self.fields.setdefault(field, _Timing()).add(seconds)
+
+    def record_selector(self, field, selector, hit, seconds=None):
+        """Count a selector that matched (hit) or was tried without success"""
+        with self._lock:
+            counts = self.selector_hits if hit else self.selector_misses
+            per_field = counts.setdefault(field, {})
+            per_field[selector] = per_field.get(selector, 0) + 1
+
+    def record_no_such_element(self):
+        with self._lock:
+            self.no_such_element += 1
+
+    def record_profile(self, seconds, outcome):
+        with self._lock:
+            self.profile_times.append(seconds)
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def to_dict(self):
+        """JSON-serializable run report"""
+        with self._lock:
+            selectors = {}
+            for field in sorted(set(self.selector_hits) | set(self.selector_misses)):
+                hits = self.selector_hits.get(field, {})
+                misses = self.selector_misses.get(field, {})
+                selectors[field] = {
+                    selector: {"hits": hits.get(selector, 0), "misses": misses.get(selector, 0)}
+                    for selector in list(dict.fromkeys(list(hits) + list(misses)))
+                }
+            return {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "elapsed": round(time.time() - self.started, 3),
+                "profiles": {
+                    "total": len(self.profile_times),
+                    "outcomes": dict(self.outcomes),
+                    "seconds": round(sum(self.profile_times), 3),
+                    "latency": self._latency(),
+                },
+                "phases": {name: timing.as_dict() for name, timing in self.phases.items()},
+                "fields": {name: timing.as_dict() for name, timing in self.fields.items()},
+                "selectors": selectors,
+                "no_such_element": self.no_such_element,
+            }
+
+    def _latency(self):
+        """p50/p95/p99/max seconds per profile (caller holds the lock)"""
+        latency = {}
+        for pct in PERCENTILES:
+            value = percentile(self.profile_times, pct)
+            latency[f"p{pct}"] = None if value is None else round(value, 3)
+        latency["max"] = round(max(self.profile_times), 3) if self.profile_times else None
+        return latency
+
+    def dead_selectors(self):
+        """(field, selector) pairs that were tried but never matched"""
+        report = self.to_dict()["selectors"]
+        return [
+            (field, selector)
+            for field, selectors in report.items()
+            for selector, counts in selectors.items()
+            if counts["hits"] == 0 and counts["misses"] > 0
+        ]
+
+    def write_json(self, path):
+        """Write the run report as JSON"""
+        _write_atomic(path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, path):
+        """Write the metrics in Prometheus textfile-collector format"""
+        report = self.to_dict()
+        p = PROMETHEUS_PREFIX
+        lines = []
+
+        lines.append(f"# HELP {p}_profiles_total Profiles processed, by outcome")
+        lines.append(f"# TYPE {p}_profiles_total counter")
+        for outcome, count in report["profiles"]["outcomes"].items():
+            lines.append(f'{p}_profiles_total{{outcome="{_escape_label(outcome)}"}} {count}')
+
+        metric = f"{p}_profile_seconds"
+        lines.append(f"# HELP {metric} Time per profile")
+        lines.append(f"# TYPE {metric} summary")
+        for pct in PERCENTILES:
+            value = report["profiles"]["latency"][f"p{pct}"]
+            if value is not None:
+                lines.append(f'{metric}{{quantile="{pct / 100}"}} {value}')
+        lines.append(f'{metric}_sum {report["profiles"]["seconds"]}')
+        lines.append(f'{metric}_count {report["profiles"]["total"]}')
+
+        for kind, label in (("phases", "phase"), ("fields", "field")):
+            metric = f"{p}_{label}_seconds"
+            lines.append(f"# HELP {metric} Time spent per {label}")
+            lines.append(f"# TYPE {metric} summary")
+            for name, timing in report[kind].items():
+                name = _escape_label(name)
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {timing["total"]}')
+                lines.append(f'{metric}_count{{{label}="{name}"}} {timing["count"]}')
+
+        for kind in ("hits", "misses"):
+            metric = f"{p}_selector_{kind}_total"
+            lines.append(f"# HELP {metric} Selector {kind} per field")
+            lines.append(f"# TYPE {metric} counter")
+            for field, selectors in report["selectors"].items():
+                for selector, counts in selectors.items():
+                    lines.append(
+                        f'{metric}{{field="{_escape_label(field)}",selector="{_escape_label(selector)}"}} {counts[kind]}'
+                    )
+
+        lines.append(f"# HELP {p}_no_such_element_total NoSuchElementException raised by live lookups")
+        lines.append(f"# TYPE {p}_no_such_element_total counter")
+        lines.append(f"{p}_no_such_element_total {report['no_such_element']}")
+
+        _write_atomic(path, "\n".join(lines) + "\n")
+
+    def export(self, json_path=None, prometheus_path=None):
+        """Write whichever report files are configured"""
+        if json_path:
+            self.write_json(json_path)
+        if prometheus_path:
+            self.write_prometheus(prometheus_path)
@@ -0,0 +1,215 @@
+"""
+Typed normalization
+Turns the scraped display strings into typed columns before they are
+written: "500+ connections" -> connections_count 500, connections_capped
+True; "Jan 2020 - Present · 4 yrs 3 mos" -> start_date "2020-01",
+is_current True, duration_months 51. Records are normalized a chunk at a
+time, one column at a time, parsing each distinct string once (the same
+"500+" or "2016 - 2020" repeats across thousands of rows).
+"""
+
+import re
+import time
+import datetime
+from extractor import NOT_AVAILABLE, HISTORY_KEY
+
+# Profile columns holding a count, and the typed columns derived from each
+COUNT_FIELDS = ['followers', 'connections']
+COUNT_COLUMNS = [column for field in COUNT_FIELDS for column in (f"{field}_count", f"{field}_capped")]
+
+# Typed columns derived from a history row's "dates" caption
+DATE_COLUMNS = ['start_date', 'end_date', 'is_current', 'duration_months']
+
+# Compact column types for columnar formats (everything else is a string)
+COLUMN_TYPES = {
+    'followers_count': 'int32',
+    'followers_capped': 'bool',
+    'connections_count': 'int32',
+    'connections_capped': 'bool',
+    'position': 'int16',
+    'section': 'category',
+    'start_date': 'date',
+    'end_date': 'date',
+    'is_current': 'bool',
+    'duration_months': 'int16',
+}
+
+COUNT_PATTERN = re.compile(r"(\d[\d,.\s]*)\s*(?:([km])(?![a-z]))?\s*(\+)?", re.IGNORECASE)
+THOUSANDS_PATTERN = re.compile(r"^\d{1,3}([,.\s]\d{3})+$")
+DATE_PATTERN = re.compile(r"(?:([a-z]{3,9})\.?\s+)?((?:19|20)\d{2})", re.IGNORECASE)
+RANGE_SEPARATOR = re.compile(r"\s+(?:-|–|—|to)\s+|\s*[–—]\s*")
+YEARS_PATTERN = re.compile(r"(\d+)\s*(?:yrs?|years?)\b", re.IGNORECASE)
+MONTHS_PATTERN = re.compile(r"(\d+)\s*(?:mos?|months?)\b", re.IGNORECASE)
+PRESENT_WORDS = ('present', 'current', 'now')
+
+MONTHS = {name: index for index, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1
+)}
+
+
+def _is_missing(text):
+    return text is None or text == "" or text == NOT_AVAILABLE
+
+
+def parse_count(text):
+    """
+    (count, capped) from a count caption: "1,234,567 followers" -> (1234567, False),
+    "500+ connections" -> (500, True), "12K followers" -> (12000, False).
+    (None, None) when there is no number.
+    """
+    if _is_missing(text):
+        return None, None
+    match = COUNT_PATTERN.search(str(text))
+    if not match:
+        return None, None
+    digits, suffix, plus = match.groups()
+    digits = digits.strip().rstrip(",.")
+
+    if THOUSANDS_PATTERN.match(digits):
+        number = float(re.sub(r"\D", "", digits))
+    else:
+        # "1.2K" / "1,2K": the separator is a decimal point
+        try:
+            number = float(re.sub(r"\s", "", digits).replace(",", "."))
+        except ValueError:
+            return None, None
+    if suffix:
+        number *= 1000 if suffix.lower() == 'k' else 1000000
+    return int(round(number)), bool(plus)
+
+
+def _parse_month(text):
+    """(year, month) of "Mar 2018" / "2018" (month None), or None"""
+    match = DATE_PATTERN.search(text)
+    if not match:
+        return None
+    month_name, year = match.groups()
+    month = MONTHS.get(month_name[:3].lower()) if month_name else None
+    return int(year), month
+
+
+def _iso(date):
+    year, month = date
+    return f"{year:04d}-{month:02d}" if month else f"{year:04d}"
+
+
+def _months_between(start, end):
+    """
+    Inclusive month count from start to end, each a (year, month) pair or a
+    plain year. A year without a month covers the whole year, so
+    "2019 - 2020" is 24 months and "2019" alone is 12.
+    """
+    (start_year, start_month), (end_year, end_month) = _as_date(start), _as_date(end)
+    return (end_year - start_year) * 12 + (end_month or 12) - (start_month or 1) + 1
+
+
+def _as_date(value):
+    """(year, month) of a (year, month) pair or an int year"""
+    if isinstance(value, int):
+        return value, None
+    year, month = value
+    return int(year), month
+
+
+def parse_dates(text, today=None):
+    """
+    Typed columns of a dates caption: "Mar 2018 - Dec 2019 · 1 yr 10 mos" ->
+    start_date "2018-03", end_date "2019-12", is_current False,
+    duration_months 22. Year-only dates stay year-only ("2016").
+    """
+    columns = dict.fromkeys(DATE_COLUMNS)
+    if _is_missing(text):
+        return columns
+
+    range_text, _, duration_text = str(text).partition("·")
+    parts = RANGE_SEPARATOR.split(range_text.strip(), maxsplit=1)
+    start = _parse_month(parts[0])
+    if start is None:
+        return columns
+    columns['start_date'] = _iso(start)
+
+    end = None
+    if len(parts) > 1:
+        if parts[1].strip().lower().startswith(PRESENT_WORDS):
+            columns['is_current'] = True
+            today = today or time.localtime()
+            end = (today.tm_year, today.tm_mon)
+        else:
+            end = _parse_month(parts[1])
+            if end is not None:
+                columns['end_date'] = _iso(end)
+                columns['is_current'] = False
+    else:
+        # A single date is a one-month (or one-year) entry
+        end = start
+        columns['end_date'] = columns['start_date']
+        columns['is_current'] = False
+
+    years = YEARS_PATTERN.search(duration_text)
+    months = MONTHS_PATTERN.search(duration_text)
+    if years or months:
+        columns['duration_months'] = (int(years.group(1)) * 12 if years else 0) + (int(months.group(1)) if months else 0)
+    elif end is not None:
+        duration = _months_between(start, end)
+        if duration > 0:
+            columns['duration_months'] = duration
+    return columns
+
+
+def normalize_profiles(records, nested=False):
+    """
+    Copies of a chunk of profile records with the typed count columns added
+    (and the date columns on their nested history rows, if nested)
+    """
+    records = [dict(record) for record in records]
+    for field in COUNT_FIELDS:
+        values = [record.get(field) for record in records]
+        parsed = {value: parse_count(value) for value in set(values)}
+        for record, value in zip(records, values):
+            record[f"{field}_count"], record[f"{field}_capped"] = parsed[value]
+
+    if nested:
+        for record in records:
+            if record.get(HISTORY_KEY):
+                record[HISTORY_KEY] = normalize_history(record[HISTORY_KEY])
+    return records
+
+
+def normalize_history(rows, today=None):
+    """Copies of a chunk of history rows with the typed date columns added"""
+    today = today or time.localtime()
+    values = [row.get('dates') for row in rows]
+    parsed = {value: parse_dates(value, today) for value in set(values)}
+    return [dict(row, **parsed[value]) for row, value in zip(rows, values)]
+
+
+def arrow_type(pyarrow, field):
+    """Compact Arrow type of a column"""
+    kind = COLUMN_TYPES.get(field)
+    if kind == 'int32':
+        return pyarrow.int32()
+    if kind == 'int16':
+        return pyarrow.int16()
+    if kind == 'bool':
+        return pyarrow.bool_()
+    if kind == 'date':
+        return pyarrow.date32()
+    if kind == 'category':
+        return pyarrow.dictionary(pyarrow.int8(), pyarrow.string())
+    return pyarrow.string()
+
+
+def arrow_value(field, value):
+    """A column value converted for its Arrow type"""
+    if value is None:
+        return None
+    kind = COLUMN_TYPES.get(field)
+    if kind in ('int32', 'int16'):
+        return int(value)
+    if kind == 'bool':
+        return bool(value)
+    if kind == 'date':
+        # Month / year precision is stored as the first day of the period
+        year, _, month = str(value).partition("-")
+        return datetime.date(int(year), int(month or 1), 1)
+    return str(value)
@@ -0,0 +1,146 @@
+"""
+Adaptive pacing
+A token bucket spaces profile loads at the configured rate (shared by every
+worker or tab), and backs off exponentially when LinkedIn shows throttling
+signals: authwall/login redirects, HTTP 429/999 responses, pages that never
+loaded and empty extractions. Pages that loaded but never went quiet are
+counted separately and don't slow the run down.
+Several authwalls in a row mean the session is no longer valid, so the run is
+paused (and eventually stopped) instead of burning through the remaining URLs.
+Every decision is printed and appended to a JSONL log.
+"""
+
+import json
+import time
+import random
+import threading
+import config
+
+# Signals reported after each profile load
+SIGNAL_OK = "ok"
+SIGNAL_AUTHWALL = "authwall"
+SIGNAL_TIMEOUT = "timeout"
+SIGNAL_EMPTY = "empty"
+SIGNAL_ERROR = "error"
+SIGNAL_THROTTLED = "throttled"  # HTTP 429/999
+SIGNAL_NOT_QUIET = "not_quiet"  # Loaded, but the DOM kept changing until the timeout
+SIGNAL_PARTIAL = "partial"  # Ran out of its time budget
+
+THROTTLE_SIGNALS = (SIGNAL_AUTHWALL, SIGNAL_THROTTLED, SIGNAL_TIMEOUT, SIGNAL_EMPTY)
+
+
+class PacingScheduler:
+    """Token-bucket pacing with exponential backoff (thread-safe)"""
+
+    def __init__(self, rate_per_minute=None, burst=None, log_path=None):
+        if rate_per_minute is None:
+            rate_per_minute = 60 / max(config.WAIT_TIME, 0.001)
+        if config.PACING_MAX_RATE_PER_MINUTE:
+            rate_per_minute = min(rate_per_minute, config.PACING_MAX_RATE_PER_MINUTE)
+        self.rate = rate_per_minute / 60
+        self.burst = burst or config.PACING_BURST
+        self.log_path = config.PACING_LOG if log_path is None else log_path
+
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+        self.throttled = 0
+        self.authwalls = 0
+        self.pauses = 0
+        self.stopped = False
+        self.decisions = {}
+        self._lock = threading.Lock()
+
+    def _log(self, event, message, echo=True, **details):
+        """Print a pacing decision and append it to the log"""
+        self.decisions[event] = self.decisions.get(event, 0) + 1
+        if echo:
+            print(f"   ⏱️ Pacing: {message}")
+        if not self.log_path:
+            return
+        entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "event": event, **details}
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
+
+    def reserve(self):
+        """
+        Take one token for the next profile load and return how many seconds
+        the caller must wait before loading it (backoff and pauses included).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(delay, self.resume_at - now)
+
+    def wait(self):
+        """Block until the next profile load is allowed; returns the seconds waited"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def record(self, signal):
+        """Adjust the pace after a profile load"""
+        with self._lock:
+            if signal == SIGNAL_NOT_QUIET:
+                # The page loaded, so LinkedIn answered normally
+                self._log(SIGNAL_NOT_QUIET, "page loaded but never went quiet", echo=False)
+                signal = SIGNAL_OK
+            if signal == SIGNAL_OK:
+                if self.throttled:
+                    self._log("recovered", f"responses look normal again after {self.throttled} throttled loads")
+                self.throttled = 0
+                self.authwalls = 0
+                return
+            if signal not in THROTTLE_SIGNALS:
+                return
+
+            self.throttled += 1
+            self.authwalls = self.authwalls + 1 if signal == SIGNAL_AUTHWALL else 0
+
+            if self.authwalls >= config.PACING_AUTHWALL_LIMIT:
+                self._session_invalid()
+                return
+
+            backoff = min(config.PACING_MAX_BACKOFF, config.PACING_BACKOFF_BASE * 2 ** (self.throttled - 1))
+            backoff *= random.uniform(1.0, 1.0 + config.PACING_JITTER)
+            self.resume_at = max(self.resume_at, time.monotonic() + backoff)
+            self._log(
+                "backoff",
+                f"{signal} ({self.throttled} in a row), backing off {backoff:.0f}s",
+                signal=signal, streak=self.throttled, seconds=round(backoff, 1),
+            )
+
+    def _session_invalid(self):
+        """Pause the run after repeated authwalls, or stop it once pauses are used up"""
+        if self.pauses < config.PACING_MAX_PAUSES and config.PACING_SESSION_PAUSE > 0:
+            self.pauses += 1
+            self.resume_at = time.monotonic() + config.PACING_SESSION_PAUSE
+            # One more authwall after the pause triggers the next pause
+            self.authwalls = config.PACING_AUTHWALL_LIMIT - 1
+            self._log(
+                "pause",
+                f"{config.PACING_AUTHWALL_LIMIT} authwalls in a row, session looks invalid - "
+                f"pausing {config.PACING_SESSION_PAUSE}s ({self.pauses}/{config.PACING_MAX_PAUSES})",
+                seconds=config.PACING_SESSION_PAUSE, pause=self.pauses,
+            )
+            return
+
+        self.stopped = True
+        self._log(
+            "stop",
+            "session still redirects to the login page - stopping the run. "
+            "Run setup.py again, then re-run to resume.",
+        )
+
+    def summary(self):
+        """One-line summary of the decisions made this run"""
+        if not self.decisions:
+            return "no throttling seen"
+        return ", ".join(f"{event} x{count}" for event, count in sorted(self.decisions.items()))
@@ -0,0 +1,153 @@
+"""
+Batched in-page extraction
+Compiles the declarative FIELD_SPECS from extractor.py into a single
+JavaScript function that runs every field lookup inside the page and
+returns the raw texts, including every experience / education item, in one
+execute_script round trip. Post-processing happens in Python with the same
+code as the offline extractor, so adding a field to the spec never adds
+WebDriver calls.
+"""
+
+import json
+from functools import lru_cache
+from extractor import (
+    FIELD_SPECS, HISTORY_KEY, NOT_AVAILABLE, PROFILE_FIELDS,
+    finish_value, history_rows, observer, ordered_selectors, record_field, section_label,
+)
+
+# arguments[0]: {field: [selectors in the order to try]}
+# Returns {field: {"raw": ..., "tries": [[selector, hit, seconds], ...], "seconds": ...}}
+SCRIPT_TEMPLATE = """
+const SPECS = %s;
+const orders = arguments[0] || {};
+const now = () => performance.now() / 1000;
+const textOf = (el) => (el && el.innerText ? el.innerText : '').trim();
+
+function matchSelectors(spec, tries) {
+    for (const selector of (orders[spec.field] || spec.selectors)) {
+        const start = now();
+        let raw = null;
+        try {
+            if (spec.match === 'count') {
+                for (const el of document.querySelectorAll(selector)) {
+                    const text = textOf(el);
+                    if (!text || !/\\d/.test(text)) continue;
+                    if (spec.keyword && !text.toLowerCase().includes(spec.keyword)) continue;
+                    raw = text;
+                    break;
+                }
+            } else {
+                raw = textOf(document.querySelector(selector)) || null;
+            }
+        } catch (e) {
+            raw = null;
+        }
+        tries.push([selector, raw !== null, now() - start]);
+        if (raw !== null) return raw;
+    }
+    return null;
+}
+
+function matchSection(spec, tries) {
+    const start = now();
+    const anchor = document.getElementById(spec.anchor);
+    const container = anchor ? anchor.parentElement : null;
+    const items = container ? Array.from(container.querySelectorAll(spec.item)) : [];
+    tries.push([spec.label, items.length > 0, now() - start]);
+    if (!items.length) return null;
+    return items.map((item) => {
+        const matches = {};
+        const columns = {};
+        for (const [column, selector, index] of spec.columns) {
+            if (!(selector in matches)) matches[selector] = item.querySelectorAll(selector);
+            const el = matches[selector][index];
+            columns[column] = el ? textOf(el) : null;
+        }
+        return {columns: columns, full: textOf(item)};
+    });
+}
+
+const results = {};
+for (const spec of SPECS) {
+    const start = now();
+    const tries = [];
+    const raw = spec.match === 'section' ? matchSection(spec, tries) : matchSelectors(spec, tries);
+    results[spec.field] = {raw: raw, tries: tries, seconds: now() - start};
+}
+return results;
+"""
+
+
+def compile_script(specs=None):
+    """JavaScript source that extracts every field in specs in one call"""
+    compiled = []
+    for spec in specs or FIELD_SPECS:
+        spec = dict(spec)
+        if spec['match'] == 'section':
+            spec['label'] = section_label(spec)
+        compiled.append(spec)
+    return SCRIPT_TEMPLATE % json.dumps(compiled)
+
+
+PROFILE_SCRIPT = compile_script()
+
+
+def _wanted(spec, fields):
+    return fields is None or spec['field'] in fields
+
+
+@lru_cache(maxsize=None)
+def _fields_script(fields):
+    return compile_script([spec for spec in FIELD_SPECS if spec['field'] in fields])
+
+
+def script_for(fields=None):
+    """Compiled script for only the given fields (every field if None); compiled once per field set"""
+    if fields is None:
+        return PROFILE_SCRIPT
+    return _fields_script(frozenset(fields))
+
+
+def selector_orders(selector_stats=None, fields=None):
+    """Fallback order for every selector field (or only fields), passed to the script as arguments[0]"""
+    return {
+        spec['field']: ordered_selectors(spec, selector_stats)
+        for spec in FIELD_SPECS if spec['match'] != 'section' and _wanted(spec, fields)
+    }
+
+
+def script_expression(script, *args):
+    """Wrap an execute_script body as a standalone expression (for Runtime.evaluate)"""
+    return f"(function() {{{script}\n}}).apply(null, {json.dumps(list(args))})"
+
+
+def build_profile(results, url, timings=None, metrics=None, selector_stats=None, fields=None):
+    """Profile dict from the script's raw results, post-processed like extract_fields"""
+    observe = observer(metrics, selector_stats)
+    profile_data = {field: NOT_AVAILABLE for field in PROFILE_FIELDS}
+    profile_data['url'] = url
+    profile_data[HISTORY_KEY] = []
+    for spec in FIELD_SPECS:
+        if not _wanted(spec, fields):
+            continue
+        result = (results or {}).get(spec['field']) or {}
+        if spec['match'] == 'section':
+            profile_data[HISTORY_KEY].extend(history_rows(spec, result.get('raw'), url))
+        if observe:
+            for selector, hit, seconds in result.get('tries', []):
+                observe(spec['field'], selector, hit, seconds)
+        record_field(profile_data, spec['field'], finish_value(spec, result.get('raw')),
+                     result.get('seconds', 0.0), timings, metrics, selector_stats)
+
+    return profile_data
+
+
+def extract_in_page(driver, url, timings=None, metrics=None, selector_stats=None, fields=None):
+    """
+    Build the profile dict for url from the page open in driver, with a
+    single execute_script call. Takes the same optional timings, metrics,
+    selector_stats and fields as extract_fields; timings are measured inside
+    the page.
+    """
+    results = driver.execute_script(script_for(fields), selector_orders(selector_stats, fields))
+    return build_profile(results, url, timings, metrics, selector_stats, fields)
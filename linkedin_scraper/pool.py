@@ -0,0 +1,106 @@
+"""
+Parallel browser worker pool
+Runs several Chrome drivers side by side, each on its own clone of the
+logged-in profile, all pulling URLs from one shared work queue.
+"""
+
+import time
+import threading
+import config
+from profile_manager import ProfileManager
+
+
+class ScraperPool:
+    """Scrape URLs with N independent drivers fed from a shared queue"""
+
+    def __init__(self, scraper_factory, workers=None, worker_wait_time=None, profiles=None):
+        self.scraper_factory = scraper_factory
+        self.profiles = profiles
+        self.workers = workers or config.POOL_WORKERS
+        if worker_wait_time is None:
+            worker_wait_time = config.POOL_WORKER_WAIT_TIME
+        self.worker_wait_time = worker_wait_time
+        self._startup_lock = threading.Lock()
+        self._queue_lock = threading.Lock()
+        self._urls = iter(())
+        self._taken = 0
+        self._exhausted = False
+
+    def run(self, urls):
+        """
+        Scrape every URL from the iterable. Workers record their own results
+        through scraper.scrape_one, so nothing is collected here.
+        """
+        self._urls = iter(urls)
+        self._taken = 0
+        self._exhausted = False
+        print(f"\n🧵 Starting {self.workers} browser workers...")
+        if self.profiles is None:
+            self.profiles = ProfileManager()
+            self.profiles.cleanup_stale_clones()
+
+        threads = []
+        for worker_id in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker,
+                args=(worker_id,),
+                name=f"scraper-worker-{worker_id}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        if not self._exhausted:
+            print("\n Some profiles were not scraped (all workers stopped). Run again to resume.")
+
+    def _next_url(self):
+        """Take the next URL from the shared queue, or None when it is empty"""
+        with self._queue_lock:
+            url = next(self._urls, None)
+            if url is None:
+                self._exhausted = True
+            else:
+                self._taken += 1
+            return url, self._taken
+
+    def _worker(self, worker_id):
+        """Run one browser until the shared queue is empty"""
+        # Stagger startup so workers don't hit LinkedIn in lockstep
+        time.sleep(worker_id * self.worker_wait_time / max(1, self.workers))
+
+        profile_dir = None
+        scraper = None
+        try:
+            profile_dir = self.profiles.clone(f"w{worker_id}")
+            scraper = self.scraper_factory(profile_dir)
+            # ChromeDriver install/lookup is not safe to run concurrently; the
+            # scraper holds the lock for supervised restarts too
+            scraper.startup_lock = self._startup_lock
+            scraper.setup_driver()
+            scraper.open_feed()
+
+            url, number = self._next_url()
+            while url is not None:
+                print(f"\n[w{worker_id}] [{number}]", end=" ")
+                scraper.scrape_one(url)
+                if scraper.pacer and scraper.pacer.stopped:
+                    break
+
+                url, number = self._next_url()
+                if url is not None and not scraper.last_from_cache:
+                    # The pacer is shared, so all workers together stay within its rate
+                    if scraper.pacer:
+                        scraper.pacer.wait()
+                    else:
+                        time.sleep(self.worker_wait_time)
+
+        except Exception as e:
+            print(f"\n❌ Worker {worker_id} stopped: {str(e)}")
+        finally:
+            if scraper:
+                scraper.close()
+            if profile_dir:
+                self.profiles.release(profile_dir)
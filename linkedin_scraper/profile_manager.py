@@ -0,0 +1,247 @@
+"""
+Chrome profile manager
+Keeps a slimmed "golden" copy of the logged-in profile (only what the session
+needs: cookies, local/session storage and preferences, no caches, service
+workers or history) and hands out per-worker clones of it. Clones use
+reflinks (copy-on-write) where the filesystem supports them and hardlinks
+for files Chrome never modifies in place, so a clone takes well under a
+second instead of a full copy of a bloated profile. Clones left behind by
+crashed runs are removed automatically.
+
+Usage:
+    python profile_manager.py    # rebuild the golden profile and clean up stale clones
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import itertools
+import threading
+import config
+
+# Files Chrome uses to lock a profile to a single running browser
+PROFILE_LOCK_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie', 'lockfile')
+
+# Paths (relative to the user data dir) a logged-in session needs
+SESSION_PATHS = [
+    'Local State',  # holds the key cookies are encrypted with
+    'Default/Preferences',
+    'Default/Secure Preferences',
+    'Default/Cookies',
+    'Default/Cookies-journal',
+    'Default/Network',  # Cookies moved here in newer Chrome versions
+    'Default/Local Storage',
+    'Default/Session Storage',
+    'Default/IndexedDB',
+]
+
+# LevelDB table files are written once and only ever deleted, never modified,
+# so clones can share them through hardlinks
+IMMUTABLE_SUFFIXES = ('.ldb', '.sst')
+
+# Written into the golden profile when it is built; not copied to clones
+GOLDEN_STAMP = '.golden.json'
+
+# ioctl that makes dst share src's blocks (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+
+def _session_files(root, paths):
+    """Files under root that belong to the session paths"""
+    for path in paths:
+        full = os.path.join(root, path)
+        if os.path.isfile(full):
+            yield full
+        elif os.path.isdir(full):
+            for dirpath, _, filenames in os.walk(full):
+                for filename in filenames:
+                    if filename not in PROFILE_LOCK_FILES:
+                        yield os.path.join(dirpath, filename)
+
+
+def directory_size_mb(path):
+    """Total size of the files under path, in MB"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                continue
+    return total / 1024 / 1024
+
+
+def _pid_alive(pid):
+    """Whether a process is still running, or None if that can't be checked here"""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name == 'nt':
+        # os.kill(pid, 0) would terminate the process on Windows
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class ProfileManager:
+    """Golden profile plus fast per-worker clones (thread-safe)"""
+
+    _counter = itertools.count(1)
+
+    def __init__(self, source_dir=None, golden_dir=None, clone_dir=None, method=None):
+        self.source_dir = source_dir or config.USER_DATA_DIR
+        self.golden_dir = golden_dir or config.PROFILE_GOLDEN_DIR
+        self.clone_dir = clone_dir or config.PROFILE_CLONE_DIR
+        self.method = method or config.PROFILE_CLONE_METHOD
+        if self.method not in ("auto", "copy"):
+            raise Exception(f"Unknown PROFILE_CLONE_METHOD: {self.method}\nChoose one of: auto, copy")
+        self.session_paths = SESSION_PATHS + list(config.PROFILE_KEEP_EXTRA)
+        self._reflink_supported = self.method == "auto" and sys.platform.startswith("linux")
+        self._lock = threading.Lock()
+
+    def golden(self):
+        """Path of the golden profile, rebuilt if the source session changed since it was made"""
+        with self._lock:
+            if not os.path.isdir(self.source_dir):
+                raise Exception(
+                    f"Profile directory not found: {self.source_dir}\n"
+                    "Please run 'python setup.py' first to set up your browser session."
+                )
+            if self._golden_is_stale():
+                self._build_golden()
+            return self.golden_dir
+
+    def _golden_is_stale(self):
+        stamp = os.path.join(self.golden_dir, GOLDEN_STAMP)
+        if not os.path.exists(stamp):
+            return True
+        built = os.path.getmtime(stamp)
+        return any(os.path.getmtime(path) > built for path in _session_files(self.source_dir, self.session_paths))
+
+    def _build_golden(self):
+        """Copy only the session paths of the source profile into a fresh golden profile"""
+        start = time.perf_counter()
+        building = f"{self.golden_dir}.building-{os.getpid()}"
+        shutil.rmtree(building, ignore_errors=True)
+        for source in _session_files(self.source_dir, self.session_paths):
+            target = os.path.join(building, os.path.relpath(source, self.source_dir))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                shutil.copy2(source, target)
+            except OSError:
+                # Files Chrome deletes while we copy (journals) aren't needed
+                continue
+        os.makedirs(building, exist_ok=True)
+        with open(os.path.join(building, GOLDEN_STAMP), "w", encoding="utf-8") as f:
+            json.dump({"source": os.path.abspath(self.source_dir), "built": time.time()}, f)
+
+        shutil.rmtree(self.golden_dir, ignore_errors=True)
+        os.replace(building, self.golden_dir)
+        print(
+            f"   Golden profile: {directory_size_mb(self.golden_dir):.1f} MB "
+            f"(source {directory_size_mb(self.source_dir):.1f} MB), "
+            f"built in {time.perf_counter() - start:.1f}s"
+        )
+
+    def clone(self, name="worker"):
+        """A fresh private copy of the golden profile for one browser"""
+        golden = self.golden()
+        start = time.perf_counter()
+        os.makedirs(self.clone_dir, exist_ok=True)
+        target = os.path.join(self.clone_dir, f"{name}-{os.getpid()}-{next(self._counter)}")
+        shutil.rmtree(target, ignore_errors=True)
+
+        methods = {"reflink": 0, "hardlink": 0, "copy": 0}
+        for dirpath, _, filenames in os.walk(golden):
+            target_dir = os.path.join(target, os.path.relpath(dirpath, golden))
+            os.makedirs(target_dir, exist_ok=True)
+            for filename in filenames:
+                if filename == GOLDEN_STAMP:
+                    continue
+                method = self._clone_file(os.path.join(dirpath, filename), os.path.join(target_dir, filename))
+                methods[method] += 1
+
+        used = ", ".join(f"{count} {method}" for method, count in methods.items() if count)
+        print(f"   Profile clone ready in {time.perf_counter() - start:.2f}s ({used or 'empty'})")
+        return target
+
+    def _clone_file(self, source, target):
+        """Clone one file the cheapest safe way; returns the method used"""
+        if self._reflink_supported and self._reflink(source, target):
+            return "reflink"
+        if self.method == "auto" and source.endswith(IMMUTABLE_SUFFIXES):
+            try:
+                os.link(source, target)
+                return "hardlink"
+            except OSError:
+                pass
+        shutil.copy2(source, target)
+        return "copy"
+
+    def _reflink(self, source, target):
+        """Copy-on-write clone of a file; False (and stop trying) if unsupported"""
+        import fcntl
+
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, target)
+            return True
+        except OSError:
+            self._reflink_supported = False
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+            return False
+
+    def release(self, path):
+        """Delete a clone once its browser has quit"""
+        shutil.rmtree(path, ignore_errors=True)
+
+    def cleanup_stale_clones(self, max_age_hours=None):
+        """
+        Remove clones whose process is gone. Where that can't be checked,
+        clones older than max_age_hours are removed instead.
+        """
+        if max_age_hours is None:
+            max_age_hours = config.PROFILE_CLONE_MAX_AGE_HOURS
+        if not os.path.isdir(self.clone_dir):
+            return 0
+        removed = 0
+        cutoff = time.time() - max_age_hours * 3600
+        for entry in os.listdir(self.clone_dir):
+            path = os.path.join(self.clone_dir, entry)
+            try:
+                pid = int(entry.rsplit("-", 2)[1])
+            except (IndexError, ValueError):
+                continue
+            if pid == os.getpid():
+                continue
+            alive = _pid_alive(pid)
+            if alive is False or (alive is None and os.path.getmtime(path) < cutoff):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        if removed:
+            print(f"   Removed {removed} stale profile clone(s)")
+        return removed
+
+
+def main():
+    manager = ProfileManager()
+    manager.cleanup_stale_clones()
+    manager.golden()
+    print(f"Golden profile ready: {os.path.abspath(manager.golden_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Page readiness conditions
+Waits until the sections we extract exist and the DOM has stopped changing,
+instead of sleeping for a fixed time. Every wait has an upper bound.
+"""
+
+import config
+from extractor import NAME_SELECTORS
+
+# Elements that must exist before a profile counts as loaded
+TOP_CARD_SELECTOR = ", ".join(NAME_SELECTORS)
+PROFILE_READY_SELECTORS = ["main", TOP_CARD_SELECTOR]
+
+# Lazily rendered sections that scroll_page brings into view
+PROFILE_SECTION_IDS = ["experience", "education"]
+
+POLL_FREQUENCY = 0.2
+
+# How a wait for a page ended
+PAGE_READY = "ready"
+PAGE_LOGIN = "login"
+PAGE_THROTTLED = "throttled"  # LinkedIn answered 429 or 999
+PAGE_NOT_QUIET = "not_quiet"  # Loaded, but the DOM kept changing until the timeout
+PAGE_TIMEOUT = "timeout"  # Never loaded
+
+# HTTP statuses LinkedIn uses to turn away scrapers
+THROTTLE_STATUSES = (429, 999)
+THROTTLED_ERROR = "LinkedIn refused the page (HTTP 429/999)"
+
+# Installs a MutationObserver once per page and reports, in one round trip,
+# which selectors exist, how long the DOM has been unchanged and the HTTP
+# status of the page.
+READY_STATE_SCRIPT = """
+if (!window.__scraperObserver) {
+    window.__scraperLastMutation = performance.now();
+    window.__scraperObserver = new MutationObserver(function () {
+        window.__scraperLastMutation = performance.now();
+    });
+    window.__scraperObserver.observe(document, {childList: true, subtree: true, characterData: true});
+}
+return {
+    complete: document.readyState === 'complete',
+    present: arguments[0].map(function (s) { return document.querySelector(s) !== null; }),
+    quiet: (performance.now() - window.__scraperLastMutation) / 1000,
+    url: location.href,
+    status: (performance.getEntriesByType('navigation')[0] || {}).responseStatus || 0
+};
+"""
+
+# Scrolls one step towards a section: into view if it exists, otherwise one
+# viewport further down so lazy sections get rendered.
+SCROLL_TOWARDS_SCRIPT = """
+var section = document.getElementById(arguments[0]);
+if (section) {
+    section.scrollIntoView({block: 'center'});
+    return 'found';
+}
+var before = window.scrollY;
+window.scrollBy(0, window.innerHeight);
+return window.scrollY === before ? 'bottom' : 'scrolled';
+"""
+
+
+def is_login_url(url):
+    """Whether LinkedIn redirected to the authwall or login page"""
+    return "authwall" in url or "login" in url
+
+
+def is_loaded(state):
+    """Whether a READY_STATE_SCRIPT result has the document complete and every selector present"""
+    return state['complete'] and all(state['present'])
+
+
+def page_state(state, settle_time):
+    """PAGE_* for a READY_STATE_SCRIPT result once the wait can end, else None"""
+    if is_login_url(state['url']):
+        return PAGE_LOGIN
+    if state.get('status') in THROTTLE_STATUSES:
+        return PAGE_THROTTLED
+    if is_loaded(state) and state['quiet'] >= settle_time:
+        return PAGE_READY
+    return None
+
+
+def wait_for_page(driver, selectors, timeout, settle_time=None):
+    """
+    Wait until every selector exists and the DOM has been quiet for
+    settle_time seconds. Returns how the wait ended: PAGE_READY, PAGE_LOGIN,
+    PAGE_THROTTLED, or on timeout PAGE_NOT_QUIET (the page had loaded) or
+    PAGE_TIMEOUT.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+
+    if settle_time is None:
+        settle_time = config.DOM_SETTLE_TIME
+    seen = {'loaded': False}
+
+    def ready(driver):
+        state = driver.execute_script(READY_STATE_SCRIPT, list(selectors))
+        seen['loaded'] = is_loaded(state)
+        return page_state(state, settle_time) or False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(ready)
+    except (TimeoutException, WebDriverException):
+        return PAGE_NOT_QUIET if seen['loaded'] else PAGE_TIMEOUT
+
+
+def wait_until_ready(driver, selectors, timeout, settle_time=None):
+    """Whether the page became ready (see wait_for_page)"""
+    return wait_for_page(driver, selectors, timeout, settle_time) == PAGE_READY
+
+
+def wait_for_dom_quiet(driver, timeout, settle_time=None):
+    """Wait until the DOM has stopped changing, at most timeout seconds"""
+    return wait_until_ready(driver, [], timeout, settle_time)
+
+
+def scroll_to_sections(driver, section_ids=None, step_timeout=None, max_steps=15, deadline=None):
+    """
+    Scroll only as far as the sections we extract, waiting for the DOM to
+    settle after each step. Returns the ids of the sections that were found.
+    Stops early once the profile's Deadline is spent.
+    """
+    if section_ids is None:
+        section_ids = PROFILE_SECTION_IDS
+    if step_timeout is None:
+        step_timeout = config.SCROLL_PAUSE_TIME
+
+    found = []
+    steps = 0
+    for section_id in section_ids:
+        while steps < max_steps:
+            if deadline is not None and not deadline.allows("scroll"):
+                return found
+            steps += 1
+            status = driver.execute_script(SCROLL_TOWARDS_SCRIPT, section_id)
+            wait_for_dom_quiet(driver, step_timeout if deadline is None else deadline.cap(step_timeout))
+            if status == 'found':
+                found.append(section_id)
+                break
+            if status == 'bottom':
+                break
+    return found
@@ -0,0 +1,51 @@
+"""
+Rebuild the output from cached page snapshots
+Runs the current extractor over every snapshot in the cache without opening
+a browser, e.g. after fixing a selector.
+
+Usage: python reextract.py [csv|jsonl|parquet] [output_path]
+"""
+
+import os
+import sys
+import config
+from structured_data import extract_from_html
+from snapshot_cache import SnapshotCache
+from writers import export_records
+
+
+def reextract_profiles(cache):
+    """Yield a freshly extracted profile for every cached snapshot"""
+    for url, html, fetched_at in cache:
+        yield extract_from_html(html, url)
+
+
+def reextract(output_format=None, path=None):
+    """Re-extract every cached snapshot into the output file; returns the writer"""
+    if not os.path.exists(config.SNAPSHOT_CACHE_DIR):
+        raise Exception(f"Snapshot cache not found: {config.SNAPSHOT_CACHE_DIR}")
+
+    # Expired snapshots are still valid input for re-extraction
+    cache = SnapshotCache()
+    try:
+        print(f"\n🔁 Re-extracting {len(cache)} cached profiles...")
+        writer = export_records(reextract_profiles(cache), output_format, path)
+        print(f" Data saved to: {os.path.abspath(writer.path)}")
+        return writer
+    finally:
+        cache.close()
+
+
+def main():
+    """python reextract.py [csv|jsonl|parquet] [output_path]"""
+    output_format = sys.argv[1] if len(sys.argv) > 1 else config.OUTPUT_FORMAT
+    path = sys.argv[2] if len(sys.argv) > 2 else None
+    try:
+        reextract(output_format, path)
+    except Exception as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
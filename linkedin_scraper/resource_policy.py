@@ -0,0 +1,275 @@
+"""
+Request-level resource blocking
+Blocks images, media, fonts and tracking requests through the DevTools
+Fetch domain (extract_profile_data only ever reads text), and reports per
+page how many requests were made and blocked, and how many bytes were
+loaded and saved.
+"""
+
+import json
+import asyncio
+import threading
+from fnmatch import fnmatch
+import config
+
+# DevTools resource types behind each blockable type ("tracking" is matched by URL)
+RESOURCE_TYPES = {
+    'image': ["Image"],
+    'media': ["Media"],
+    'font': ["Font"],
+}
+
+# URL patterns (DevTools wildcard syntax) of tracking requests
+TRACKING_URL_PATTERNS = [
+    "*px.ads.linkedin.com/*",
+    "*snap.licdn.com/*",
+    "*linkedin.com/li/track*",
+    "*linkedin.com/sensorCollect*",
+    "*doubleclick.net/*",
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*bat.bing.com/*",
+    "*connect.facebook.net/*",
+]
+
+BLOCKED_ERROR_REASON = "BlockedByClient"
+
+
+def fetch_patterns():
+    """
+    Fetch.enable request patterns for the configured block list. Resource
+    types are paused once their response headers are in, so the size of
+    what is dropped is known; URL patterns are paused before the request
+    is sent, so tracking calls never leave the browser.
+    """
+    patterns = []
+    url_patterns = list(config.BLOCKED_URL_PATTERNS)
+    for blocked_type in config.BLOCKED_RESOURCE_TYPES:
+        if blocked_type == 'tracking':
+            url_patterns = TRACKING_URL_PATTERNS + url_patterns
+            continue
+        for resource_type in RESOURCE_TYPES.get(blocked_type, []):
+            patterns.append({"resourceType": resource_type, "requestStage": "Response"})
+    for url_pattern in dict.fromkeys(url_patterns):
+        patterns.append({"urlPattern": url_pattern, "requestStage": "Request"})
+    return patterns
+
+
+def is_allowed(url):
+    """Whether url matches ALLOWED_URL_PATTERNS, which win over the block list"""
+    return any(fnmatch(url, pattern) for pattern in config.ALLOWED_URL_PATTERNS)
+
+
+def content_length(headers):
+    """Content-Length from a Fetch header list, 0 when absent"""
+    for header in headers or []:
+        if header.get('name', '').lower() == 'content-length':
+            try:
+                return int(header.get('value') or 0)
+            except ValueError:
+                return 0
+    return 0
+
+
+def empty_block_stats():
+    return {'blocked': 0, 'blocked_by_type': {}, 'bytes_saved': 0}
+
+
+class RequestBlocker:
+    """
+    Blocks requests in one tab with the Fetch domain. Every request matching
+    fetch_patterns() is paused and then failed, unless its URL is
+    allowlisted, and the blocked requests and bytes are counted per page.
+    """
+
+    def __init__(self, cdp, session_id=None):
+        self.cdp = cdp
+        self.session_id = session_id
+        self._lock = threading.Lock()
+        self._stats = empty_block_stats()
+
+    async def enable(self):
+        """Start pausing matching requests. Returns the number of patterns in use."""
+        patterns = fetch_patterns()
+        self.cdp.on("Fetch.requestPaused", self._paused, self.session_id)
+        await self.cdp.send("Fetch.enable", {"patterns": patterns}, self.session_id)
+        return len(patterns)
+
+    def _paused(self, params):
+        asyncio.ensure_future(self._decide(params))
+
+    async def _decide(self, params):
+        request_id = params["requestId"]
+        try:
+            if is_allowed(params.get("request", {}).get("url", "")):
+                await self.cdp.send("Fetch.continueRequest", {"requestId": request_id}, self.session_id)
+                return
+            await self.cdp.send(
+                "Fetch.failRequest", {"requestId": request_id, "errorReason": BLOCKED_ERROR_REASON}, self.session_id
+            )
+        except Exception:
+            # The page navigated away or the tab closed while the request was paused
+            return
+        resource_type = (params.get("resourceType") or "other").lower()
+        with self._lock:
+            stats = self._stats
+            stats['blocked'] += 1
+            stats['blocked_by_type'][resource_type] = stats['blocked_by_type'].get(resource_type, 0) + 1
+            stats['bytes_saved'] += content_length(params.get("responseHeaders"))
+
+    def take_stats(self):
+        """Blocked requests and bytes since the last call"""
+        with self._lock:
+            stats, self._stats = self._stats, empty_block_stats()
+        return stats
+
+    def close(self):
+        self.cdp.off("Fetch.requestPaused", self.session_id)
+
+
+class DriverRequestBlocker:
+    """
+    RequestBlocker for the page of a Selenium driver. Selenium can't receive
+    DevTools events, so a background thread keeps its own DevTools
+    connection to the page and answers the paused requests there.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.blocker = None
+        self.patterns = 0
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self, timeout=None):
+        """Attach to the driver's page; returns once blocking is in place"""
+        from cdp_engine import browser_websocket_url
+
+        websocket_url = browser_websocket_url(self.driver)
+        # chromedriver window handles are the page's DevTools target id (older versions prefix it)
+        target_id = self.driver.current_window_handle.replace("CDwindow-", "")
+        self._thread = threading.Thread(
+            target=self._serve, args=(websocket_url, target_id), name="request-blocker", daemon=True
+        )
+        self._thread.start()
+        if not self._ready.wait(timeout or config.CDP_COMMAND_TIMEOUT):
+            raise Exception("Request blocker did not attach to the page in time")
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def _serve(self, websocket_url, target_id):
+        from cdp_engine import CdpConnection
+
+        loop = self._loop = asyncio.new_event_loop()
+        cdp = CdpConnection(websocket_url)
+        try:
+            loop.run_until_complete(self._attach(cdp, target_id))
+        except Exception as e:
+            self._error = e
+        self._ready.set()
+        if self._error is None:
+            loop.run_forever()
+        loop.run_until_complete(cdp.close())
+        loop.close()
+
+    async def _attach(self, cdp, target_id):
+        await cdp.connect()
+        attached = await cdp.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})
+        self.blocker = RequestBlocker(cdp, attached["sessionId"])
+        self.patterns = await self.blocker.enable()
+
+    def take_stats(self):
+        return self.blocker.take_stats() if self.blocker else empty_block_stats()
+
+    def close(self):
+        """Stop answering paused requests and drop the connection"""
+        if self._thread is None:
+            return
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._thread = None
+
+
+def enable_request_logging(chrome_options):
+    """Turn on Chrome's performance log, which carries the Network events we count"""
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def apply_resource_policy(driver):
+    """Block the configured resources on the driver's page. Returns the running DriverRequestBlocker."""
+    return DriverRequestBlocker(driver).start()
+
+
+def read_performance_log(driver):
+    """Drain the performance log; returns the DevTools messages since the last call"""
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return []
+
+    messages = []
+    for entry in entries:
+        try:
+            messages.append(json.loads(entry['message'])['message'])
+        except (KeyError, ValueError):
+            continue
+    return messages
+
+
+def collect_page_stats(driver, messages=None, blocker=None):
+    """
+    Drain the performance log and summarize the requests since the last call,
+    plus any messages already drained for this page. Blocked requests and
+    the bytes they would have loaded (their Content-Length; unknown for
+    requests blocked before they were sent) come from the blocker.
+    """
+    stats = empty_page_stats()
+    stats.update(blocker.take_stats() if blocker else empty_block_stats())
+    for message in list(messages or []) + read_performance_log(driver):
+        count_network_event(stats, message.get('method'), message.get('params', {}))
+
+    return stats
+
+
+def empty_page_stats():
+    return {'requests': 0, 'bytes_loaded': 0}
+
+
+def count_network_event(stats, method, params):
+    """Add one DevTools Network event to a page's request and byte counts"""
+    if method == 'Network.requestWillBeSent':
+        stats['requests'] += 1
+    elif method == 'Network.loadingFinished':
+        stats['bytes_loaded'] += int(params.get('encodedDataLength') or 0)
+
+
+class ResourceTotals:
+    """Run-wide totals of the per-page stats"""
+
+    def __init__(self):
+        self.pages = 0
+        self.requests = 0
+        self.blocked = 0
+        self.bytes_loaded = 0
+        self.bytes_saved = 0
+
+    def add(self, stats):
+        self.pages += 1
+        self.requests += stats['requests']
+        self.blocked += stats['blocked']
+        self.bytes_loaded += stats['bytes_loaded']
+        self.bytes_saved += stats['bytes_saved']
+
+
+def format_stats(stats):
+    """One-line summary of a page's request stats"""
+    by_type = ", ".join(f"{name} {count}" for name, count in sorted(stats['blocked_by_type'].items()))
+    blocked = f"{stats['blocked']} blocked" + (f" ({by_type})" if by_type else "")
+    return (
+        f"{stats['requests']} requests, {blocked}, {stats['bytes_loaded'] / 1024:.0f} KB loaded, "
+        f"{stats['bytes_saved'] / 1024:.0f} KB saved"
+    )
@@ -4,118 +4,257 @@ Uses saved browser session to scrape LinkedIn profiles
 """
 
 import os
+import sys
 import time
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from fake_useragent import UserAgent
 import config
+from contextlib import nullcontext
+from extractor import HtmlDocument, extract_fields, clean_text, NOT_AVAILABLE, PROFILE_FIELDS
+from page_script import extract_in_page
+from structured_data import (
+    embedded_payloads, network_payloads, structured_profile, missing_fields, merge_profiles, extract_from_html,
+)
+from pool import ScraperPool
+from job_store import JobStore, DONE, FAILED, AUTHWALL, PARTIAL
+from shard_queue import LeaseQueue, shard_output_path
+from writers import open_writer, export_records, output_path, remove_output
+from snapshot_cache import SnapshotCache
+from changes import ChangeTracker, UNCHANGED
+from driver_manager import StartupTimer, launch_chrome, random_user_agent, STEALTH_SCRIPT
+from metrics import RunMetrics
+from selector_stats import SelectorStats
+from url_source import UrlSource
+from supervisor import DriverSupervisor
+from pacing import (
+    PacingScheduler, SIGNAL_OK, SIGNAL_AUTHWALL, SIGNAL_TIMEOUT, SIGNAL_EMPTY, SIGNAL_ERROR,
+    SIGNAL_THROTTLED, SIGNAL_NOT_QUIET, SIGNAL_PARTIAL,
+)
+from resource_policy import (
+    ResourceTotals, enable_request_logging, apply_resource_policy,
+    collect_page_stats, format_stats, read_performance_log,
+)
+from deadline import Deadline
+from readiness import (
+    PROFILE_READY_SELECTORS, PROFILE_SECTION_IDS, PAGE_READY, PAGE_LOGIN, PAGE_THROTTLED, PAGE_NOT_QUIET,
+    PAGE_TIMEOUT, THROTTLED_ERROR, wait_for_page, wait_until_ready, scroll_to_sections, is_login_url,
+)
+
+
+class DriverDocument:
+    """Live page queried through WebDriver, one round trip per lookup"""
+
+    def __init__(self, driver, metrics=None, deadline=None):
+        self.driver = driver
+        self.metrics = metrics
+        self.deadline = deadline
+
+    def _out_of_time(self):
+        # Lookups after the profile's deadline find nothing
+        return self.deadline is not None and not self.deadline.allows("extract")
+
+    def _missed(self):
+        if self.metrics is not None:
+            self.metrics.record_no_such_element()
+
+    def find(self, selector, parent=None):
+        """First element matching selector, or None"""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+        if self._out_of_time():
+            return None
+
+        scope = self.driver if parent is None else parent
+        try:
+            return scope.find_element(By.CSS_SELECTOR, selector)
+        except NoSuchElementException:
+            self._missed()
+            return None
+        except WebDriverException:
+            return None
+
+    def find_all(self, selector, parent=None):
+        """All elements matching selector"""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import WebDriverException
+
+        if self._out_of_time():
+            return []
+
+        scope = self.driver if parent is None else parent
+        try:
+            return scope.find_elements(By.CSS_SELECTOR, selector)
+        except WebDriverException:
+            return []
+
+    def find_by_id(self, element_id):
+        """Element with the given id, or None"""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+        if self._out_of_time():
+            return None
+
+        try:
+            return self.driver.find_element(By.ID, element_id)
+        except NoSuchElementException:
+            self._missed()
+            return None
+        except WebDriverException:
+            return None
+
+    def parent(self, element):
+        """Parent element, or None"""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+        if self._out_of_time():
+            return None
+
+        try:
+            return element.find_element(By.XPATH, "..")
+        except NoSuchElementException:
+            self._missed()
+            return None
+        except WebDriverException:
+            return None
+
+    def text(self, element):
+        """Rendered text of an element"""
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            return element.text or ""
+        except WebDriverException:
+            return ""
+
+
+def pacing_signal(profile_data, error=None, page_state=None, partial=False):
+    """
+    Classify a profile load for the pacing scheduler. Only authwalls, HTTP
+    429/999, empty pages and pages that never loaded count as throttling;
+    a page that loaded but kept changing, or ran out of its time budget,
+    doesn't.
+    """
+    if error == AUTHWALL or page_state == PAGE_LOGIN:
+        return SIGNAL_AUTHWALL
+    if page_state == PAGE_THROTTLED:
+        return SIGNAL_THROTTLED
+    if page_state == PAGE_TIMEOUT:
+        return SIGNAL_TIMEOUT
+    if partial:
+        return SIGNAL_PARTIAL
+    if profile_data and all(
+        profile_data.get(field) == NOT_AVAILABLE for field in PROFILE_FIELDS if field != 'url'
+    ):
+        return SIGNAL_EMPTY
+    if page_state == PAGE_NOT_QUIET:
+        return SIGNAL_NOT_QUIET
+    return SIGNAL_OK if profile_data else SIGNAL_ERROR
+
 
 class LinkedInScraper:
-    def __init__(self):
+    def __init__(self, user_data_dir=None, job_store=None, writer=None, snapshot_cache=None, metrics=None,
+                 selector_stats=None, pacer=None, change_tracker=None, shard_queue=None):
         """Initialize the scraper with saved browser profile"""
         self.driver = None
-        self.profiles_data = []
+        self.user_data_dir = user_data_dir or config.USER_DATA_DIR
+        self.job_store = job_store
+        self.writer = writer
+        self.snapshot_cache = snapshot_cache
+        self.metrics = metrics or RunMetrics()
+        self.selector_stats = selector_stats
+        self.pacer = pacer
+        self.change_tracker = change_tracker
+        self.shard_queue = shard_queue
+        self.supervisor = DriverSupervisor(self)
+        if self.selector_stats is None and config.SELECTOR_STATS_FILE:
+            self.selector_stats = SelectorStats()
+        self._owns_job_store = False
+        self._owns_writer = False
+        self._owns_snapshot_cache = False
+        self._owns_change_tracker = False
+        self._owns_shard_queue = False
+        self.last_error = None
+        self.last_from_cache = False
+        self.last_page_state = None
+        self.last_partial = False
+        self.deadline = None
+        self.startup_timings = {}
+        self.resource_totals = ResourceTotals()
+        self.request_blocker = None
+        # Set by ScraperPool so workers never launch Chrome at the same time
+        self.startup_lock = None
+        self.last_field_timings = {}
         
     def setup_driver(self):
         """Setup Chrome driver with saved profile"""
         print("\n🔧 Setting up Chrome driver with saved profile...")
+        # A restart replaces the browser, so the previous page's blocker goes with it
+        self.close_request_blocker()
         
-        if not os.path.exists(config.USER_DATA_DIR):
+        if not os.path.exists(self.user_data_dir):
             raise Exception(
-                f"Profile directory not found: {config.USER_DATA_DIR}\n"
+                f"Profile directory not found: {self.user_data_dir}\n"
                 "Please run 'python setup.py' first to set up your browser session."
             )
         
-        chrome_options = Options()
-        chrome_options.add_argument(f"user-data-dir={os.path.abspath(config.USER_DATA_DIR)}")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        if config.HEADLESS:
-            chrome_options.add_argument("--headless")
+        from selenium.webdriver.chrome.options import Options
         
-        ua = UserAgent()
-        user_agent = ua.random
-        chrome_options.add_argument(f'user-agent={user_agent}')
-        
-        try:
-            from webdriver_manager.core.os_manager import ChromeType
+        timer = StartupTimer()
+        with timer.phase("options"):
+            chrome_options = Options()
+            chrome_options.add_argument(f"user-data-dir={os.path.abspath(self.user_data_dir)}")
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            chrome_options.add_experimental_option('useAutomationExtension', False)
             
-            print("   Installing/updating ChromeDriver...")
-            try:
-                driver_path = ChromeDriverManager().install()
-                
-                if not driver_path.endswith('chromedriver.exe'):
-                    driver_dir = os.path.dirname(driver_path)
-                    found = False
-                    for root, dirs, files in os.walk(driver_dir):
-                        if 'chromedriver.exe' in files:
-                            driver_path = os.path.join(root, 'chromedriver.exe')
-                            found = True
-                            break
-                    
-                    if not found:
-                        parent_dir = os.path.dirname(driver_dir)
-                        for root, dirs, files in os.walk(parent_dir):
-                            if 'chromedriver.exe' in files:
-                                driver_path = os.path.join(root, 'chromedriver.exe')
-                                break
-                
-            except Exception as e:
-                print(f"   Warning: {str(e)}")
-                print("   Trying alternative method...")
-                driver_path = ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install()
+            if config.HEADLESS:
+                chrome_options.add_argument("--headless")
+            
+            chrome_options.add_argument(f'user-agent={random_user_agent()}')
             
-            service = Service(driver_path)
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            if self.network_logging():
+                enable_request_logging(chrome_options)
+        
+        try:
+            with self.startup_lock or nullcontext():
+                self.driver = launch_chrome(chrome_options, timer)
         except Exception as e:
             raise Exception(f"Failed to initialize Chrome driver: {str(e)}")
         
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        with timer.phase("stealth"):
+            self.driver.execute_script(STEALTH_SCRIPT)
+        
+        if config.BLOCK_RESOURCES:
+            try:
+                with timer.phase("resource policy"):
+                    self.request_blocker = apply_resource_policy(self.driver)
+                print(f"   Blocking requests matching {self.request_blocker.patterns} resource patterns")
+            except Exception as e:
+                print(f"   Warning: resource blocking is off: {str(e)}")
         
+        self.startup_timings = timer.as_dict()
+        for name, seconds in timer.phases:
+            self.metrics.record_phase(f"startup_{name.replace(' ', '_')}", seconds)
+        print(f"   Startup: {timer.report()}")
         print(" Chrome driver ready!")
         
     def scroll_page(self):
-        """Scroll the page to load all dynamic content"""
+        """Scroll to the sections we extract so their lazy content loads"""
         try:
-            time.sleep(2)
-            
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            
-            for i in range(3):
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(config.SCROLL_PAUSE_TIME)
-                
-                # Wait for lazy-loaded content
-                try:
-                    WebDriverWait(self.driver, 5).until(
-                        lambda driver: driver.execute_script("return document.readyState") == "complete"
-                    )
-                except TimeoutException:
-                    pass
-                
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
-            
-            time.sleep(1)
-                
+            found = scroll_to_sections(self.driver, deadline=self.deadline)
+            missing = [section for section in PROFILE_SECTION_IDS if section not in found]
+            if missing:
+                print(f"    Sections not on page: {', '.join(missing)}")
         except Exception as e:
             print(f"   Warning: Error while scrolling: {str(e)}")
     
     def extract_text_safe(self, by, selector, default="N/A"):
         """Safely extract text from an element"""
+        from selenium.common.exceptions import NoSuchElementException
+
         try:
             element = self.driver.find_element(by, selector)
             text = element.text.strip() if element.text else default
@@ -129,335 +268,547 @@ class LinkedInScraper:
     
     def clean_text(self, text):
         """Clean and normalize text by removing extra whitespace, newlines, and duplicates"""
-        if not text or text == "N/A":
-            return "N/A"
-        
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        
-        cleaned_lines = []
-        prev_line = None
-        for line in lines:
-            if line != prev_line:
-                cleaned_lines.append(line)
-                prev_line = line
+        return clean_text(text)
+    
+    def network_logging(self):
+        """Whether Chrome records DevTools network events (resource stats or Voyager responses)"""
+        return config.REPORT_RESOURCE_STATS or (config.STRUCTURED_DATA and config.STRUCTURED_DATA_NETWORK)
+    
+    def extract_from_dom(self, url, fields=None):
+        """
+        Scroll and run the DOM selectors on the open page (only for fields,
+        if given). Returns (profile_data, html), html being the page source
+        if it was fetched for extraction.
+        """
+        metrics = self.metrics
         
-        text = ' '.join(cleaned_lines)
-        text = ' '.join(text.split())
+        # Scroll to load the experience/education sections
+        with metrics.phase("scroll"):
+            self.scroll_page()
         
-        return text
+        html = None
+        if config.EXTRACTION_MODE == "script":
+            # Every field in one execute_script round trip
+            with metrics.phase("extract"):
+                profile_data = extract_in_page(
+                    self.driver, url, self.last_field_timings, metrics, self.selector_stats, fields
+                )
+        else:
+            if config.EXTRACTION_MODE == "live":
+                document = DriverDocument(self.driver, metrics, self.deadline)
+            else:
+                # One page_source round trip, every selector runs offline
+                with metrics.phase("page_source"):
+                    html = self.driver.page_source
+                    document = HtmlDocument(html)
+            with metrics.phase("extract"):
+                profile_data = extract_fields(
+                    document, url, self.last_field_timings, metrics, self.selector_stats, fields
+                )
+        return profile_data, html
     
     def extract_profile_data(self, url):
         """Extract data from a LinkedIn profile"""
         print(f"\n📄 Scraping: {url}")
+        self.last_error = None
+        self.last_from_cache = False
+        self.last_partial = False
+        self.last_page_state = None
+        self.last_field_timings = {}
         
+        metrics = self.metrics
         try:
-           
-
+            # Serve fresh profiles from the snapshot cache without navigating
+            if self.cache_allowed(url):
+                with metrics.phase("cache_lookup"):
+                    html = self.snapshot_cache.get(url)
+                if html:
+                    self.last_from_cache = True
+                    with metrics.phase("extract"):
+                        profile_data = extract_from_html(
+                            html, url, self.last_field_timings, metrics, self.selector_stats
+                        )
+                    print(f"    From cache: {profile_data['name']}")
+                    return profile_data
+            
+            if self.driver is None:
+                self.setup_driver()
+                self.open_feed()
+            
+            # Every wait from here on draws down the profile's time budget
+            deadline = self.deadline = Deadline()
+            
             # Navigate to the profile URL
-            self.driver.get(url)
+            with metrics.phase("navigate"):
+                self.supervisor.page_loaded()
+                navigated = self.navigate(url)
             
-            # Wait for profile page to load - check for multiple elements
-            try:
-                WebDriverWait(self.driver, 20).until(
-                    lambda driver: driver.execute_script("return document.readyState") == "complete"
-                )
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "main"))
+            # Wait until the top card is rendered and the DOM has settled
+            with metrics.phase("ready_wait"):
+                state = wait_for_page(
+                    self.driver, PROFILE_READY_SELECTORS, deadline.cap(config.PAGE_LOAD_TIMEOUT)
                 )
+            if not navigated and state == PAGE_NOT_QUIET:
+                # The load itself timed out, so the page only looks loaded
+                state = PAGE_TIMEOUT
+            self.last_page_state = state
+            ready = state == PAGE_READY
+            if not ready:
+                deadline.allows("ready_wait")
+            if ready:
                 print("    Profile page loaded")
-            except TimeoutException:
+            elif state == PAGE_THROTTLED:
+                print(f"    {THROTTLED_ERROR}")
+                self.last_error = THROTTLED_ERROR
+                return None
+            elif state == PAGE_NOT_QUIET:
+                print("    Profile page loaded, but it was still changing at the timeout")
+            elif state == PAGE_TIMEOUT:
                 print("    Timeout waiting for profile page")
             
-            time.sleep(config.WAIT_TIME)
-            
-            # Scroll to load all content
-            self.scroll_page()
-            
             # Check if we're still logged in
-            if "authwall" in self.driver.current_url or "login" in self.driver.current_url:
+            if is_login_url(self.driver.current_url):
                 print("    Not logged in! Please run setup.py again.")
+                self.last_error = AUTHWALL
                 return None
             
-            # Extract profile data
-            profile_data = {
-                'url': url,
-                'name': 'N/A',
-                'headline': 'N/A',
-                'location': 'N/A',
-                'about': 'N/A',
-                'followers': 'N/A',
-                'connections': 'N/A',
-                'experience': 'N/A',
-                'education': 'N/A',
-            }
-            
-            name_selectors = [
-                "h1.text-heading-xlarge",
-                "h1.inline.t-24.v-align-middle.break-words",
-                "h1.top-card-layout__title"
-            ]
-            for selector in name_selectors:
-                name = self.extract_text_safe(By.CSS_SELECTOR, selector)
-                if name != "N/A":
-                    profile_data['name'] = name
-                    break
-            
-            headline_selectors = [
-                "div.text-body-medium.break-words",
-                "h2.mt1.t-18.t-black.t-normal",
-                "div.top-card-layout__headline"
-            ]
-            for selector in headline_selectors:
-                headline = self.extract_text_safe(By.CSS_SELECTOR, selector)
-                if headline != "N/A":
-                    profile_data['headline'] = headline
-                    break
-            
-            location_selectors = [
-                "span.text-body-small.inline.t-black--light.break-words",
-                "span.top-card-layout__location"
-            ]
-            for selector in location_selectors:
-                location = self.extract_text_safe(By.CSS_SELECTOR, selector)
-                if location != "N/A":
-                    profile_data['location'] = location
-                    break
-            
-            try:
-                # Try multiple selectors for about section
-                about_selectors = [
-                    "div.display-flex.ph5.pv3",
-                    "div.pv-shared-text-with-see-more",
-                    "div.inline-show-more-text",
-                    "section[data-section='summary'] div.pv-shared-text-with-see-more"
-                ]
-                for selector in about_selectors:
-                    try:
-                        about_elem = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        about_text = about_elem.text.strip()
-                        if about_text:
-                            profile_data['about'] = self.clean_text(about_text)
-                            break
-                    except:
-                        continue
-            except Exception as e:
-                pass
+            # Embedded page JSON and captured API responses first
+            html = None
+            messages = []
+            structured = None
+            missing = None
+            if config.STRUCTURED_DATA:
+                with metrics.phase("structured"):
+                    html = self.driver.page_source
+                    if self.network_logging():
+                        messages = read_performance_log(self.driver)
+                    payloads = embedded_payloads(HtmlDocument(html))
+                    if config.STRUCTURED_DATA_NETWORK:
+                        payloads += network_payloads(self.driver, messages)
+                    structured = structured_profile(url, payloads, metrics)
+                missing = missing_fields(structured)
             
-            # Extract followers/connections - Try multiple approaches
-            try:
-                # Look for connection count
-                connection_selectors = [
-                    "span.t-bold",  # Common selector for connections like "500+"
-                    "span.t-black--light span.t-bold",
-                    "li.pv-top-card--list-bullet span.t-bold",
-                    "span.link-without-visited-state span"
-                ]
-                
-                for selector in connection_selectors:
-                    try:
-                        conn_elems = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        for conn_elem in conn_elems:
-                            conn_text = conn_elem.text.strip()
-                            # Check if it contains numbers and connection-related text
-                            if conn_text and any(char.isdigit() for char in conn_text):
-                                profile_data['connections'] = self.clean_text(conn_text)
-                                break
-                        if profile_data['connections'] != "N/A":
-                            break
-                    except:
-                        continue
-            except:
-                pass
-            
-            # Extract followers - Try multiple approaches
-            try:
-                # Look for follower count
-                follower_selectors = [
-                    "span.pvs-entity__caption-wrapper",
-                    "span.follower-count",
-                    "div.pv-top-card--list-bullet span",
-                    "span[aria-label*='follower']"
-                ]
-                
-                for selector in follower_selectors:
-                    try:
-                        follower_elems = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        for follower_elem in follower_elems:
-                            follower_text = follower_elem.text.strip()
-                            # Check if it contains "follower" keyword and numbers
-                            if follower_text and 'follower' in follower_text.lower() and any(char.isdigit() for char in follower_text):
-                                # Extract just the number and "followers" part
-                                profile_data['followers'] = self.clean_text(follower_text)
-                                break
-                        if profile_data['followers'] != "N/A":
-                            break
-                    except:
-                        continue
-            except:
-                pass
+            if structured is not None and not missing:
+                profile_data = structured
+                print("    All fields from structured data, skipping scroll")
+            elif config.EXTRACTION_MODE == "live" and not deadline.allows("extract"):
+                # Out of time: one snapshot of what's rendered instead of per-selector lookups
+                with metrics.phase("page_source"):
+                    html = self.driver.page_source
+                with metrics.phase("extract"):
+                    profile_data = extract_fields(
+                        HtmlDocument(html), url, self.last_field_timings, metrics, self.selector_stats, missing
+                    )
+                if structured is not None:
+                    profile_data = merge_profiles(structured, profile_data)
+            else:
+                # DOM selectors for the fields structured data didn't cover
+                profile_data, html = self.extract_from_dom(url, missing)
+                if structured is not None:
+                    profile_data = merge_profiles(structured, profile_data)
             
-            # Extract experience (first position only, cleaned)
-            try:
-                experience_section = self.driver.find_element(By.ID, "experience")
-                exp_parent = experience_section.find_element(By.XPATH, "..")
-                exp_items = exp_parent.find_elements(By.CSS_SELECTOR, "li.artdeco-list__item")
-                
-                if exp_items:
-                    first_exp_elem = exp_items[0]
-                    
-                    try:
-                        title = first_exp_elem.find_element(By.CSS_SELECTOR, "div[aria-hidden='true'] span[aria-hidden='true']").text.strip()
-                        company = ""
-                        duration = ""
-                        
-                        try:
-                            company_elem = first_exp_elem.find_element(By.CSS_SELECTOR, "span.t-14.t-normal span[aria-hidden='true']")
-                            company = company_elem.text.strip()
-                        except:
-                            pass
-                        
-                        try:
-                            duration_elem = first_exp_elem.find_element(By.CSS_SELECTOR, "span.t-14.t-normal.t-black--light span[aria-hidden='true']")
-                            duration = duration_elem.text.strip()
-                        except:
-                            pass
-                        
-                        exp_parts = [p for p in [title, company, duration] if p]
-                        if exp_parts:
-                            profile_data['experience'] = " | ".join(exp_parts)
-                        else:
-                            full_text = first_exp_elem.text.strip()
-                            profile_data['experience'] = self.clean_text(full_text[:200])
-                    except:
-                        # Fallback to full text
-                        full_text = first_exp_elem.text.strip()
-                        profile_data['experience'] = self.clean_text(full_text[:200])
-            except:
-                pass
+            # Half-loaded pages must be fetched again on retry, not served from the cache
+            if self.snapshot_cache is not None and ready and not deadline.exceeded:
+                with metrics.phase("cache_store"):
+                    self.snapshot_cache.put(url, html or self.driver.page_source)
             
-            # Extract education (first item only, cleaned)
-            try:
-                education_section = self.driver.find_element(By.ID, "education")
-                edu_parent = education_section.find_element(By.XPATH, "..")
-                edu_items = edu_parent.find_elements(By.CSS_SELECTOR, "li.artdeco-list__item")
-                
-                if edu_items:
-                    first_edu_elem = edu_items[0]
-                    
-                    try:
-                        school = first_edu_elem.find_element(By.CSS_SELECTOR, "div[aria-hidden='true'] span[aria-hidden='true']").text.strip()
-                        degree = ""
-                        years = ""
-                        
-                        try:
-                            degree_elem = first_edu_elem.find_element(By.CSS_SELECTOR, "span.t-14.t-normal span[aria-hidden='true']")
-                            degree = degree_elem.text.strip()
-                        except:
-                            pass
-                        
-                        try:
-                            years_elem = first_edu_elem.find_element(By.CSS_SELECTOR, "span.t-14.t-normal.t-black--light span[aria-hidden='true']")
-                            years = years_elem.text.strip()
-                        except:
-                            pass
-                        
-                        edu_parts = [p for p in [school, degree, years] if p]
-                        if edu_parts:
-                            profile_data['education'] = " | ".join(edu_parts)
-                        else:
-                            full_text = first_edu_elem.text.strip()
-                            profile_data['education'] = self.clean_text(full_text[:200])
-                    except:
-                        full_text = first_edu_elem.text.strip()
-                        profile_data['education'] = self.clean_text(full_text[:200])
-            except:
-                pass
+            if config.REPORT_RESOURCE_STATS:
+                with metrics.phase("resource_stats"):
+                    stats = collect_page_stats(self.driver, messages, self.request_blocker)
+                self.resource_totals.add(stats)
+                print(f"    Resources: {format_stats(stats)}")
             
-            print(f"    Scraped: {profile_data['name']}")
+            if deadline.exceeded:
+                self.last_partial = True
+                self.last_error = deadline.describe()
+                print(f"    Partial: {profile_data['name']} ({self.last_error}, will retry)")
+            else:
+                print(f"    Scraped: {profile_data['name']}")
             return profile_data
             
         except Exception as e:
             print(f"   ❌ Error scraping profile: {str(e)}")
+            self.last_error = str(e)
+            return None
+    
+    def cache_allowed(self, url):
+        """Whether url may be served from the snapshot cache (not while retrying a partial profile)"""
+        if self.snapshot_cache is None:
+            return False
+        return self.job_store is None or not self.job_store.was_partial(url)
+    
+    def navigate(self, url):
+        """
+        Load url, giving up on the load (but keeping the page) when the
+        deadline runs out. Returns False when the load timed out.
+        """
+        from selenium.common.exceptions import TimeoutException
+
+        remaining = self.deadline.remaining() if self.deadline else None
+        previous = None
+        if remaining is not None:
+            # The timeout sticks to the driver, so the feed and later pages get theirs back
+            previous = self.driver.timeouts.page_load
+            self.driver.set_page_load_timeout(max(remaining, 1))
+        try:
+            self.driver.get(url)
+        except TimeoutException:
+            self.driver.execute_script("window.stop();")
+            self.deadline.allows("navigate")
+            return False
+        finally:
+            if previous is not None:
+                self.driver.set_page_load_timeout(previous)
+        return True
+    
+    def open_feed(self):
+        """Open the LinkedIn feed once so the session is warm before scraping"""
+        with self.metrics.phase("feed"):
+            self.driver.get(config.FEED_URL)
+            
+            # Wait for LinkedIn homepage to load and settle
+            ready = wait_until_ready(self.driver, ["body"], config.FEED_WAIT_TIME)
+        if ready:
+            print("    LinkedIn homepage loaded")
+        else:
+            print("    Timeout waiting for LinkedIn homepage")
+        
+        if self.network_logging():
+            # Don't count the feed's requests (or read its payloads) towards the first profile
+            read_performance_log(self.driver)
+        if self.request_blocker:
+            self.request_blocker.take_stats()
+    
+    def scrape_one(self, url):
+        """Scrape a single profile and record the outcome in the job store"""
+        self.job_store.mark_started(url)
+        try:
+            self.supervisor.before_page()
+        except Exception as e:
+            # The recycled browser didn't come back; the next URL starts a fresh one
+            print(f"   ❌ Could not restart browser: {str(e)}")
+            self.record_outcome(url, None, 0.0, str(e))
             return None
+        start = time.perf_counter()
+        profile_data = self.extract_profile_data(url)
+        if profile_data is None and self.last_error not in (None, AUTHWALL):
+            # Re-issue the in-flight URL once if the browser had to be restarted
+            try:
+                if self.supervisor.recover(self.last_error):
+                    profile_data = self.extract_profile_data(url)
+            except Exception as e:
+                print(f"   ❌ Could not restart browser: {str(e)}")
+                self.last_error = str(e)
+        self.record_outcome(
+            url, profile_data, time.perf_counter() - start,
+            self.last_error, self.last_from_cache, self.last_page_state, self.last_partial,
+        )
+        return profile_data
+    
+    def record_outcome(self, url, profile_data, elapsed, error=None, from_cache=False, page_state=None,
+                       partial=False):
+        """
+        Store a scraped profile (or why it failed) in the job store, output,
+        metrics and pacer. Partial profiles (deadline exceeded) are kept for
+        retry and only written out once their last attempt is used up.
+        """
+        if self.pacer and not from_cache:
+            self.pacer.record(pacing_signal(profile_data, error, page_state, partial))
+        
+        kept = None
+        if profile_data and partial:
+            self.job_store.mark_partial(url, profile_data, error)
+            if self.writer and self.last_attempt(url):
+                self.writer.write(profile_data)
+            outcome = PARTIAL
+        elif profile_data:
+            self.job_store.mark_done(url, profile_data)
+            change = self.change_tracker.check(profile_data)[0] if self.change_tracker else None
+            if self.writer and not (config.OUTPUT_DELTA and change == UNCHANGED):
+                self.writer.write(profile_data)
+            outcome = "cached" if from_cache else DONE
+        elif error == AUTHWALL:
+            self.job_store.mark_authwall(url)
+            outcome = AUTHWALL
+        else:
+            kept = self.job_store.mark_failed(url, error or "No data extracted")
+            if kept and self.writer and self.last_attempt(url):
+                # An earlier attempt's partial profile still stands
+                self.writer.write(kept)
+            outcome = FAILED
+        
+        if self.shard_queue:
+            self.shard_queue.complete(
+                url, outcome in (DONE, "cached"), error or outcome, partial=outcome == PARTIAL or bool(kept)
+            )
+        
+        self.metrics.record_profile(elapsed, outcome)
+        if config.METRICS_EXPORT_EVERY and len(self.metrics.profile_times) % config.METRICS_EXPORT_EVERY == 0:
+            self.export_metrics()
+    
+    def last_attempt(self, url):
+        """Whether url has used up its attempts (across hosts in a sharded run)"""
+        attempts = (self.shard_queue or self.job_store).attempts(url)
+        return attempts >= config.MAX_ATTEMPTS
     
     def scrape_profiles(self, urls):
         """Scrape multiple LinkedIn profiles"""
         print("\n" + "=" * 60)
         print("LinkedIn Profile Scraper")
         print("=" * 60)
-        print(f"\nTotal profiles to scrape: {len(urls)}")
         
-        self.setup_driver()
+        if self.job_store is None:
+            self.job_store = JobStore()
+            self._owns_job_store = True
         
-        # Navigate to LinkedIn homepage first
-        self.driver.get("https://www.linkedin.com/feed/")
+        if config.RESCRAPE:
+            reset = self.job_store.reset()
+            print(f"\nNew run: {reset} profiles from the previous run queued again")
         
-        # Wait for LinkedIn homepage to load (wait for navigation bar)
-        try:
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            print("    LinkedIn homepage loaded")
-        except TimeoutException:
-            print("    Timeout waiting for LinkedIn homepage")
+        if self.shard_queue is None and config.SHARD_QUEUE_DB:
+            self.shard_queue = LeaseQueue()
+            self._owns_shard_queue = True
         
-        time.sleep(10)
-
-        for i, url in enumerate(urls, 1):
-            print(f"\n[{i}/{len(urls)}]", end=" ")
-            
-            profile_data = self.extract_profile_data(url)
-            
-            if profile_data:
-                self.profiles_data.append(profile_data)
+        if not isinstance(urls, UrlSource):
+            urls = UrlSource(urls=urls)
+        if self.shard_queue:
+            # URLs come from the shared queue, leased a batch at a time
+            added = self.shard_queue.add_urls(urls)
+            pending = self.shard_queue.count_pending()
+            work = self.shard_queue.iter_urls(self.job_store)
+            location = getattr(self.shard_queue, 'path', "an in-memory queue")
+            print(f"\nSharing the work through {location} as host {self.shard_queue.host}")
+        else:
+            added = self.job_store.add_urls(urls)
+            pending = self.job_store.count_pending()
+            work = self.job_store.iter_pending()
+        print(f"\nNew profiles queued: {added}")
+        print(f"Total profiles to scrape: {pending}")
+        
+        if pending == 0:
+            self.print_summary()
+            return
+        
+        self.open_outputs()
+        
+        if config.ENGINE == "cdp":
+            from cdp_engine import CdpEngine
             
-            # Add delay between requests to avoid rate limiting
-            if i < len(urls):
-                wait_time = config.WAIT_TIME
-                print(f"   ⏳ Waiting {wait_time} seconds before next profile...")
-                time.sleep(wait_time)
-        
-        self.save_to_csv()
-        
-    def save_to_csv(self):
-        """Save scraped data to CSV file"""
-        if not self.profiles_data:
-            print("\n No data to save!")
+            self.setup_driver()
+            self.open_feed()
+            CdpEngine(self).run(work)
+            self.print_summary()
             return
         
-        try:
-            df = pd.DataFrame(self.profiles_data)
-            df.to_csv(config.OUTPUT_CSV, index=False, encoding='utf-8-sig')
+        if config.POOL_WORKERS > 1:
+            pool = ScraperPool(self.spawn_worker, workers=config.POOL_WORKERS)
+            pool.run(work)
+            self.print_summary()
+            return
+        
+        # The browser starts on the first profile that isn't cached
+        navigated = False
+        started = set()
+        retries = 0
+        for url in work:
+            if self.pacer.stopped:
+                break
             
-            print("\n" + "=" * 60)
-            print("Scraping completed!")
-            print("=" * 60)
-            print(f"Total profiles scraped: {len(self.profiles_data)}")
-            print(f"Data saved to: {os.path.abspath(config.OUTPUT_CSV)}")
-            print("\nColumns in CSV:")
-            for col in df.columns:
-                print(f"  - {col}")
+            # Pace page loads to avoid rate limiting
+            if navigated:
+                with self.metrics.phase("pacing"):
+                    waited = self.pacer.wait()
+                if waited >= 1:
+                    print(f"   ⏳ Waited {waited:.0f} seconds before next profile")
             
+            if url in started:
+                retries += 1
+                print(f"\n[retry {retries}]", end=" ")
+            else:
+                started.add(url)
+                print(f"\n[{len(started)}/{pending}]", end=" ")
+            self.scrape_one(url)
+            navigated = not self.last_from_cache
+        
+        self.print_summary()
+    
+    def open_outputs(self, workers=None):
+        """Open the writer, snapshot cache, change tracker and pacer a run needs, unless they were passed in"""
+        if self.writer is None:
+            if self.shard_queue:
+                # Each host writes its own shard; `cli.py merge` combines them
+                path = shard_output_path(self.shard_queue.host)
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            else:
+                path = output_path()
+            if config.RESCRAPE:
+                # A new run: rows from the previous one would be appended to again
+                remove_output(path)
+            self.writer = open_writer(path=path)
+            self._owns_writer = True
+        
+        if self.snapshot_cache is None and config.SNAPSHOT_CACHE_ENABLED:
+            self.snapshot_cache = SnapshotCache()
+            self._owns_snapshot_cache = True
+        
+        if self.change_tracker is None and config.CHANGE_TRACKING:
+            self.change_tracker = ChangeTracker()
+            self._owns_change_tracker = True
+        
+        if self.pacer is None:
+            self.pacer = PacingScheduler(self.pacing_rate(workers))
+    
+    def spawn_worker(self, user_data_dir):
+        """Create a pool worker that shares this scraper's job store, writer and cache"""
+        return type(self)(
+            user_data_dir,
+            job_store=self.job_store,
+            writer=self.writer,
+            snapshot_cache=self.snapshot_cache,
+            metrics=self.metrics,
+            selector_stats=self.selector_stats,
+            pacer=self.pacer,
+            change_tracker=self.change_tracker,
+            shard_queue=self.shard_queue,
+        )
+    
+    def pacing_rate(self, workers=None):
+        """Profile loads per minute allowed by the wait-time settings of the active engine"""
+        workers = workers or config.POOL_WORKERS
+        if config.ENGINE == "cdp":
+            return 60 * config.CDP_CONCURRENCY / max(config.CDP_TAB_WAIT_TIME, 0.001)
+        if workers > 1:
+            return 60 * workers / max(config.POOL_WORKER_WAIT_TIME, 0.001)
+        return 60 / max(config.WAIT_TIME, 0.001)
+        
+    def print_summary(self):
+        """Print where the results went and what is still unfinished"""
+        counts = self.job_store.counts()
+        
+        print("\n" + "=" * 60)
+        print("Scraping completed!")
+        print("=" * 60)
+        print(f"Total profiles scraped: {counts.get(DONE, 0)}")
+        if self.writer:
+            self.writer.flush()
+            print(f"New this run: {self.writer.records_written}")
+            print(f"Data saved to: {os.path.abspath(self.writer.path)}")
+            if self.writer.history is not None:
+                print(f"Positions saved to: {os.path.abspath(self.writer.history.path)}")
+        
+        if self.change_tracker:
+            print(f"Changes since last run: {self.change_tracker.summary()}")
+            if config.OUTPUT_DELTA:
+                print("Only new and changed profiles were written (OUTPUT_DELTA)")
+        
+        totals = self.resource_totals
+        if totals.pages:
+            print(
+                f"Requests: {totals.requests} over {totals.pages} pages, "
+                f"{totals.blocked} blocked, {totals.bytes_loaded / 1024 / 1024:.1f} MB loaded, "
+                f"{totals.bytes_saved / 1024 / 1024:.1f} MB saved"
+            )
+        
+        report = self.metrics.to_dict()
+        latency = report["profiles"]["latency"]
+        if latency["p50"] is not None:
+            print(
+                f"Per profile: p50 {latency['p50']:.1f}s | p95 {latency['p95']:.1f}s | "
+                f"p99 {latency['p99']:.1f}s | max {latency['max']:.1f}s"
+            )
+        partial = counts.get(PARTIAL, 0)
+        if partial:
+            print(f"Partial profiles (deadline of {config.PROFILE_DEADLINE}s exceeded): {partial}")
+        
+        phases = report["phases"]
+        if phases:
+            busiest = sorted(phases.items(), key=lambda item: item[1]["total"], reverse=True)[:5]
+            print("Time by phase: " + " | ".join(f"{name} {t['total']:.1f}s" for name, t in busiest))
+        
+        self.export_metrics()
+        if config.METRICS_JSON:
+            print(f"Run report: {os.path.abspath(config.METRICS_JSON)}")
+        dead = self.metrics.dead_selectors()
+        if dead:
+            print(f"Selectors that never matched this run: {len(dead)}")
+            for field, selector in dead:
+                print(f"  - {field}: {selector}")
+        if self.selector_stats and self.selector_stats.collapsed:
+            print(f"Fields found far less often than usual: {', '.join(sorted(self.selector_stats.collapsed))}")
+        
+        if self.shard_queue:
+            print(f"Shared queue: {self.shard_queue.summary()}")
+        
+        if self.supervisor.restarts:
+            print(f"Browser restarts: {self.supervisor.restarts}")
+        if self.pacer:
+            print(f"Pacing: {self.pacer.summary()}")
+            if self.pacer.stopped:
+                print("Run stopped early because the session looks invalid.")
+        
+        unfinished = sum(n for state, n in counts.items() if state != DONE)
+        if unfinished:
+            print(f"\n {unfinished} profiles unfinished ({counts}). Run again to retry them.")
+    
+    def export_metrics(self):
+        """Write the run report (JSON), Prometheus textfile and selector stats if configured"""
+        try:
+            self.metrics.export(config.METRICS_JSON, config.METRICS_PROMETHEUS)
+            if self.selector_stats:
+                self.selector_stats.save()
         except Exception as e:
-            print(f"\n❌ Error saving to CSV: {str(e)}")
+            print(f"   Warning: could not write metrics: {str(e)}")
+    
+    def export_results(self, output_format=None, path=None):
+        """Rewrite the output file from every finished profile in the job store, in input order"""
+        try:
+            writer = export_records(self.job_store.results(), output_format, path)
+            print(f"\n Exported {writer.records_written} profiles to {os.path.abspath(writer.path)}")
+        except Exception as e:
+            print(f"\n❌ Error exporting results: {str(e)}")
+    
+    def close_request_blocker(self):
+        """Stop blocking requests on the current browser"""
+        if self.request_blocker:
+            self.request_blocker.close()
+            self.request_blocker = None
     
     def close(self):
         """Close the browser"""
+        self.close_request_blocker()
         if self.driver:
             try:
                 self.driver.quit()
                 print("\n Browser closed")
             except:
                 pass
+        if self.writer and self._owns_writer:
+            self.writer.close()
+            self.writer = None
+        if self.snapshot_cache is not None and self._owns_snapshot_cache:
+            self.snapshot_cache.close()
+            self.snapshot_cache = None
+        if self.change_tracker and self._owns_change_tracker:
+            self.change_tracker.close()
+            self.change_tracker = None
+        if self.shard_queue and self._owns_shard_queue:
+            self.shard_queue.close()
+            self.shard_queue = None
+        if self.job_store and self._owns_job_store:
+            self.job_store.close()
+            self.job_store = None
 
 def main():
-    """Main function to run the scraper"""
+    """Main function to run the scraper: python scraper.py [input files...]"""
     scraper = LinkedInScraper()
+    paths = sys.argv[1:] or config.INPUT_FILES
+    urls = UrlSource(paths) if paths else UrlSource(urls=config.PROFILE_URLS)
     
     try:
-        scraper.scrape_profiles(config.PROFILE_URLS)
+        scraper.scrape_profiles(urls)
     except KeyboardInterrupt:
         print("\n\n Scraping interrupted by user")
+        print(" Progress is saved; run the scraper again to resume.")
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
     finally:
@@ -0,0 +1,134 @@
+"""
+Adaptive selector ordering
+Keeps per-field statistics for every selector in the fallback lists across
+runs, and orders each field's candidates by recent hit rate and latency so
+most profiles resolve a field on the first lookup. Selectors that have not
+matched for a long time are dropped, and fields whose hit rate collapses
+during a run (usually a LinkedIn markup change) are flagged.
+"""
+
+import os
+import json
+import time
+import threading
+import config
+
+DAY = 24 * 3600
+
+
+def _hit_rate(hits, tries):
+    """Hit rate with a uniform prior, so unseen selectors score 0.5"""
+    return (hits + 1) / (tries + 2)
+
+
+class SelectorStats:
+    """Persisted selector hit/latency statistics (shared by pool workers)"""
+
+    def __init__(self, path=None, decay=None, dead_days=None, persist=True):
+        """With persist=False the stats start empty and are never saved"""
+        self.path = (path or config.SELECTOR_STATS_FILE) if persist else None
+        self.decay = config.SELECTOR_STATS_DECAY if decay is None else decay
+        self.dead_after = (config.SELECTOR_DEAD_DAYS if dead_days is None else dead_days) * DAY
+        self.selectors = {}
+        self.fields = {}
+        self.run_fields = {}
+        self.collapsed = set()
+        self._lock = threading.Lock()
+        if self.path:
+            self._load()
+        self.baseline = {
+            field: counts["hits"] / counts["tries"]
+            for field, counts in self.fields.items()
+            if counts["tries"] >= config.SELECTOR_COLLAPSE_MIN_SAMPLES
+        }
+
+    def _load(self):
+        """Read saved stats, decaying older runs so recent behaviour dominates"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        for field, selectors in saved.get("selectors", {}).items():
+            for selector, entry in selectors.items():
+                for key in ("hits", "tries", "seconds"):
+                    entry[key] = entry.get(key, 0.0) * self.decay
+            self.selectors[field] = selectors
+        for field, counts in saved.get("fields", {}).items():
+            self.fields[field] = {
+                "hits": counts.get("hits", 0.0) * self.decay,
+                "tries": counts.get("tries", 0.0) * self.decay,
+            }
+
+    def save(self):
+        """Write the stats atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({"selectors": self.selectors, "fields": self.fields}, indent=2)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def _is_dead(self, entry, now):
+        """Tried for longer than the dead window without a single hit"""
+        last_hit = entry.get("last_hit") or entry.get("first_tried") or now
+        return now - last_hit > self.dead_after
+
+    def order(self, field, selectors):
+        """
+        Candidates for field, best first: highest recent hit rate, then lowest
+        mean latency, then their original position. Long-dead selectors are
+        left out unless every candidate is dead.
+        """
+        now = time.time()
+        with self._lock:
+            known = self.selectors.get(field, {})
+            live = [s for s in selectors if not (s in known and self._is_dead(known[s], now))]
+            candidates = live or list(selectors)
+
+            def score(item):
+                position, selector = item
+                entry = known.get(selector)
+                if entry is None:
+                    return (-_hit_rate(0, 0), 0.0, position)
+                mean = entry["seconds"] / entry["tries"] if entry["tries"] else 0.0
+                return (-_hit_rate(entry["hits"], entry["tries"]), mean, position)
+
+            return [selector for _, selector in sorted(enumerate(candidates), key=score)]
+
+    def record_selector(self, field, selector, hit, seconds=None):
+        """Count one lookup of selector for field"""
+        now = time.time()
+        with self._lock:
+            entry = self.selectors.setdefault(field, {}).setdefault(
+                selector, {"hits": 0.0, "tries": 0.0, "seconds": 0.0, "first_tried": now, "last_hit": None}
+            )
+            entry["tries"] += 1
+            entry["seconds"] += seconds or 0.0
+            if hit:
+                entry["hits"] += 1
+                entry["last_hit"] = now
+
+    def record_field(self, field, found):
+        """Count whether any candidate produced a value; warn when the hit rate collapses"""
+        with self._lock:
+            for counts in (self.fields.setdefault(field, {"hits": 0.0, "tries": 0.0}),
+                           self.run_fields.setdefault(field, {"hits": 0, "tries": 0})):
+                counts["tries"] += 1
+                if found:
+                    counts["hits"] += 1
+
+            run = self.run_fields[field]
+            baseline = self.baseline.get(field)
+            if baseline is None or field in self.collapsed or run["tries"] < config.SELECTOR_COLLAPSE_MIN_SAMPLES:
+                return
+            rate = run["hits"] / run["tries"]
+            if rate < baseline * config.SELECTOR_COLLAPSE_RATIO:
+                self.collapsed.add(field)
+                print(
+                    f"   ⚠️ '{field}' found on {rate:.0%} of profiles this run "
+                    f"(usually {baseline:.0%}) - its selectors may be outdated"
+                )
@@ -5,12 +5,9 @@ Run this script first to set up your authenticated session.
 
 import os
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from fake_useragent import UserAgent
 import config
+from driver_manager import StartupTimer, launch_chrome, random_user_agent, STEALTH_SCRIPT
 
 def setup_browser_session():
     """
@@ -43,52 +40,21 @@ def setup_browser_session():
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     
-    ua = UserAgent()
-    user_agent = ua.random
-    chrome_options.add_argument(f'user-agent={user_agent}')
+    chrome_options.add_argument(f'user-agent={random_user_agent()}')
     
     # Disable webdriver detection
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     
     print("\n🌐 Opening Chrome browser...")
-    print("   Installing/updating ChromeDriver...")
     
+    driver = None
     try:
-        # Initialize the Chrome driver with proper error handling
-        from webdriver_manager.core.os_manager import ChromeType
-        
-        try:
-            driver_path = ChromeDriverManager().install()
-            print(f" ChromeDriver base path: {driver_path}")
-            
-            if not driver_path.endswith('chromedriver.exe'):
-                driver_dir = os.path.dirname(driver_path)
-                found = False
-                for root, dirs, files in os.walk(driver_dir):
-                    if 'chromedriver.exe' in files:
-                        driver_path = os.path.join(root, 'chromedriver.exe')
-                        print(f" Found chromedriver.exe at: {driver_path}")
-                        found = True
-                        break
-                
-                if not found:
-                    parent_dir = os.path.dirname(driver_dir)
-                    for root, dirs, files in os.walk(parent_dir):
-                        if 'chromedriver.exe' in files:
-                            driver_path = os.path.join(root, 'chromedriver.exe')
-                            print(f" Found chromedriver.exe at: {driver_path}")
-                            break
-            
-        except Exception as e:
-            print(f"   Warning: ChromeDriver installation issue: {str(e)}")
-            print("   Trying alternative method...")
-            driver_path = ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install()
-        
-        service = Service(driver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        timer = StartupTimer()
+        driver = launch_chrome(chrome_options, timer)
+        print(f" Startup: {timer.report()}")
         
         # Execute script to remove webdriver property
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.execute_script(STEALTH_SCRIPT)
         
         # Open Google
         driver.get("https://www.google.com")
@@ -137,7 +103,8 @@ def setup_browser_session():
         
     finally:
         try:
-            driver.quit()
+            if driver:
+                driver.quit()
         except:
             pass
 
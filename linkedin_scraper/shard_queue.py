@@ -0,0 +1,541 @@
+"""
+Sharded runs across hosts
+A coordinator-less work queue in SQLite on a shared volume. Every host runs
+its own scraper with its own logged-in session and leases batches of URLs
+from the queue. Leases expire unless the host renews them with a heartbeat,
+so URLs held by a host that died go back to the queue and are picked up by
+the others. Each host writes its own output shard; `merge_shards` combines
+the shards into one deduplicated output file in input order.
+
+MemoryLeaseQueue is an in-process stand-in with the same interface, for
+trying the sharding logic without a shared volume.
+
+Usage:
+    python cli.py scrape urls.txt --shard-queue /mnt/shared/queue.db   # on every host
+    python cli.py merge --shard-queue /mnt/shared/queue.db               # once all are done
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import socket
+import sqlite3
+import threading
+import config
+from extractor import HISTORY_KEY
+from writers import output_path, history_path, read_records, export_records, HISTORY_NESTED
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+# Last attempt ran out of time; its partial record is in the host's shard
+PARTIAL = "partial"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shard_urls (
+    url TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    host TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS shard_urls_state ON shard_urls(state, position);
+CREATE TABLE IF NOT EXISTS shard_hosts (
+    host TEXT PRIMARY KEY,
+    heartbeat REAL NOT NULL
+);
+"""
+
+
+def default_host():
+    """This host's name in the queue, safe for file names"""
+    return re.sub(r"[^A-Za-z0-9_-]", "_", config.SHARD_HOST or socket.gethostname())
+
+
+def shard_output_path(host, output_format=None, shard_dir=None):
+    """Output shard of a host: <shard dir>/<output stem>.<host><ext>"""
+    shard_dir = shard_dir or config.SHARD_OUTPUT_DIR
+    stem, ext = os.path.splitext(os.path.basename(output_path(output_format)))
+    return os.path.join(shard_dir, f"{stem}.{host}{ext}")
+
+
+class _LeaseQueue:
+    """Leasing loop and heartbeat shared by the SQLite queue and its in-memory stand-in"""
+
+    def __init__(self, host=None, lease_size=None, lease_seconds=None, max_attempts=None):
+        self.host = host or default_host()
+        self.lease_size = lease_size or config.SHARD_LEASE_SIZE
+        self.lease_seconds = lease_seconds or config.SHARD_LEASE_SECONDS
+        self.max_attempts = max_attempts or config.MAX_ATTEMPTS
+        self.reclaimed = 0
+        # Set once this instance has leased, so close() only hands back its own work
+        self.leasing = False
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+
+    def iter_urls(self, job_store=None, poll_seconds=None):
+        """
+        Yield URLs leased batch by batch (adding them to the local job store,
+        if given) until no URL is pending or leased by another host. While
+        other hosts still hold leases, wait for them: a dead host's URLs come
+        back once its leases expire. This host's own in-flight URLs are
+        waited for too while they have attempts left, since a failed one goes
+        back to the queue. The wait blocks, so async callers must pull from a
+        worker thread.
+        """
+        if poll_seconds is None:
+            poll_seconds = config.SHARD_POLL_SECONDS
+        self.start_heartbeat()
+        while not self._stop.is_set():
+            batch = self.lease()
+            if batch:
+                if job_store is not None:
+                    job_store.add_urls(batch)
+                yield from batch
+                continue
+            if self.count_unsettled() == 0:
+                return
+            self._stop.wait(poll_seconds)
+
+    def start_heartbeat(self, interval=None):
+        """Renew this host's leases from a background thread"""
+        if self._heartbeat_thread is not None:
+            return
+        interval = interval or config.SHARD_HEARTBEAT_SECONDS
+
+        def beat():
+            while not self._stop.wait(interval):
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    print(f"   Warning: lease heartbeat failed: {str(e)}")
+
+        self._heartbeat_thread = threading.Thread(target=beat, name="shard-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def close(self):
+        """Stop the heartbeat and hand back leases this host hasn't finished"""
+        self._stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+        if self.leasing:
+            released = self.release()
+            if released:
+                print(f"   Returned {released} unfinished URL(s) to the shared queue")
+
+    def summary(self):
+        """One-line summary of the shared queue"""
+        counts = self.counts()
+        text = ", ".join(f"{count} {state}" for state, count in sorted(counts.items())) or "empty"
+        if self.reclaimed:
+            text += f"; {self.reclaimed} reclaimed from expired leases by this host"
+        return text
+
+
+class LeaseQueue(_LeaseQueue):
+    """
+    Work queue in a SQLite file on a shared volume. Uses the rollback
+    journal (WAL needs shared memory, which network filesystems don't
+    provide) and takes a write lock for each lease, so hosts never lease
+    the same URL at the same time.
+    """
+
+    def __init__(self, path=None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path or config.SHARD_QUEUE_DB
+        if not self.path:
+            raise Exception("No shard queue configured (set SHARD_QUEUE_DB or pass --shard-queue)")
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.executescript(SCHEMA)
+
+    def _write(self, statements):
+        """Run statements(conn) in one immediate (write-locked) transaction"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self.conn)
+                self.conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def add_urls(self, urls, batch_size=1000):
+        """Queue new URLs in input order; URLs already queued (by any host) are kept as they are"""
+        added = 0
+        batch = []
+
+        def insert(conn):
+            position = conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM shard_urls").fetchone()[0]
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO shard_urls (url, position, updated_at) VALUES (?, ?, ?)",
+                [(url, position + offset, time.time()) for offset, url in enumerate(batch)],
+            )
+            return cursor.rowcount
+
+        for url in urls:
+            batch.append(url)
+            if len(batch) >= batch_size:
+                added += self._write(insert)
+                batch = []
+        if batch:
+            added += self._write(insert)
+        return added
+
+    def lease(self, size=None):
+        """Lease up to size URLs (pending ones, or ones whose lease expired) to this host"""
+        size = size or self.lease_size
+        self.leasing = True
+
+        def take(conn):
+            now = time.time()
+            # Expired leases that used up their attempts won't be leased again
+            conn.execute(
+                "UPDATE shard_urls SET state = ?, error = 'Lease expired', updated_at = ? "
+                "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, now, LEASED, now, self.max_attempts),
+            )
+            rows = conn.execute(
+                "SELECT url, state FROM shard_urls WHERE (state = ? OR (state = ? AND lease_expires < ?)) "
+                "AND attempts < ? ORDER BY position LIMIT ?",
+                (PENDING, LEASED, now, self.max_attempts, size),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE shard_urls SET state = ?, host = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE url = ?",
+                [(LEASED, self.host, now + self.lease_seconds, now, url) for url, _ in rows],
+            )
+            self._touch_host(conn, now)
+            return rows
+
+        rows = self._write(take)
+        reclaimed = sum(1 for _, state in rows if state == LEASED)
+        if reclaimed:
+            self.reclaimed += reclaimed
+            print(f"   Reclaimed {reclaimed} URL(s) from expired leases")
+        return [url for url, _ in rows]
+
+    def _touch_host(self, conn, now):
+        conn.execute(
+            "INSERT INTO shard_hosts (host, heartbeat) VALUES (?, ?) "
+            "ON CONFLICT(host) DO UPDATE SET heartbeat = excluded.heartbeat",
+            (self.host, now),
+        )
+
+    def heartbeat(self):
+        """Extend every lease this host holds"""
+        def renew(conn):
+            now = time.time()
+            conn.execute(
+                "UPDATE shard_urls SET lease_expires = ? WHERE state = ? AND host = ?",
+                (now + self.lease_seconds, LEASED, self.host),
+            )
+            self._touch_host(conn, now)
+
+        self._write(renew)
+
+    def complete(self, url, done, error=None, partial=False):
+        """
+        Record the outcome of a leased URL: done, or back to the queue for
+        another attempt (on any host) until it runs out of attempts. A
+        partial profile that used up its attempts finishes as partial
+        rather than failed, since its record was written out.
+        """
+        def finish(conn):
+            now = time.time()
+            if done:
+                conn.execute(
+                    "UPDATE shard_urls SET state = ?, host = ?, lease_expires = NULL, error = NULL, "
+                    "updated_at = ? WHERE url = ?",
+                    (DONE, self.host, now, url),
+                )
+            else:
+                # Only if the lease is still ours; another host may have reclaimed it
+                conn.execute(
+                    "UPDATE shard_urls SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                    "lease_expires = NULL, error = ?, updated_at = ? WHERE url = ? AND state = ? AND host = ?",
+                    (self.max_attempts, PARTIAL if partial else FAILED, PENDING, str(error), now, url,
+                     LEASED, self.host),
+                )
+
+        self._write(finish)
+
+    def release(self):
+        """Hand back this host's unfinished leases without counting them as attempts"""
+        def give_back(conn):
+            return conn.execute(
+                "UPDATE shard_urls SET state = ?, lease_expires = NULL, attempts = MAX(attempts - 1, 0), "
+                "updated_at = ? WHERE state = ? AND host = ?",
+                (PENDING, time.time(), LEASED, self.host),
+            ).rowcount
+
+        return self._write(give_back)
+
+    def attempts(self, url):
+        """Attempts made so far for a URL, on any host"""
+        with self._lock:
+            row = self.conn.execute("SELECT attempts FROM shard_urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else 0
+
+    def count_pending(self):
+        """URLs not finished yet: pending, or leased by some host"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM shard_urls WHERE state IN (?, ?)", (PENDING, LEASED)
+            ).fetchone()[0]
+
+    def count_unsettled(self):
+        """
+        URLs that may still be leased by this host: pending, leased by
+        another host, or leased by this one with attempts left
+        """
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM shard_urls WHERE state = ? OR "
+                "(state = ? AND (host != ? OR attempts < ?))",
+                (PENDING, LEASED, self.host, self.max_attempts),
+            ).fetchone()[0]
+
+    def counts(self):
+        """Number of URLs in each state"""
+        with self._lock:
+            return dict(self.conn.execute("SELECT state, COUNT(*) FROM shard_urls GROUP BY state").fetchall())
+
+    def hosts(self):
+        """Last heartbeat time of every host that has leased from the queue"""
+        with self._lock:
+            return dict(self.conn.execute("SELECT host, heartbeat FROM shard_hosts").fetchall())
+
+    def finished(self, page_size=1000):
+        """Yield (url, position, host) of every URL with a record (done or partial), in input order"""
+        last_position = -1
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT url, position, host FROM shard_urls WHERE state IN (?, ?) AND position > ? "
+                    "ORDER BY position LIMIT ?",
+                    (DONE, PARTIAL, last_position, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for url, position, host in rows:
+                last_position = position
+                yield url, position, host
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self.conn.close()
+
+
+class MemoryLeaseQueue(_LeaseQueue):
+    """
+    In-process stand-in for LeaseQueue. Several instances with different
+    hosts can share one `store` dict to act as separate hosts; `clock`
+    can be replaced to expire leases without waiting.
+    """
+
+    def __init__(self, store=None, clock=None, **kwargs):
+        super().__init__(**kwargs)
+        self.store = {} if store is None else store
+        self.clock = clock or time.time
+        self._lock = self.store.setdefault('_lock', threading.Lock())
+        self.urls = self.store.setdefault('urls', {})
+        self.heartbeats = self.store.setdefault('hosts', {})
+
+    def add_urls(self, urls, batch_size=None):
+        added = 0
+        with self._lock:
+            for url in urls:
+                if url not in self.urls:
+                    self.urls[url] = {'position': len(self.urls), 'state': PENDING, 'host': None,
+                                      'lease_expires': None, 'attempts': 0, 'error': None}
+                    added += 1
+        return added
+
+    def lease(self, size=None):
+        size = size or self.lease_size
+        self.leasing = True
+        leased = []
+        with self._lock:
+            now = self.clock()
+            for url, job in sorted(self.urls.items(), key=lambda item: item[1]['position']):
+                expired = job['state'] == LEASED and job['lease_expires'] < now
+                if expired and job['attempts'] >= self.max_attempts:
+                    job.update(state=FAILED, error='Lease expired')
+                    continue
+                if len(leased) >= size or not (job['state'] == PENDING or expired):
+                    continue
+                if job['attempts'] >= self.max_attempts:
+                    continue
+                self.reclaimed += expired
+                job.update(state=LEASED, host=self.host, lease_expires=now + self.lease_seconds,
+                           attempts=job['attempts'] + 1)
+                leased.append(url)
+            self.heartbeats[self.host] = now
+        return leased
+
+    def heartbeat(self):
+        with self._lock:
+            now = self.clock()
+            for job in self.urls.values():
+                if job['state'] == LEASED and job['host'] == self.host:
+                    job['lease_expires'] = now + self.lease_seconds
+            self.heartbeats[self.host] = now
+
+    def complete(self, url, done, error=None, partial=False):
+        with self._lock:
+            job = self.urls[url]
+            if done:
+                job.update(state=DONE, host=self.host, lease_expires=None, error=None)
+            elif job['state'] == LEASED and job['host'] == self.host:
+                if job['attempts'] < self.max_attempts:
+                    state = PENDING
+                else:
+                    state = PARTIAL if partial else FAILED
+                job.update(state=state, lease_expires=None, error=str(error))
+
+    def release(self):
+        released = 0
+        with self._lock:
+            for job in self.urls.values():
+                if job['state'] == LEASED and job['host'] == self.host:
+                    job.update(state=PENDING, lease_expires=None, attempts=max(job['attempts'] - 1, 0))
+                    released += 1
+        return released
+
+    def attempts(self, url):
+        with self._lock:
+            job = self.urls.get(url)
+            return job['attempts'] if job else 0
+
+    def count_pending(self):
+        with self._lock:
+            return sum(1 for job in self.urls.values() if job['state'] in (PENDING, LEASED))
+
+    def count_unsettled(self):
+        with self._lock:
+            return sum(
+                1 for job in self.urls.values()
+                if job['state'] == PENDING
+                or (job['state'] == LEASED and (job['host'] != self.host or job['attempts'] < self.max_attempts))
+            )
+
+    def counts(self):
+        counts = {}
+        with self._lock:
+            for job in self.urls.values():
+                counts[job['state']] = counts.get(job['state'], 0) + 1
+        return counts
+
+    def hosts(self):
+        with self._lock:
+            return dict(self.heartbeats)
+
+    def finished(self, page_size=None):
+        with self._lock:
+            rows = [(url, job['position'], job['host']) for url, job in self.urls.items()
+                    if job['state'] in (DONE, PARTIAL)]
+        yield from sorted(rows, key=lambda row: row[1])
+
+
+def _shard_files(output_format, shard_dir):
+    """(host, path) of every output shard of a format (Parquet shards may be split into timestamped files)"""
+    stem, ext = os.path.splitext(os.path.basename(output_path(output_format)))
+    pattern = re.compile(rf"^{re.escape(stem)}\.(?P<host>[A-Za-z0-9_-]+?)(?:-\d{{8}}-\d{{6}})?{re.escape(ext)}$")
+    paths = sorted(glob.glob(os.path.join(shard_dir, f"{stem}.*{ext}")))
+    # History child tables sit next to their shard
+    children = {history_path(path) for path in paths}
+    for path in paths:
+        match = pattern.match(os.path.basename(path))
+        if match and path not in children:
+            yield match.group('host'), path
+
+
+def merge_shards(queue, output_format=None, path=None, shard_dir=None):
+    """
+    Merge every host's output shard into one output file, in input order,
+    one record per URL. When a URL was scraped by more than one host (its
+    lease expired while the first was still working on it), the record of
+    the host the queue has it finished by wins. Returns the writer.
+    """
+    output_format = output_format or config.OUTPUT_FORMAT
+    shard_dir = shard_dir or config.SHARD_OUTPUT_DIR
+    shards = list(_shard_files(output_format, shard_dir))
+    if not shards:
+        raise Exception(f"No {output_format} output shards found in {shard_dir}")
+
+    # Stage the shards in a temporary database so memory stays bounded
+    staging = sqlite3.connect("")
+    staging.execute("PRAGMA journal_mode=OFF")
+    staging.execute("PRAGMA synchronous=OFF")
+    staging.execute("CREATE TABLE records (url TEXT, host TEXT, record TEXT, PRIMARY KEY (url, host))")
+    staging.execute("CREATE TABLE history (url TEXT, host TEXT, row TEXT)")
+    staging.execute("CREATE INDEX history_url ON history(url, host)")
+    nested = config.OUTPUT_HISTORY == HISTORY_NESTED
+    print(f"\n Merging {len(shards)} output shard(s) from {shard_dir}...")
+    for host, shard in shards:
+        staging.executemany(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?)",
+            ((record['url'], host, json.dumps(record, default=str)) for record in read_records(shard, output_format)),
+        )
+        positions = history_path(shard)
+        if not nested and os.path.exists(positions):
+            staging.executemany(
+                "INSERT INTO history VALUES (?, ?, ?)",
+                ((row['profile_url'], host, json.dumps(row, default=str)) for row in read_records(positions, output_format)),
+            )
+    staging.commit()
+
+    def records():
+        for url, _, finished_by in queue.finished():
+            rows = staging.execute(
+                "SELECT host, record FROM records WHERE url = ? ORDER BY host = ? DESC LIMIT 1",
+                (url, finished_by),
+            ).fetchall()
+            if not rows:
+                continue
+            host, record = rows[0]
+            record = json.loads(record)
+            if not nested:
+                record[HISTORY_KEY] = [
+                    json.loads(row) for (row,) in staging.execute(
+                        "SELECT row FROM history WHERE url = ? AND host = ? ORDER BY rowid", (url, host)
+                    )
+                ]
+            yield record
+
+    try:
+        writer = export_records(records(), output_format, path)
+    finally:
+        staging.close()
+    missing = sum(1 for _ in queue.finished()) - writer.records_written
+    if missing:
+        print(f"   {missing} finished URL(s) had no record in any shard (shard files missing?)")
+    return writer
+
+
+def main():
+    """Merge the output shards of the configured queue: python shard_queue.py [queue.db]"""
+    import sys
+
+    queue = LeaseQueue(sys.argv[1] if len(sys.argv) > 1 else None)
+    try:
+        print(f"Queue: {queue.summary()}")
+        writer = merge_shards(queue)
+        print(f"Merged {writer.records_written} profiles into {os.path.abspath(writer.path)}")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+HTML snapshot cache
+Stores gzipped profile pages on disk, content-addressed by their SHA-256 and
+indexed by canonical profile URL, with a freshness TTL and a size-bounded
+LRU eviction policy.
+"""
+
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import threading
+import config
+from urls import canonical_profile_url
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_last_access ON snapshots(last_access);
+CREATE INDEX IF NOT EXISTS snapshots_digest ON snapshots(digest);
+"""
+
+
+class SnapshotCache:
+    """On-disk cache of profile page HTML"""
+
+    def __init__(self, directory=None, ttl_hours=None, max_mb=None):
+        self.directory = directory or config.SNAPSHOT_CACHE_DIR
+        self.ttl = (config.SNAPSHOT_TTL_HOURS if ttl_hours is None else ttl_hours) * 3600
+        self.max_bytes = (config.SNAPSHOT_CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+        self.blob_dir = os.path.join(self.directory, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(self.directory, "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest + ".html.gz")
+
+    def _read_blob(self, digest):
+        with gzip.open(self._blob_path(digest), 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def get(self, url, max_age=None):
+        """Cached HTML for url if it is fresher than max_age seconds (default: TTL), else None"""
+        key = canonical_profile_url(url)
+        max_age = self.ttl if max_age is None else max_age
+
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest, fetched_at FROM snapshots WHERE url = ?", (key,)
+            ).fetchone()
+            if not row or time.time() - row[1] > max_age:
+                return None
+            digest = row[0]
+            with self.conn:
+                self.conn.execute("UPDATE snapshots SET last_access = ? WHERE url = ?", (time.time(), key))
+
+        try:
+            return self._read_blob(digest)
+        except OSError:
+            return None
+
+    def put(self, url, html):
+        """Store a freshly fetched page"""
+        key = canonical_profile_url(url)
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+
+        # Identical pages share one blob
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            old = self.conn.execute("SELECT digest FROM snapshots WHERE url = ?", (key,)).fetchone()
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (url, digest, size, fetched_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, digest, os.path.getsize(path), now, now),
+                )
+            if old and old[0] != digest:
+                self._drop_blob_if_unused(old[0])
+            self._evict()
+
+    def _drop_blob_if_unused(self, digest):
+        in_use = self.conn.execute("SELECT 1 FROM snapshots WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+        if not in_use:
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drop least recently used snapshots until the cache fits max_bytes"""
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM snapshots)"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self.conn.execute(
+            "SELECT url, digest, size FROM snapshots ORDER BY last_access"
+        ).fetchall()
+        for url, digest, size in rows:
+            if total <= self.max_bytes:
+                break
+            with self.conn:
+                self.conn.execute("DELETE FROM snapshots WHERE url = ?", (url,))
+            before = os.path.exists(self._blob_path(digest))
+            self._drop_blob_if_unused(digest)
+            if before and not os.path.exists(self._blob_path(digest)):
+                total -= size
+
+    def __iter__(self):
+        """Yield (url, html, fetched_at) for every snapshot, oldest fetch first"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, digest, fetched_at FROM snapshots ORDER BY fetched_at"
+            ).fetchall()
+        for url, digest, fetched_at in rows:
+            try:
+                yield url, self._read_blob(digest), fetched_at
+            except OSError:
+                continue
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    def close(self):
+        """Close the index database"""
+        with self._lock:
+            self.conn.close()
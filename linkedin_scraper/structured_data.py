@@ -0,0 +1,325 @@
+"""
+Structured-data fast path
+LinkedIn pages carry most of the profile as JSON: a schema.org Person in
+<script type="application/ld+json"> on public pages, and Voyager API
+payloads in hidden <code> blocks and XHR responses on logged-in pages. This
+module maps those payloads into profile_data. Fields the payloads don't
+cover are left N/A for the DOM selectors to fill, so the scraper only has to
+scroll and query the DOM when something is missing.
+"""
+
+import json
+import time
+import config
+from extractor import (
+    PROFILE_FIELDS, HISTORY_KEY, FIELD_SPECS, NOT_AVAILABLE,
+    HtmlDocument, extract_fields, finish_value, history_rows,
+)
+from urls import profile_slug
+
+# Label structured hits are recorded under in the run report
+STRUCTURED_SELECTOR = "structured data"
+
+# Voyager API responses worth reading from the network log
+VOYAGER_URL_FRAGMENT = "/voyager/api/"
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+def embedded_payloads(document):
+    """JSON objects embedded in an HtmlDocument: ld+json scripts and Voyager <code> blocks"""
+    payloads = []
+    blocks = document.root.xpath("//script[@type='application/ld+json'] | //code")
+    for block in blocks:
+        text = (block.text_content() if block.tag == 'code' else block.text or "").strip()
+        if not text.startswith(("{", "[")):
+            continue
+        try:
+            payloads.append(json.loads(text))
+        except ValueError:
+            continue
+    return payloads
+
+
+def is_voyager_response(response):
+    """Whether a DevTools Network response is a Voyager API JSON payload"""
+    return VOYAGER_URL_FRAGMENT in response.get('url', '') and 'json' in response.get('mimeType', '')
+
+
+def network_payloads(driver, messages):
+    """
+    Bodies of the Voyager API responses in drained performance-log messages
+    (see resource_policy.read_performance_log), fetched over DevTools
+    """
+    payloads = []
+    for message in messages:
+        if message.get('method') != 'Network.responseReceived':
+            continue
+        params = message.get('params', {})
+        if not is_voyager_response(params.get('response', {})):
+            continue
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params['requestId']})
+            payloads.append(json.loads(body.get('body') or "null"))
+        except Exception:
+            # Bodies of finished requests may already be evicted
+            continue
+    return [payload for payload in payloads if payload]
+
+
+def _format_month(date):
+    """'Mar 2021' / '2021' from a Voyager {month, year} or an ISO 'YYYY[-MM[-DD]]' string"""
+    if isinstance(date, dict):
+        year, month = date.get('year'), date.get('month')
+    elif isinstance(date, str) and date[:4].isdigit():
+        year = int(date[:4])
+        month = int(date[5:7]) if date[5:7].isdigit() else None
+    else:
+        return None
+    if not year:
+        return None
+    return f"{MONTH_NAMES[month - 1]} {year}" if month and 1 <= month <= 12 else str(year)
+
+
+def _format_range(start, end, current=True):
+    """Dates caption in LinkedIn's own format, e.g. 'Mar 2021 - Present'"""
+    start = _format_month(start)
+    if start is None:
+        return None
+    end = _format_month(end)
+    if end:
+        return f"{start} - {end}"
+    return f"{start} - Present" if current else start
+
+
+def _item(columns):
+    """A section item in the shape extractor._match_section produces"""
+    return {'columns': columns, 'full': " ".join(value for value in columns.values() if value)}
+
+
+def _sort_key(date):
+    """Newest first: (year, month) of a Voyager date, for sorting"""
+    date = date or {}
+    return date.get('year') or 0, date.get('month') or 0
+
+
+# --- schema.org Person (public profile pages) ---
+
+def _ld_nodes(payload):
+    if isinstance(payload, list):
+        for item in payload:
+            yield from _ld_nodes(item)
+    elif isinstance(payload, dict):
+        if '@graph' in payload:
+            yield from _ld_nodes(payload['@graph'])
+        else:
+            yield payload
+
+
+def _ld_person(payloads, slug):
+    """The Person node describing the profile at slug"""
+    for payload in payloads:
+        for node in _ld_nodes(payload):
+            if node.get('@type') != 'Person':
+                continue
+            if slug and profile_slug(str(node.get('url') or node.get('sameAs') or "")) not in (slug, None):
+                continue
+            return node
+    return None
+
+
+def _from_person(person):
+    """Raw field values and section items from a schema.org Person"""
+    raw = {}
+    if person.get('name'):
+        raw['name'] = person['name']
+    address = person.get('address')
+    if isinstance(address, dict):
+        parts = [address.get('addressLocality'), address.get('addressRegion'), address.get('addressCountry')]
+        location = ", ".join(part for part in parts if isinstance(part, str) and part)
+        if location:
+            raw['location'] = location
+    if person.get('description'):
+        raw['about'] = person['description']
+
+    statistics = person.get('interactionStatistic') or []
+    for statistic in statistics if isinstance(statistics, list) else [statistics]:
+        if 'Follow' in str(statistic.get('interactionType', '')) and statistic.get('userInteractionCount') is not None:
+            raw['followers'] = f"{int(statistic['userInteractionCount']):,} followers"
+
+    for field, key in (('experience', 'worksFor'), ('education', 'alumniOf')):
+        items = []
+        for organization in person.get(key) or []:
+            if not isinstance(organization, dict) or not organization.get('name'):
+                continue
+            member = organization.get('member') or {}
+            items.append(_item({
+                'title': None,
+                'organization': organization['name'],
+                'dates': _format_range(member.get('startDate'), member.get('endDate')),
+                'location': None,
+            }))
+        if items:
+            raw[field] = items
+    return raw
+
+
+# --- Voyager entities (logged-in pages and API responses) ---
+
+def _voyager_entities(payloads):
+    """Every normalized entity in the Voyager payloads, by entity URN"""
+    entities = {}
+    for payload in payloads:
+        if not isinstance(payload, dict):
+            continue
+        for entity in payload.get('included') or []:
+            if isinstance(entity, dict) and entity.get('entityUrn'):
+                entities[entity['entityUrn']] = entity
+    return entities
+
+
+def _entity_type(entity):
+    return str(entity.get('$type', '')).rsplit('.', 1)[-1]
+
+
+def _date_range(entity):
+    """(start, end) Voyager dates of a position or education entry (dash or legacy schema)"""
+    period = entity.get('dateRange') or entity.get('timePeriod') or {}
+    return period.get('start') or period.get('startDate'), period.get('end') or period.get('endDate')
+
+
+def _from_voyager(entities, slug):
+    """Raw field values and section items for the profile at slug"""
+    profile = next(
+        (entity for entity in entities.values()
+         if _entity_type(entity) == 'Profile' and str(entity.get('publicIdentifier', '')).lower() == slug),
+        None,
+    )
+    if profile is None:
+        # Payloads on a logged-in page also describe the viewer; never guess
+        return {}
+    profile_id = profile['entityUrn'].rsplit(':', 1)[-1]
+
+    raw = {}
+    name = " ".join(part for part in (profile.get('firstName'), profile.get('lastName')) if part)
+    if name:
+        raw['name'] = name
+    if profile.get('headline'):
+        raw['headline'] = profile['headline']
+    if profile.get('summary'):
+        raw['about'] = profile['summary']
+    location = profile.get('locationName') or profile.get('geoLocationName')
+    geo_urn = (profile.get('geoLocation') or {}).get('*geo') or (profile.get('geoLocation') or {}).get('geoUrn')
+    if not location and geo_urn in entities:
+        location = entities[geo_urn].get('defaultLocalizedName')
+    if location:
+        raw['location'] = location
+
+    positions, educations = [], []
+    for urn, entity in entities.items():
+        if profile_id not in urn:
+            continue
+        kind = _entity_type(entity)
+        if kind == 'Position':
+            positions.append(entity)
+        elif kind == 'Education':
+            educations.append(entity)
+        for key in ('followerCount', 'followersCount'):
+            if isinstance(entity.get(key), int):
+                raw['followers'] = f"{entity[key]:,} followers"
+        if isinstance(entity.get('connectionsCount'), int):
+            count = entity['connectionsCount']
+            raw['connections'] = "500+" if count >= 500 else str(count)
+
+    def newest_first(entity):
+        start, end = _date_range(entity)
+        return end is None, _sort_key(end), _sort_key(start)
+
+    if positions:
+        raw['experience'] = [
+            _item({
+                'title': entity.get('title'),
+                'organization': entity.get('companyName'),
+                'dates': _format_range(*_date_range(entity)),
+                'location': entity.get('locationName'),
+            })
+            for entity in sorted(positions, key=newest_first, reverse=True)
+        ]
+    if educations:
+        raw['education'] = [
+            _item({
+                'organization': entity.get('schoolName'),
+                'title': ", ".join(part for part in (entity.get('degreeName'), entity.get('fieldOfStudy')) if part) or None,
+                'dates': _format_range(*_date_range(entity), current=False),
+                'location': None,
+            })
+            for entity in sorted(educations, key=newest_first, reverse=True)
+        ]
+    return raw
+
+
+def structured_profile(url, payloads, metrics=None):
+    """
+    profile_data built from structured payloads; fields they don't cover
+    are N/A. Section history rows are included for the sections found.
+    """
+    slug = profile_slug(url)
+    raw = {}
+    person = _ld_person(payloads, slug)
+    if person is not None:
+        raw.update(_from_person(person))
+    # Voyager data is richer (titles, headline), so it wins over ld+json
+    if slug:
+        raw.update(_from_voyager(_voyager_entities(payloads), slug))
+
+    profile_data = {field: NOT_AVAILABLE for field in PROFILE_FIELDS}
+    profile_data['url'] = url
+    profile_data[HISTORY_KEY] = []
+    for spec in FIELD_SPECS:
+        field = spec['field']
+        value = raw.get(field)
+        if value:
+            if spec['match'] == 'section':
+                profile_data[HISTORY_KEY].extend(history_rows(spec, value, url))
+            else:
+                value = str(value)
+            profile_data[field] = finish_value(spec, value)
+        if metrics is not None and payloads:
+            metrics.record_selector(field, STRUCTURED_SELECTOR, profile_data[field] != NOT_AVAILABLE)
+    return profile_data
+
+
+def missing_fields(profile_data):
+    """Profile fields still N/A"""
+    return [field for field in PROFILE_FIELDS if profile_data.get(field) == NOT_AVAILABLE]
+
+
+def merge_profiles(structured, fallback):
+    """structured with its missing fields (and their history rows) taken from fallback"""
+    merged = dict(structured)
+    missing = set(missing_fields(structured))
+    for field in missing:
+        merged[field] = fallback.get(field, NOT_AVAILABLE)
+    merged[HISTORY_KEY] = list(structured.get(HISTORY_KEY) or []) + [
+        row for row in fallback.get(HISTORY_KEY) or [] if row.get('section') in missing
+    ]
+    return merged
+
+
+def extract_from_html(html, url, timings=None, metrics=None, selector_stats=None):
+    """
+    Profile from a page snapshot: embedded payloads first (with
+    STRUCTURED_DATA), DOM selectors for whatever they don't cover
+    """
+    document = HtmlDocument(html)
+    if not config.STRUCTURED_DATA:
+        return extract_fields(document, url, timings, metrics, selector_stats)
+
+    start = time.perf_counter()
+    structured = structured_profile(url, embedded_payloads(document), metrics)
+    if metrics is not None:
+        metrics.record_phase("structured", time.perf_counter() - start)
+    missing = missing_fields(structured)
+    if not missing:
+        return structured
+    fallback = extract_fields(document, url, timings, metrics, selector_stats, fields=missing)
+    return merge_profiles(structured, fallback)
@@ -0,0 +1,177 @@
+"""
+Browser lifecycle supervision
+Tracks how many pages a scraper's Chrome has loaded and how much memory the
+browser and its renderer processes use, and restarts the driver after
+RECYCLE_AFTER_PAGES pages, above RECYCLE_MAX_RSS_MB, or when it stops
+responding, so per-page latency stays flat over long runs and a crashed
+browser doesn't fail every remaining profile.
+"""
+
+import os
+import threading
+import config
+
+# Fragments of WebDriver errors that mean the browser or session is gone
+DEAD_DRIVER_ERRORS = (
+    "invalid session id",
+    "session deleted",
+    "chrome not reachable",
+    "disconnected",
+    "no such window",
+    "target window already closed",
+    "tab crashed",
+    "connection refused",
+    "max retries exceeded",
+    "remote end closed connection",
+)
+
+
+def _children_from_proc(pid):
+    """Descendant pids of pid, read from /proc (Linux without psutil)"""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                # The command name may contain spaces; fields resume after ')'
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry))
+
+    found = []
+    stack = [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def _rss_from_proc(pid):
+    """Resident memory of one process in bytes, from /proc"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def process_tree_rss_mb(pid):
+    """
+    Total RSS in MB of pid's descendants (chromedriver -> Chrome -> renderers),
+    or None when it can't be measured on this platform.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            children = psutil.Process(pid).children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for child in children:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 1024 / 1024
+
+    if not os.path.isdir("/proc"):
+        return None
+    return sum(_rss_from_proc(child) for child in _children_from_proc(pid)) / 1024 / 1024
+
+
+def browser_rss_mb(driver):
+    """Memory used by the browser behind a Selenium driver, in MB (or None)"""
+    try:
+        pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    return process_tree_rss_mb(pid)
+
+
+def is_dead_driver_error(error):
+    """Whether an error message means the browser or its session is gone"""
+    error = (error or "").lower()
+    return any(fragment in error for fragment in DEAD_DRIVER_ERRORS)
+
+
+def is_responsive(driver, timeout=None):
+    """Whether the driver answers a trivial command within timeout seconds"""
+    timeout = timeout or config.DRIVER_HEALTH_TIMEOUT
+    result = {}
+
+    def ping():
+        try:
+            result["ok"] = driver.execute_script("return 1") == 1
+        except Exception:
+            result["ok"] = False
+
+    thread = threading.Thread(target=ping, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result.get("ok", False)
+
+
+class DriverSupervisor:
+    """Restarts a LinkedInScraper's driver when it ages, bloats or dies"""
+
+    def __init__(self, scraper, max_pages=None, max_rss_mb=None, check_every=None):
+        self.scraper = scraper
+        self.max_pages = config.RECYCLE_AFTER_PAGES if max_pages is None else max_pages
+        self.max_rss_mb = config.RECYCLE_MAX_RSS_MB if max_rss_mb is None else max_rss_mb
+        self.check_every = check_every or config.RECYCLE_CHECK_EVERY
+        self.pages = 0
+        self.restarts = 0
+        self.last_rss_mb = None
+
+    def page_loaded(self):
+        """Count a page load by the current driver"""
+        self.pages += 1
+
+    def before_page(self):
+        """Recycle the driver if it has loaded too many pages or uses too much memory"""
+        if self.scraper.driver is None:
+            return
+        if self.max_pages and self.pages >= self.max_pages:
+            self.restart(f"{self.pages} pages loaded")
+            return
+        if self.max_rss_mb and self.pages and self.pages % self.check_every == 0:
+            self.last_rss_mb = browser_rss_mb(self.scraper.driver)
+            if self.last_rss_mb is not None and self.last_rss_mb > self.max_rss_mb:
+                self.restart(f"browser using {self.last_rss_mb:.0f} MB")
+
+    def recover(self, error):
+        """
+        After a failed profile: restart the driver if it crashed or stopped
+        responding. Returns True when it was restarted, so the URL can be retried.
+        """
+        if self.scraper.driver is None:
+            return False
+        if not is_dead_driver_error(error) and is_responsive(self.scraper.driver):
+            return False
+        self.restart("browser not responding")
+        return True
+
+    def restart(self, reason):
+        """Quit the driver and start a fresh one on the same profile"""
+        print(f"\n   ♻️ Restarting browser ({reason})")
+        scraper = self.scraper
+        with scraper.metrics.phase("driver_restart"):
+            try:
+                scraper.driver.quit()
+            except Exception:
+                pass
+            scraper.driver = None
+            scraper.setup_driver()
+            scraper.open_feed()
+        self.pages = 0
+        self.restarts += 1
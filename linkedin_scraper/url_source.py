@@ -0,0 +1,226 @@
+"""
+Streaming URL input
+Reads profile URLs from text, CSV or JSONL files (optionally gzipped) or
+stdin one line at a time, canonicalizes them and drops duplicates with a
+disk-backed set or a Bloom filter, so memory stays bounded for inputs of
+millions of lines.
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import math
+import gzip
+import sqlite3
+import hashlib
+import config
+from urls import canonical_profile_url, is_profile_url
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# File extension -> input format
+FORMATS = {
+    ".txt": "txt",
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+
+class DiskSet:
+    """Exact set of strings kept in a temporary SQLite database"""
+
+    def __init__(self, commit_every=10000):
+        # An empty filename gives a private on-disk database that is deleted on close
+        self.conn = sqlite3.connect("")
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.commit_every = commit_every
+        self._uncommitted = 0
+
+    def add(self, key):
+        """Add key; returns False if it was already present"""
+        cursor = self.conn.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,))
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.conn.commit()
+            self._uncommitted = 0
+        return cursor.rowcount == 1
+
+    def close(self):
+        self.conn.close()
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set. A new key is reported as already present
+    with probability error_rate (once capacity keys are stored); keys are
+    never missed.
+    """
+
+    def __init__(self, capacity=None, error_rate=None):
+        capacity = capacity or config.INPUT_BLOOM_CAPACITY
+        error_rate = error_rate or config.INPUT_BLOOM_ERROR_RATE
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        """Add key; returns False if it was (probably) already present"""
+        new = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        return new
+
+    def close(self):
+        self.bits = bytearray()
+
+
+class _NoDedupe:
+    def add(self, key):
+        return True
+
+    def close(self):
+        pass
+
+
+DEDUPERS = {
+    "disk": DiskSet,
+    "bloom": BloomFilter,
+    "none": _NoDedupe,
+}
+
+
+def input_format(path):
+    """Format of an input file from its extension (ignoring .gz)"""
+    if path == "-":
+        return config.INPUT_STDIN_FORMAT
+    stem, ext = os.path.splitext(path.lower())
+    if ext == ".gz":
+        ext = os.path.splitext(stem)[1]
+    return FORMATS.get(ext, "txt")
+
+
+def open_text(path):
+    """Open a file (or stdin for "-") as text, decompressing gzip transparently"""
+    raw = sys.stdin.buffer if path == "-" else open(path, "rb")
+    if not hasattr(raw, "peek"):
+        raw = io.BufferedReader(raw)
+    if raw.peek(2)[:2] == GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def _text_values(lines):
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def _csv_values(lines, delimiter=","):
+    """URL column of a CSV file; without a matching header, the first cell that looks like a LinkedIn URL"""
+    reader = csv.reader(lines, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    names = [name.strip().lower() for name in header]
+    column = config.INPUT_URL_COLUMN.lower()
+    if column in names:
+        index = names.index(column)
+        for row in reader:
+            if index < len(row):
+                yield row[index]
+        return
+
+    # No URL column: the first line is data too
+    yield from (cell for cell in header if "linkedin.com/" in cell.lower())
+    for row in reader:
+        yield from (cell for cell in row if "linkedin.com/" in cell.lower())
+
+
+def _jsonl_values(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            record = record.get(config.INPUT_URL_COLUMN)
+        if isinstance(record, str):
+            yield record
+
+
+def read_values(path):
+    """Raw URL strings from one input file, streamed"""
+    fmt = input_format(path)
+    with open_text(path) as lines:
+        if fmt == "csv":
+            yield from _csv_values(lines)
+        elif fmt == "tsv":
+            yield from _csv_values(lines, delimiter="\t")
+        elif fmt == "jsonl":
+            yield from _jsonl_values(lines)
+        else:
+            yield from _text_values(lines)
+
+
+class UrlSource:
+    """
+    Iterable of canonical, de-duplicated profile URLs from input files and/or
+    an in-memory list. Iterate it once; counts are printed at the end.
+    """
+
+    def __init__(self, paths=None, urls=None, dedupe=None):
+        self.paths = list(paths or [])
+        self.urls = urls or ()
+        self.dedupe = dedupe or config.INPUT_DEDUPE
+        if self.dedupe not in DEDUPERS:
+            raise Exception(
+                f"Unknown INPUT_DEDUPE: {self.dedupe}\n"
+                f"Choose one of: {', '.join(DEDUPERS)}"
+            )
+        self.read = 0
+        self.invalid = 0
+        self.duplicates = 0
+
+    def _values(self):
+        yield from self.urls
+        for path in self.paths:
+            yield from read_values(path)
+
+    def __iter__(self):
+        seen = DEDUPERS[self.dedupe]()
+        try:
+            for value in self._values():
+                self.read += 1
+                url = canonical_profile_url(value)
+                if not is_profile_url(url):
+                    self.invalid += 1
+                    continue
+                if not seen.add(url):
+                    self.duplicates += 1
+                    continue
+                yield url
+        finally:
+            seen.close()
+            print(
+                f"   Input: {self.read} URLs read, {self.invalid} not profile URLs, "
+                f"{self.duplicates} duplicates skipped"
+            )
@@ -0,0 +1,64 @@
+"""
+Profile URL helpers
+"""
+
+import re
+from urllib.parse import urlsplit, unquote, quote
+
+LINKEDIN_HOST = "www.linkedin.com"
+
+# Path prefixes in front of /in/<slug> on mobile and lite pages
+PROFILE_PATH_PREFIXES = ("mwlite", "m")
+
+SLUG_PATTERN = re.compile(r"^[^/?#\s]+$")
+
+
+def _is_linkedin_host(host):
+    return host == "linkedin.com" or host.endswith(".linkedin.com")
+
+
+def canonical_profile_url(url):
+    """
+    Canonical form of a LinkedIn profile URL, used as a cache and dedupe key:
+    https, www host (locale and mobile subdomains folded in), no query or
+    fragment, lowercase percent-decoded /in/ slug, trailing slash.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if _is_linkedin_host(host):
+        host = LINKEDIN_HOST
+
+    segments = [segment for segment in parts.path.split("/") if segment]
+    if segments and segments[0].lower() in PROFILE_PATH_PREFIXES:
+        segments = segments[1:]
+    if len(segments) >= 2 and segments[0].lower() == "in":
+        slug = quote(unquote(segments[1]).lower(), safe="-_.~")
+        path = f"/in/{slug}/"
+    else:
+        path = "/" + "/".join(segments) + ("/" if segments else "")
+
+    return f"https://{host}{path}"
+
+
+def is_profile_url(url):
+    """Whether url is a LinkedIn /in/<slug>/ profile URL (after canonicalization)"""
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split("/") if segment]
+    return (
+        parts.hostname == LINKEDIN_HOST
+        and len(segments) == 2
+        and segments[0] == "in"
+        and bool(SLUG_PATTERN.match(segments[1]))
+    )
+
+
+def profile_slug(url):
+    """Lowercase, percent-decoded /in/<slug> of a profile URL, or None"""
+    url = canonical_profile_url(url)
+    if not is_profile_url(url):
+        return None
+    return unquote(urlsplit(url).path.split("/")[2])
@@ -0,0 +1,312 @@
+"""
+Streaming output writers
+Append each profile to the output file as soon as it is produced, so other
+jobs can tail the file while the scraper is still running. The experience /
+education history goes to a child table next to it (one row per item,
+linked by profile_url), or stays nested in JSONL records.
+"""
+
+import os
+import csv
+import json
+import time
+import threading
+import config
+from extractor import PROFILE_FIELDS, HISTORY_KEY, HISTORY_FIELDS
+from normalize import COUNT_COLUMNS, DATE_COLUMNS, normalize_profiles, normalize_history, arrow_type, arrow_value
+
+# Flush policies
+FLUSH_RECORD = "record"  # after every record
+FLUSH_BATCH = "batch"  # every OUTPUT_BATCH_SIZE records
+FLUSH_CLOSE = "close"  # only when the writer is closed
+
+# How the experience / education history is written
+HISTORY_TABLE = "table"  # child table <output>_positions.<ext>
+HISTORY_NESTED = "nested"  # list inside each JSONL record
+HISTORY_NONE = "none"
+
+
+class OutputWriter:
+    """Base class: buffering, flush policy and thread safety"""
+
+    def __init__(self, path, fields=None, flush_policy=None, batch_size=None, fsync=None, normalize=None):
+        self.path = path
+        self.fields = list(fields or PROFILE_FIELDS)
+        self.normalize = config.OUTPUT_NORMALIZE if normalize is None else normalize
+        self.flush_policy = flush_policy or config.OUTPUT_FLUSH
+        self.batch_size = batch_size or config.OUTPUT_BATCH_SIZE
+        self.fsync = config.OUTPUT_FSYNC if fsync is None else fsync
+        self.records_written = 0
+        self.history = None
+        self._unflushed = 0
+        self._lock = threading.Lock()
+
+    def _write_history(self, records):
+        """Send the records' history rows to the child table writer, if any"""
+        if self.history is not None:
+            rows = [row for record in records for row in (record.get(HISTORY_KEY) or [])]
+            if rows:
+                self.history.write_many(rows)
+
+    def _normalized(self, records):
+        """Records with the typed columns added, if normalization is on"""
+        if not self.normalize or not records:
+            return records
+        if 'dates' in self.fields:
+            return normalize_history(records)
+        return normalize_profiles(records, nested=HISTORY_KEY in self.fields)
+
+    def write(self, record):
+        """Append one record and flush according to the policy"""
+        self.write_many([record])
+
+    def write_many(self, records):
+        """Append a chunk of records (normalized together) and flush according to the policy"""
+        records = list(records)
+        self._write_history(records)
+        records = self._normalized(records)
+        with self._lock:
+            for record in records:
+                self._write(record)
+                self.records_written += 1
+                self._unflushed += 1
+                if self.flush_policy == FLUSH_RECORD or (
+                    self.flush_policy == FLUSH_BATCH and self._unflushed >= self.batch_size
+                ):
+                    self._flush()
+                    self._unflushed = 0
+
+    def flush(self):
+        """Push buffered records to disk"""
+        if self.history is not None:
+            self.history.flush()
+        with self._lock:
+            self._flush()
+            self._unflushed = 0
+
+    def close(self):
+        """Flush and close the output file"""
+        if self.history is not None:
+            self.history.close()
+        with self._lock:
+            self._flush()
+            self._close()
+
+    def _write(self, record):
+        raise NotImplementedError
+
+    def _flush(self):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class _TextFileWriter(OutputWriter):
+    """Writer backed by an append-mode text file"""
+
+    encoding = 'utf-8'
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a', newline='', encoding=self.encoding if self.is_new else 'utf-8')
+
+    def _flush(self):
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def _close(self):
+        self.file.close()
+
+
+class CsvWriter(_TextFileWriter):
+    """
+    Append rows to a CSV file, writing the header only for a new file.
+    Rows appended to an existing file follow its header, so a file written
+    with other columns never ends up misaligned.
+    """
+
+    # BOM so Excel opens the file as UTF-8
+    encoding = 'utf-8-sig'
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        if not self.is_new:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                self.fields = next(csv.reader(f), None) or self.fields
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fields, extrasaction='ignore')
+        if self.is_new:
+            self.writer.writeheader()
+
+    def _write(self, record):
+        self.writer.writerow(record)
+
+
+class JsonlWriter(_TextFileWriter):
+    """Append one JSON object per line"""
+
+    def _write(self, record):
+        record = {field: record.get(field) for field in self.fields}
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class ParquetWriter(OutputWriter):
+    """
+    Buffer records and write them as Parquet row groups: one per write with
+    the "record" flush policy, batch_size rows otherwise. The file is only
+    readable once it is closed (the footer comes last), so "close" buffers no
+    more than "batch". Parquet files can't be appended to, so an existing file
+    is left alone and the run writes to a new timestamped file next to it.
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        import pyarrow
+        import pyarrow.parquet
+
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        if os.path.exists(path):
+            stem, ext = os.path.splitext(path)
+            self.path = f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}{ext}"
+        self.schema = pyarrow.schema([(field, arrow_type(pyarrow, field)) for field in self.fields])
+        self.file = None
+        self.writer = None
+        self.rows = []
+
+    def write_many(self, records):
+        """Buffer records and write a row group when the flush policy says so, normalized as one chunk"""
+        records = list(records)
+        self._write_history(records)
+        with self._lock:
+            self.rows.extend(records)
+            self.records_written += len(records)
+            if self.flush_policy == FLUSH_RECORD or len(self.rows) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self.rows:
+            return
+        if self.writer is None:
+            self.file = open(self.path, 'wb')
+            self.writer = self._pq.ParquetWriter(self.file, self.schema)
+        rows = self._normalized(self.rows)
+        columns = {
+            field: [arrow_value(field, row.get(field)) for row in rows]
+            for field in self.fields
+        }
+        self.writer.write_table(self._pa.table(columns, schema=self.schema))
+        self.rows = []
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def _close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.file.close()
+
+
+WRITERS = {
+    'csv': CsvWriter,
+    'jsonl': JsonlWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def output_path(output_format=None):
+    """Configured output file for a format"""
+    output_format = output_format or config.OUTPUT_FORMAT
+    return {
+        'csv': config.OUTPUT_CSV,
+        'jsonl': config.OUTPUT_JSONL,
+        'parquet': config.OUTPUT_PARQUET,
+    }[output_format]
+
+
+def history_path(path):
+    """Child table file for the history rows of an output file"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_positions{ext}"
+
+
+def read_records(path, output_format=None):
+    """Yield the records of an output file written by these writers, as dicts"""
+    output_format = output_format or os.path.splitext(path)[1].lstrip('.')
+    if output_format == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                yield {field: (value if value != "" else None) for field, value in row.items()}
+    elif output_format == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif output_format == 'parquet':
+        import pyarrow.parquet
+
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        raise Exception(f"Unknown output format: {output_format}\nChoose one of: {', '.join(WRITERS)}")
+
+
+def open_writer(output_format=None, path=None, history=None, **kwargs):
+    """
+    Create the writer for an output format ("csv", "jsonl" or "parquet").
+    history ("table", "nested" or "none", default OUTPUT_HISTORY) decides
+    where the experience / education rows go.
+    """
+    output_format = output_format or config.OUTPUT_FORMAT
+    history = history or config.OUTPUT_HISTORY
+    if output_format not in WRITERS:
+        raise Exception(
+            f"Unknown output format: {output_format}\n"
+            f"Choose one of: {', '.join(WRITERS)}"
+        )
+    if history == HISTORY_NESTED and output_format != 'jsonl':
+        raise Exception("OUTPUT_HISTORY = \"nested\" needs OUTPUT_FORMAT = \"jsonl\"")
+
+    path = path or output_path(output_format)
+    normalize = kwargs.setdefault('normalize', config.OUTPUT_NORMALIZE)
+    fields = list(kwargs.get('fields') or PROFILE_FIELDS)
+    if normalize:
+        fields += [column for column in COUNT_COLUMNS if column not in fields]
+    if history == HISTORY_NESTED:
+        fields.append(HISTORY_KEY)
+    kwargs['fields'] = fields
+    writer = WRITERS[output_format](path, **kwargs)
+    if history == HISTORY_TABLE:
+        history_fields = HISTORY_FIELDS + DATE_COLUMNS if normalize else HISTORY_FIELDS
+        child_kwargs = dict(kwargs, fields=history_fields)
+        writer.history = WRITERS[output_format](history_path(writer.path), **child_kwargs)
+    return writer
+
+
+def remove_output(path):
+    """Delete an output file and its history child table, if they exist"""
+    for stale in (path, history_path(path)):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+
+def export_records(records, output_format=None, path=None):
+    """Write records to a fresh output file, replacing any existing one"""
+    output_format = output_format or config.OUTPUT_FORMAT
+    path = path or output_path(output_format)
+    remove_output(path)
+
+    writer = open_writer(output_format, path, flush_policy=FLUSH_CLOSE)
+    try:
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= writer.batch_size:
+                writer.write_many(chunk)
+                chunk = []
+        writer.write_many(chunk)
+    finally:
+        writer.close()
+    return writer